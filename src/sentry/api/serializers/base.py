@@ -14,6 +14,7 @@ from typing import (
 import sentry_sdk
 from django.contrib.auth.models import AnonymousUser
 
+from sentry import features
 from sentry.utils.json import JSONData
 
 K = TypeVar("K")
@@ -68,7 +69,11 @@ def serialize(
                 pass
         else:
             return objects
-    with sentry_sdk.start_span(op="serialize", description=type(serializer).__name__) as span:
+    # The same features are checked for many of the objects, and for the
+    # objects nested in them.
+    with features.memoize(), sentry_sdk.start_span(
+        op="serialize", description=type(serializer).__name__
+    ) as span:
         span.set_data("Object Count", len(objects))
 
         with sentry_sdk.start_span(op="serialize.get_attrs", description=type(serializer).__name__):
@@ -1,14 +1,18 @@
 import pickle
 import threading
+from collections import defaultdict
 from datetime import datetime
 from time import time
 
 from django.db import models
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.signals import post_save
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 
 from sentry.buffer import Buffer
 from sentry.exceptions import InvalidConfiguration
+from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
 from sentry.utils.compat import crc32
@@ -51,10 +55,13 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(self, pending_partitions=1, incr_batch_size=2, bulk_flush=False, **options):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        # When enabled, ``process`` reads all keys of a batch in one pipeline
+        # and coalesces ``Group`` counters into a single multi-row UPDATE.
+        self.bulk_flush = bulk_flush
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
 
@@ -262,12 +269,59 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if self.bulk_flush:
+            self._process_batch(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
     def _process(self, model, columns, filters, extra=None, signal_only=None):
         return super().process(model, columns, filters, extra, signal_only)
 
+    def _load_pending_values(self, key, values):
+        """
+        Decodes the hash stored under ``key`` into the arguments of
+        ``_process``. Returns ``None`` if the hash has already been flushed.
+        """
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_text(k): v for k, v in values.items()}
+
+        if not values:
+            metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+            self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            return None
+
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))
+
+        if values["f"].startswith(b"{"):
+            filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
     def _process_single_incr(self, key):
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(key)
@@ -288,42 +342,130 @@ class RedisBuffer(Buffer):
             pipe.delete(key)
             values = pipe.execute()[0]
 
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_text(k): v for k, v in values.items()}
+            pending = self._load_pending_values(key, values)
+            if pending is not None:
+                self._process(*pending)
+        finally:
+            client.delete(lock_key)
 
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
-                return
+    def _process_batch(self, batch_keys):
+        """
+        Flushes all ``batch_keys`` at once: locks, hashes and cleanup are
+        each issued as a single pipelined round-trip per Redis host, and
+        ``Group`` counters are written with one UPDATE for the whole batch.
+        """
+        with self.cluster.map() as conn:
+            lock_results = [
+                (key, conn.set(self._make_lock_key(key), "1", nx=True, ex=10)) for key in batch_keys
+            ]
+
+        locked_keys = []
+        for key, result in lock_results:
+            if result.value:
+                locked_keys.append(key)
+            else:
+                metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))
+        if not locked_keys:
+            return
 
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            self._process(model, incr_values, filters, extra_values, signal_only)
+        try:
+            with self.cluster.map() as conn:
+                value_results = []
+                for key in locked_keys:
+                    value_results.append((key, conn.hgetall(key)))
+                    conn.zrem(self._make_pending_key_from_key(key), key)
+                    conn.delete(key)
+
+            group_updates = []
+            for key, result in value_results:
+                pending = self._load_pending_values(key, result.value)
+                if pending is None:
+                    continue
+                if self._can_bulk_update_group(*pending):
+                    group_updates.append(pending)
+                else:
+                    self._process(*pending)
+
+            if group_updates:
+                self._bulk_update_groups(group_updates)
         finally:
-            client.delete(lock_key)
+            with self.cluster.map() as conn:
+                for key in locked_keys:
+                    conn.delete(self._make_lock_key(key))
+
+    def _can_bulk_update_group(self, model, columns, filters, extra, signal_only):
+        from sentry.models import Group
+
+        return model is Group and not signal_only and filters.keys() in ({"id"}, {"pk"})
+
+    def _bulk_update_groups(self, pending):
+        """
+        Applies the buffered counters and extra values of many groups with a
+        single UPDATE, using ``CASE`` expressions keyed by the group id. This is
+        equivalent to calling ``Buffer.process`` for each of them.
+        """
+        from sentry.event_manager import ScoreClause
+        from sentry.models import Group
+
+        incr_cases = defaultdict(list)
+        extra_cases = defaultdict(list)
+        score_cases = []
+        group_ids = []
+
+        for _, columns, filters, extra, _ in pending:
+            (group_id,) = filters.values()
+            group_ids.append(group_id)
+            for column, amount in columns.items():
+                incr_cases[column].append(When(id=group_id, then=Value(amount)))
+            for column, value in (extra or {}).items():
+                field = Group._meta.get_field(column)
+                extra_cases[column].append(When(id=group_id, then=Value(value, output_field=field)))
+            if "last_seen" in (extra or {}) and "times_seen" in columns:
+                score_cases.append(
+                    When(
+                        id=group_id,
+                        then=ScoreClause(
+                            group=None,
+                            times_seen=columns["times_seen"],
+                            last_seen=extra["last_seen"],
+                            output_field=IntegerField(),
+                        ),
+                    )
+                )
+
+        update_kwargs = {}
+        for column, whens in incr_cases.items():
+            update_kwargs[column] = F(column) + Case(
+                *whens, default=Value(0), output_field=IntegerField()
+            )
+        for column, whens in extra_cases.items():
+            update_kwargs[column] = Case(
+                *whens, default=F(column), output_field=Group._meta.get_field(column)
+            )
+        if score_cases:
+            update_kwargs["score"] = Case(
+                *score_cases, default=F("score"), output_field=IntegerField()
+            )
+
+        metrics.timing("buffer.bulk-update-groups.size", len(group_ids))
+        with metrics.timer("buffer.bulk-update-groups"):
+            # Groups that were deleted by the time we flush are simply not
+            # matched, same as in ``Buffer.process``.
+            Group.objects.filter(id__in=group_ids).update(**update_kwargs)
+
+        # ``update`` bypasses ``post_save``, which keeps the group cache in
+        # sync. Send it the same way ``Model.update`` does.
+        for group in Group.objects.filter(id__in=group_ids):
+            post_save.send(sender=Group, instance=group, created=False)
+
+        for model, columns, filters, extra, _ in pending:
+            buffer_incr_complete.send_robust(
+                model=model,
+                columns=columns,
+                filters=filters,
+                extra=extra,
+                created=False,
+                sender=model,
+            )
@@ -1500,6 +1500,9 @@ SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS = {}
+# Paths of trained zstd dictionaries nodestore payloads can be compressed
+# with, see `nodestore.zstd-dictionary-id`.
+SENTRY_NODESTORE_ZSTD_DICTIONARIES = []
 
 # Tag storage backend
 SENTRY_TAGSTORE = os.environ.get("SENTRY_TAGSTORE", "sentry.tagstore.snuba.SnubaTagStorage")
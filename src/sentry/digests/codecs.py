@@ -2,6 +2,10 @@ import pickle
 import zlib
 from typing import Any
 
+import msgpack
+
+from sentry import options
+
 
 class Codec:
     def encode(self, value: Any) -> bytes:
@@ -17,3 +21,43 @@ class CompressedPickleCodec(Codec):
 
     def decode(self, value: bytes) -> Any:
         return pickle.loads(zlib.decompress(value))
+
+
+class NotificationCodec(CompressedPickleCodec):
+    """
+    Encodes notifications as the ids of their event, group and rules instead
+    of a pickled snapshot of the event. The event payload is fetched from
+    nodestore when (and if) the digest needs it.
+
+    Notifications are only encoded this way with the ``digests.compact-records``
+    option enabled, anything else is pickled as before. Both are decoded, so
+    the option can be toggled while timelines contain records.
+    """
+
+    VERSION = 1
+
+    # The first byte of a msgpack array with five items. Compressed pickles
+    # always start with the zlib header (0x78) instead.
+    MARKER = b"\x95"
+
+    def encode(self, value: Any) -> bytes:
+        from sentry.digests.notifications import Notification
+
+        if not isinstance(value, Notification) or not options.get("digests.compact-records"):
+            return super().encode(value)
+
+        event = value.event
+        return msgpack.packb(
+            [self.VERSION, event.project_id, event.event_id, event.group_id, list(value.rules)]
+        )
+
+    def decode(self, value: bytes) -> Any:
+        if value[:1] != self.MARKER:
+            return super().decode(value)
+
+        from sentry.digests.notifications import Notification
+        from sentry.eventstore.models import Event
+
+        version, project_id, event_id, group_id, rules = msgpack.unpackb(value)
+        assert version == self.VERSION, version
+        return Notification(Event(project_id, event_id, group_id=group_id), rules)
@@ -6,7 +6,7 @@ import logging
 from collections import defaultdict, namedtuple
 from typing import Any, Mapping, MutableMapping, MutableSequence, Sequence
 
-from sentry import tsdb
+from sentry import eventstore, tsdb
 from sentry.digests import Digest, Record
 from sentry.eventstore.models import Event
 from sentry.models import Group, GroupStatus, Project, Rule
@@ -52,6 +52,55 @@ def event_to_record(event: Event, rules: Sequence[Rule]) -> Record:
     )
 
 
+def summarize_records(records: Sequence[Record]) -> Sequence[Record]:
+    """
+    Returns the records a digest is built from: the newest and the oldest
+    record of every group per rule, in their original order. Notifications
+    only show those, and the remaining ones of noisy groups would be decoded,
+    rewritten and grouped for nothing.
+    """
+    # (rule, group id) -> (index of newest record, index of oldest record)
+    bounds: MutableMapping[tuple[int, int], tuple[int, int]] = {}
+    keep: set[int] = set()
+
+    for i, record in enumerate(records):
+        if not record.value.rules:
+            # Kept to be logged when grouping records.
+            keep.add(i)
+            continue
+
+        for rule in record.value.rules:
+            key = (rule, record.value.event.group_id)
+            newest, oldest = bounds.get(key, (i, i))
+            if record.timestamp > records[newest].timestamp:
+                newest = i
+            if record.timestamp <= records[oldest].timestamp:
+                oldest = i
+            bounds[key] = (newest, oldest)
+
+    for newest, oldest in bounds.values():
+        keep.add(newest)
+        keep.add(oldest)
+
+    return [record for i, record in enumerate(records) if i in keep]
+
+
+def bind_events(digest: Digest) -> None:
+    """
+    Fetches the payloads of events in ``digest`` that were decoded without
+    them (see ``NotificationCodec``) with a single nodestore request.
+    """
+    events = [
+        record.value.event
+        for groups in digest.values()
+        for group_records in groups.values()
+        for record in group_records
+        if record.value.event.data._node_data is None
+    ]
+    if events:
+        eventstore.bind_nodes(events)
+
+
 def fetch_state(project: Project, records: Sequence[Record]) -> Mapping[str, Any]:
     # This reads a little strange, but remember that records are returned in
     # reverse chronological order, and we query the database in chronological
@@ -177,6 +226,8 @@ def build_digest(
     if not records:
         return None, []
 
+    records = summarize_records(records)
+
     # XXX(hack): Allow generating a mock digest without actually doing any real IO!
     state = state or fetch_state(project, records)
 
@@ -191,4 +242,6 @@ def build_digest(
     )
 
     digest, logs = pipeline(records)
+    if digest:
+        bind_events(digest)
     return digest, logs
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, List, Optional, Set
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Set
 
 from sentry import features, options
 from sentry.dynamic_sampling.utils import DEFAULT_BIASES, Bias
@@ -18,17 +18,21 @@ class DynamicSamplingFeatureMultiplexer:
     - The `organizations:dynamic-sampling` feature flag is the flag that enables the new adaptive sampling
     """
 
-    def __init__(self, project: "Project"):
+    def __init__(
+        self, project: "Project", has_feature: Optional[Callable[[str, Any], bool]] = None
+    ):
+        # Looked up on every call, so that tests patching `features.has` apply.
+        has_feature = has_feature or features.has
         # Feature flag that informs us that relay is handling DS rules
-        self.allow_dynamic_sampling = features.has(
+        self.allow_dynamic_sampling = has_feature(
             "organizations:server-side-sampling", project.organization
         )
         # Feature flag that informs us that the org is on the new AM2 plan and thereby have adaptive sampling enabled
-        self.current_dynamic_sampling = features.has(
+        self.current_dynamic_sampling = has_feature(
             "organizations:dynamic-sampling", project.organization
         )
         # Flag responsible to inform us if the org was in the original LA/EA Dynamic Sampling
-        self.deprecated_dynamic_sampling = features.has(
+        self.deprecated_dynamic_sampling = has_feature(
             "organizations:dynamic-sampling-deprecated", project.organization
         )
 
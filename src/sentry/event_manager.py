@@ -80,6 +80,7 @@ from sentry.grouping.api import (
     get_grouping_config_dict_for_project,
     load_grouping_config,
 )
+from sentry.grouping.cache import get_hashes_cached
 from sentry.grouping.result import CalculatedHashes
 from sentry.ingest.inbound_filters import FilterStatKeys
 from sentry.killswitches import killswitch_matches_context
@@ -433,93 +434,79 @@ class EventManager:
 
             return jobs[0]["event"]
 
-        with metrics.timer("event_manager.save.organization.get_from_cache"):
-            project.set_cached_field_value(
-                "organization", Organization.objects.get_from_cache(id=project.organization_id)
-            )
-
-        jobs = [job]
-
-        is_reprocessed = is_reprocessed_event(job["data"])
+        job["cache_key"] = cache_key
+        jobs = save_error_events([job], projects)
 
-        with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
-            _pull_out_data(jobs, projects)
+        discarded = job.get("discarded")
+        if discarded is not None:
+            raise discarded
 
-        with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
-            _get_or_create_release_many(jobs, projects)
-
-        with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
-            _get_event_user_many(jobs, projects)
-
-        job["project_key"] = None
-        if job["key_id"] is not None:
-            with metrics.timer("event_manager.load_project_key"):
-                try:
-                    job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
-                except ProjectKey.DoesNotExist:
-                    pass
+        if not jobs:
+            # `_save_aggregate` did not produce a group, nothing else has
+            # been written for this event.
+            return job["event"]
 
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
+        self._data = job["event"].data.data
 
-        do_background_grouping_before = options.get("store.background-grouping-before")
-        if do_background_grouping_before:
-            _run_background_grouping(project, job)
+        # Check if the project is configured for auto upgrading and we need to upgrade
+        # to the latest grouping config.
+        if auto_upgrade_grouping and _project_should_update_grouping(project):
+            _auto_update_grouping(project)
 
-        secondary_hashes = None
+        return job["event"]
 
-        try:
-            secondary_grouping_config = project.get_option("sentry:secondary_grouping_config")
-            secondary_grouping_expiry = project.get_option("sentry:secondary_grouping_expiry")
-            if secondary_grouping_config and (secondary_grouping_expiry or 0) >= time.time():
-                with metrics.timer("event_manager.secondary_grouping"):
-                    secondary_event = copy.deepcopy(job["event"])
-                    loader = SecondaryGroupingConfigLoader()
-                    secondary_grouping_config = loader.get_config_dict(project)
-                    secondary_hashes = _calculate_event_grouping(
-                        project, secondary_event, secondary_grouping_config
-                    )
-        except Exception:
-            sentry_sdk.capture_exception()
 
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            if is_reprocessed:
-                # The customer might have changed grouping enhancements since
-                # the event was ingested -> make sure we get the fresh one for reprocessing.
-                grouping_config = get_grouping_config_dict_for_project(project)
-                # Write back grouping config because it might have changed since the
-                # event was ingested.
-                # NOTE: We could do this unconditionally (regardless of `is_processed`).
-                job["data"]["grouping_config"] = grouping_config
-            else:
-                grouping_config = get_grouping_config_dict_for_event_data(
-                    job["event"].data.data, project
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs: Sequence[Job], projects: ProjectsMapping) -> Sequence[Job]:
+    """
+    Saves a batch of normalized error events.
+
+    Every job needs ``data``, ``project_id``, ``raw``, ``start_time`` and
+    ``cache_key``. Stages which can be batched (releases, event users,
+    environments, tsdb, nodestore, eventstream, outcomes) run once for the
+    whole batch, while grouping and ``_save_aggregate`` still run per job
+    since they lock on the group hashes of each event.
+
+    A job whose hash was discarded is dropped from the batch and its
+    ``HashDiscarded`` exception is stored under ``job["discarded"]``. Jobs for
+    which no group could be produced are dropped as well. Returns the jobs
+    that were fully saved.
+    """
+    with metrics.timer("event_manager.save.organization.get_from_cache"):
+        organizations = {
+            o.id: o
+            for o in Organization.objects.get_many_from_cache(
+                {project.organization_id for project in projects.values()}
+            )
+        }
+        for project in projects.values():
+            try:
+                project.set_cached_field_value(
+                    "organization", organizations[project.organization_id]
                 )
+            except KeyError:
+                continue
 
-        with sentry_sdk.start_span(op="event_manager.save.calculate_event_grouping"), metrics.timer(
-            "event_manager.calculate_event_grouping"
-        ):
-            hashes = _calculate_event_grouping(project, job["event"], grouping_config)
-
-        hashes = CalculatedHashes(
-            hashes=list(hashes.hashes) + list(secondary_hashes and secondary_hashes.hashes or []),
-            hierarchical_hashes=hashes.hierarchical_hashes,
-            tree_labels=hashes.tree_labels,
-        )
+    with sentry_sdk.start_span(op="event_manager.save.pull_out_data"):
+        _pull_out_data(jobs, projects)
 
-        if not do_background_grouping_before:
-            _run_background_grouping(project, job)
+    with sentry_sdk.start_span(op="event_manager.save.get_or_create_release_many"):
+        _get_or_create_release_many(jobs, projects)
 
-        if hashes.tree_labels:
-            job["finest_tree_label"] = hashes.finest_tree_label
+    with sentry_sdk.start_span(op="event_manager.save.get_event_user_many"):
+        _get_event_user_many(jobs, projects)
 
-        _materialize_metadata_many(jobs)
+    _get_project_key_many(jobs)
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
 
-        kwargs = _create_kwargs(job)
+    saved_jobs: list[Job] = []
+    attachments_by_job: dict[int, list[Attachment]] = {}
 
-        kwargs["culprit"] = job["culprit"]
+    for job in jobs:
+        project = projects[job["project_id"]]
+        job["is_reprocessed"] = is_reprocessed_event(job["data"])
+        _calculate_error_event_grouping(job, project)
 
         # Load attachments first, but persist them at the very last after
         # posting to eventstream to make sure all counters and eventstream are
@@ -527,19 +514,21 @@ class EventManager:
         # based on the group counter.
         with metrics.timer("event_manager.get_attachments"):
             with sentry_sdk.start_span(op="event_manager.save.get_attachments"):
-                attachments = get_attachments(cache_key, job)
+                attachments = get_attachments(job["cache_key"], job)
+
+        kwargs = _create_kwargs(job)
+        kwargs["culprit"] = job["culprit"]
 
         try:
             with sentry_sdk.start_span(op="event_manager.save.save_aggregate_fn"):
                 group_info = _save_aggregate(
                     event=job["event"],
-                    hashes=hashes,
+                    hashes=job["hashes"],
                     release=job["release"],
                     metadata=dict(job["event_metadata"]),
                     received_timestamp=job["received_timestamp"],
                     **kwargs,
                 )
-                job["groups"] = [group_info]
         except HashDiscarded as err:
             logger.info(
                 "event_manager.save.discard",
@@ -549,49 +538,66 @@ class EventManager:
                 },
             )
             discard_event(job, attachments)
-            raise
+            job["discarded"] = err
+            continue
 
         if not group_info:
-            return job["event"]
+            continue
 
+        job["groups"] = [group_info]
         job["event"].group = group_info.group
 
         # store a reference to the group id to guarantee validation of isolation
         # XXX(markus): No clue what this does
         job["event"].data.bind_ref(job["event"])
 
-        _get_or_create_environment_many(jobs, projects)
-        _get_or_create_group_environment_many(jobs, projects)
-        _get_or_create_release_associated_models(jobs, projects)
-        _get_or_create_group_release_many(jobs, projects)
-        _tsdb_record_all_metrics(jobs)
+        attachments_by_job[id(job)] = attachments
+        saved_jobs.append(job)
 
-        UserReport.objects.filter(project_id=project.id, event_id=job["event"].event_id).update(
-            group_id=group_info.group.id, environment_id=job["environment"].id
-        )
+    if not saved_jobs:
+        return saved_jobs
+
+    jobs = saved_jobs
+
+    _get_or_create_environment_many(jobs, projects)
+    _get_or_create_group_environment_many(jobs, projects)
+    _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_group_release_many(jobs, projects)
+    _tsdb_record_all_metrics(jobs)
+
+    for job in jobs:
+        UserReport.objects.filter(
+            project_id=job["project_id"], event_id=job["event"].event_id
+        ).update(group_id=job["groups"][0].group.id, environment_id=job["environment"].id)
 
         with metrics.timer("event_manager.filter_attachments_for_group"):
-            attachments = filter_attachments_for_group(attachments, job)
+            attachments_by_job[id(job)] = filter_attachments_for_group(
+                attachments_by_job[id(job)], job
+            )
 
-        # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
-        _materialize_event_metrics(jobs)
+    # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
+    _materialize_event_metrics(jobs)
 
-        for attachment in attachments:
+    for job in jobs:
+        for attachment in attachments_by_job[id(job)]:
             key = f"bytes.stored.{attachment.type}"
             old_bytes = job["event_metrics"].get(key) or 0
             job["event_metrics"][key] = old_bytes + attachment.size
 
-        _nodestore_save_many(jobs)
+    _nodestore_save_many(jobs)
+
+    for job in jobs:
+        project = projects[job["project_id"]]
         save_unprocessed_event(project, job["event"].event_id)
 
-        if not raw:
+        if not job["raw"]:
             if not project.first_event:
                 project.update(first_event=job["event"].datetime)
                 first_event_received.send_robust(
                     project=project, event=job["event"], sender=Project
                 )
 
-        if is_reprocessed:
+        if job["is_reprocessed"]:
             safe_execute(
                 reprocessing2.buffered_delete_old_primary_hash,
                 project_id=job["event"].project_id,
@@ -603,17 +609,18 @@ class EventManager:
                 _with_transaction=False,
             )
 
-        _eventstream_insert_many(jobs)
+    _eventstream_insert_many(jobs)
 
+    for job in jobs:
         # Do this last to ensure signals get emitted even if connection to the
         # file store breaks temporarily.
         #
         # We do not need this for reprocessed events as for those we update the
         # group_id on existing models in post_process_group, which already does
         # this because of indiv. attachments.
-        if not is_reprocessed:
+        if not job["is_reprocessed"]:
             with metrics.timer("event_manager.save_attachments"):
-                save_attachments(cache_key, attachments, job)
+                save_attachments(job["cache_key"], attachments_by_job[id(job)], job)
 
         metric_tags = {"from_relay": "_relay_processed" in job["data"]}
 
@@ -629,16 +636,80 @@ class EventManager:
             tags=metric_tags,
         )
 
-        _track_outcome_accepted_many(jobs)
+    _track_outcome_accepted_many(jobs)
 
-        self._data = job["event"].data.data
+    return jobs
 
-        # Check if the project is configured for auto upgrading and we need to upgrade
-        # to the latest grouping config.
-        if auto_upgrade_grouping and _project_should_update_grouping(project):
-            _auto_update_grouping(project)
 
-        return job["event"]
+def _get_project_key_many(jobs: Sequence[Job]) -> None:
+    key_ids = {job["key_id"] for job in jobs if job["key_id"] is not None}
+    project_keys: dict[int, ProjectKey] = {}
+    if key_ids:
+        with metrics.timer("event_manager.load_project_key"):
+            project_keys = {
+                project_key.id: project_key
+                for project_key in ProjectKey.objects.get_many_from_cache(key_ids)
+            }
+
+    for job in jobs:
+        job["project_key"] = project_keys.get(job["key_id"])
+
+
+def _calculate_error_event_grouping(job: Job, project: Project) -> None:
+    do_background_grouping_before = options.get("store.background-grouping-before")
+    if do_background_grouping_before:
+        _run_background_grouping(project, job)
+
+    secondary_hashes = None
+
+    try:
+        secondary_grouping_config = project.get_option("sentry:secondary_grouping_config")
+        secondary_grouping_expiry = project.get_option("sentry:secondary_grouping_expiry")
+        if secondary_grouping_config and (secondary_grouping_expiry or 0) >= time.time():
+            with metrics.timer("event_manager.secondary_grouping"):
+                secondary_event = copy.deepcopy(job["event"])
+                loader = SecondaryGroupingConfigLoader()
+                secondary_grouping_config = loader.get_config_dict(project)
+                secondary_hashes = _calculate_event_grouping(
+                    project, secondary_event, secondary_grouping_config
+                )
+    except Exception:
+        sentry_sdk.capture_exception()
+
+    with metrics.timer("event_manager.load_grouping_config"):
+        # At this point we want to normalize the in_app values in case the
+        # clients did not set this appropriately so far.
+        if job["is_reprocessed"]:
+            # The customer might have changed grouping enhancements since
+            # the event was ingested -> make sure we get the fresh one for reprocessing.
+            grouping_config = get_grouping_config_dict_for_project(project)
+            # Write back grouping config because it might have changed since the
+            # event was ingested.
+            # NOTE: We could do this unconditionally (regardless of `is_processed`).
+            job["data"]["grouping_config"] = grouping_config
+        else:
+            grouping_config = get_grouping_config_dict_for_event_data(
+                job["event"].data.data, project
+            )
+
+    with sentry_sdk.start_span(op="event_manager.save.calculate_event_grouping"), metrics.timer(
+        "event_manager.calculate_event_grouping"
+    ):
+        hashes = _calculate_event_grouping(project, job["event"], grouping_config)
+
+    job["hashes"] = CalculatedHashes(
+        hashes=list(hashes.hashes) + list(secondary_hashes and secondary_hashes.hashes or []),
+        hierarchical_hashes=hashes.hierarchical_hashes,
+        tree_labels=hashes.tree_labels,
+    )
+
+    if not do_background_grouping_before:
+        _run_background_grouping(project, job)
+
+    if job["hashes"].tree_labels:
+        job["finest_tree_label"] = job["hashes"].finest_tree_label
+
+    _materialize_metadata_many([job])
 
 
 def _project_should_update_grouping(project: Project) -> bool:
@@ -2145,7 +2216,7 @@ def _calculate_event_grouping(
         # event.  If that config has since been deleted (because it was an
         # experimental grouping config) we fall back to the default.
         try:
-            hashes = event.get_hashes(grouping_config)
+            hashes = get_hashes_cached(event, grouping_config)
         except GroupingConfigNotFound:
             event.data["grouping_config"] = get_grouping_config_dict_for_project(project)
             hashes = event.get_hashes()
@@ -3,9 +3,11 @@ Eventstore compressor is responsible for pulling out repeating data across
 events such that they can be stored only once. For example SDK modules list, or
 debug_meta.
 
-This is not used in production yet, we are still collecting metrics there.
+Nodestore runs events through this when the ``nodestore.deduplicate`` option is
+enabled, see ``NodeStorage.set_subkeys``.
 """
 
+import copy
 import hashlib
 
 from sentry.utils import json
@@ -14,6 +16,11 @@ _INTERFACES = {}
 
 
 def _deduplicate_interface(*keys):
+    """
+    Registers an interface for the given keys. Keys are paths into the event
+    payload separated by dots, e.g. ``"contexts.os"``.
+    """
+
     def inner(f):
         for k in keys:
             _INTERFACES[k] = f
@@ -23,43 +30,162 @@ def _deduplicate_interface(*keys):
     return inner
 
 
-@_deduplicate_interface("debug_meta")
-class DebugMeta:
-    _DEDUP_FIELDS = ("debug_id", "code_id", "code_file", "debug_file")
+class _ListFields:
+    """
+    Pulls the given fields out of every item of the list stored under
+    ``_LIST_KEY``, keeping everything else inline.
+    """
 
-    @staticmethod
-    def encode(data):
+    _LIST_KEY = None
+    _DEDUP_FIELDS = ()
+
+    @classmethod
+    def encode(cls, data):
         dedup = {}
 
         if data:
-            for image in data.get("images") or []:
-                image = image or {}
-                for name in DebugMeta._DEDUP_FIELDS:
-                    dedup.setdefault(name, []).append(image.pop(name, None))
+            for item in data.get(cls._LIST_KEY) or []:
+                item = item or {}
+                for name in cls._DEDUP_FIELDS:
+                    dedup.setdefault(name, []).append(item.pop(name, None))
 
         return dedup, data
 
-    @staticmethod
-    def decode(dedup, data):
+    @classmethod
+    def decode(cls, dedup, data):
         if data:
-            for i, image in enumerate(data.get("images") or []):
+            for i, item in enumerate(data.get(cls._LIST_KEY) or []):
                 for name, arr in dedup.items():
                     value = arr[i]
                     if value is not None:
-                        image[name] = value
+                        item[name] = value
+
+        return data
+
+
+class _Fields:
+    """
+    Pulls the given fields out of a mapping, keeping everything else inline.
+    """
+
+    _DEDUP_FIELDS = ()
+
+    @classmethod
+    def encode(cls, data):
+        dedup = {}
+
+        if isinstance(data, dict):
+            for name in cls._DEDUP_FIELDS:
+                if name in data:
+                    dedup[name] = data.pop(name)
+
+        return dedup, data
+
+    @classmethod
+    def decode(cls, dedup, data):
+        if isinstance(data, dict):
+            data.update(dedup)
 
         return data
 
 
+class _Whole:
+    """
+    Deduplicates the entire value.
+    """
+
+    @staticmethod
+    def encode(data):
+        return data, None
+
+    @staticmethod
+    def decode(dedup, data):
+        return dedup
+
+
+@_deduplicate_interface("debug_meta")
+class DebugMeta(_ListFields):
+    _LIST_KEY = "images"
+    _DEDUP_FIELDS = ("debug_id", "code_id", "code_file", "debug_file")
+
+
+@_deduplicate_interface("modules", "sdk.packages", "contexts.os", "contexts.runtime")
+class Static(_Whole):
+    pass
+
+
+@_deduplicate_interface("contexts.device")
+class DeviceContext(_Fields):
+    # Properties of the device itself, as opposed to its current state
+    # (memory, battery, orientation, ...) which changes from event to event.
+    _DEDUP_FIELDS = (
+        "type",
+        "name",
+        "family",
+        "model",
+        "model_id",
+        "arch",
+        "manufacturer",
+        "brand",
+        "simulator",
+        "screen_resolution",
+        "screen_density",
+        "screen_dpi",
+        "screen_width_pixels",
+        "screen_height_pixels",
+        "processor_count",
+        "processor_frequency",
+        "cpu_description",
+        "memory_size",
+        "storage_size",
+        "boot_time",
+        "timezone",
+    )
+
+
+def _pop_path(data, path):
+    """
+    Removes the value at ``path`` without mutating the containers shared with
+    the caller: every mapping along the path is shallow-copied first.
+    """
+    *parents, last = path.split(".")
+    container = data
+    for key in parents:
+        child = container.get(key)
+        if not isinstance(child, dict):
+            return False, None
+        container[key] = child = dict(child)
+        container = child
+
+    if last not in container:
+        return False, None
+    return True, container.pop(last)
+
+
+def _set_path(data, path, value):
+    *parents, last = path.split(".")
+    container = data
+    for key in parents:
+        container = container.setdefault(key, {})
+    container[last] = value
+
+
 def deduplicate(data):
+    """
+    Returns a copy of ``data`` with repeating data replaced by patchsets, and
+    the mapping of checksums to the data that was pulled out. ``data`` itself
+    is not modified.
+    """
+    data = dict(data)
     patchsets = []
     extra_keys = {}
 
     for key, interface in _INTERFACES.items():
-        if key not in data:
+        found, value = _pop_path(data, key)
+        if not found:
             continue
 
-        to_deduplicate, to_inline = interface.encode(data.pop(key))
+        to_deduplicate, to_inline = interface.encode(copy.deepcopy(value))
         to_deduplicate_serialized = json.dumps(to_deduplicate, sort_keys=True).encode("utf8")
         checksum = hashlib.md5(to_deduplicate_serialized).hexdigest()
         extra_keys[checksum] = to_deduplicate
@@ -71,19 +197,28 @@ def deduplicate(data):
     return data, extra_keys
 
 
+def get_checksums(data):
+    """
+    Returns the checksums ``assemble`` needs to fetch for ``data``.
+    """
+    return [checksum for key, checksum, inlined in data.get("__nodestore_patchsets") or ()]
+
+
 def assemble(data, get_extra_keys):
     if not data.get("__nodestore_patchsets"):
         return data
 
-    checksums = []
-    for key, checksum, inlined in data["__nodestore_patchsets"]:
-        checksums.append(checksum)
-
-    deduplicated_interfaces = get_extra_keys(checksums)
+    deduplicated_interfaces = get_extra_keys(get_checksums(data))
 
     for key, checksum, inlined in data["__nodestore_patchsets"]:
-        deduplicated = deduplicated_interfaces[checksum]
-        data[key] = _INTERFACES[key].decode(deduplicated, inlined)
+        if checksum not in deduplicated_interfaces:
+            # The deduplicated data is gone, e.g. because it expired. Drop
+            # the interface rather than failing to load the entire event.
+            continue
+        # The same chunk may be assembled into multiple events, which must
+        # not share (and mutate) it.
+        deduplicated = copy.deepcopy(deduplicated_interfaces[checksum])
+        _set_path(data, key, _INTERFACES[key].decode(deduplicated, inlined))
 
     del data["__nodestore_patchsets"]
     return data
@@ -5,10 +5,14 @@ import logging
 __all__ = ["FeatureManager"]
 
 import abc
+import threading
 from collections import defaultdict
+from contextlib import contextmanager
 from typing import (
     TYPE_CHECKING,
     Any,
+    Generator,
+    Hashable,
     Iterable,
     List,
     Mapping,
@@ -16,6 +20,7 @@ from typing import (
     MutableSet,
     Optional,
     Sequence,
+    Tuple,
     Type,
 )
 
@@ -41,6 +46,43 @@ class RegisteredFeatureManager:
 
     def __init__(self) -> None:
         self._handler_registry: MutableMapping[str, List[FeatureHandler]] = defaultdict(list)
+        self._memo = threading.local()
+
+    @contextmanager
+    def memoize(self) -> Generator[None, None, None]:
+        """
+        Remember the outcome of feature checks until the context is exited.
+
+        Serializing a list of objects checks the same features for the same
+        organizations and projects over and over. Nested contexts share the
+        results of the outermost one.
+        """
+        if getattr(self._memo, "results", None) is not None:
+            yield
+            return
+
+        self._memo.results = {}
+        try:
+            yield
+        finally:
+            self._memo.results = None
+
+    def _get_memo(
+        self, *key: Any
+    ) -> Tuple[Optional[MutableMapping[Hashable, Any]], Optional[Hashable]]:
+        """
+        Returns the results remembered by ``memoize`` and the key of a check.
+        Both are None outside of ``memoize``, and for checks that cannot be
+        remembered, e.g. of unsaved models.
+        """
+        memo = getattr(self._memo, "results", None)
+        if memo is None:
+            return None, None
+        try:
+            hash(key)
+        except TypeError:
+            return None, None
+        return memo, key
 
     def add_handler(self, handler: FeatureHandler) -> None:
         """
@@ -96,7 +138,23 @@ class RegisteredFeatureManager:
 
         >>> FeatureManager.has_for_batch('projects:feature', organization, [project1, project2], actor=request.user)
         """
+        memo, memo_key = self._get_memo("has_for_batch", name, organization, actor)
+        if memo is None:
+            return self._has_for_batch(name, organization, objects, actor)
+
+        known = memo.setdefault(memo_key, {})
+        missing = [obj for obj in objects if obj not in known]
+        if missing:
+            known.update(self._has_for_batch(name, organization, missing, actor))
+        return {obj: known[obj] for obj in objects}
 
+    def _has_for_batch(
+        self,
+        name: str,
+        organization: Organization,
+        objects: Sequence[Project],
+        actor: Optional[User] = None,
+    ) -> Mapping[Project, bool]:
         result = dict()
         remaining = set(objects)
 
@@ -213,6 +271,18 @@ class FeatureManager(RegisteredFeatureManager):
         >>> FeatureManager.has('organizations:feature', organization, actor=request.user)
 
         """
+        memo, memo_key = self._get_memo("has", name, args, skip_entity, tuple(kwargs.items()))
+        if memo is not None and memo_key in memo:
+            return memo[memo_key]
+
+        rv = self._has(name, *args, skip_entity=skip_entity, **kwargs)
+        if memo is not None:
+            memo[memo_key] = rv
+        return rv
+
+    def _has(
+        self, name: str, *args: Any, skip_entity: Optional[bool] = False, **kwargs: Any
+    ) -> bool:
         try:
             actor = kwargs.pop("actor", None)
             feature = self.get(name, *args, **kwargs)
@@ -251,13 +321,22 @@ class FeatureManager(RegisteredFeatureManager):
         Will only accept one type of feature, either all ProjectFeatures or all
         OrganizationFeatures.
         """
-        if self._entity_handler:
-            return self._entity_handler.batch_has(
-                feature_names, actor, projects=projects, organization=organization
-            )
-        else:
+        if not self._entity_handler:
             return None
 
+        memo, memo_key = self._get_memo(
+            "batch_has", tuple(feature_names), actor, tuple(projects or ()), organization
+        )
+        if memo is not None and memo_key in memo:
+            return memo[memo_key]
+
+        rv = self._entity_handler.batch_has(
+            feature_names, actor, projects=projects, organization=organization
+        )
+        if memo is not None:
+            memo[memo_key] = rv
+        return rv
+
 
 class FeatureCheckBatch:
     """
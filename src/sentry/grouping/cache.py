@@ -0,0 +1,214 @@
+"""
+Cache of calculated hashes keyed by the grouping relevant parts of an event.
+
+Events in noisy issues usually share their stacktraces, messages and grouping
+config, so the hashes calculated for one of them are valid for all others.
+The cache key is a checksum over exactly the inputs of the grouping
+strategies: the grouping config (including the enhancements), the platform,
+the normalized interfaces grouping reads from and the resolved fingerprint.
+
+Results are kept in a small in-process LRU in front of the shared cache. With
+``grouping.hash-cache.consistency-sample-rate`` a fraction of hits is
+recalculated and compared, which catches inputs missing from the key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+
+from sentry import options
+from sentry.grouping.result import CalculatedHashes
+from sentry.grouping.strategies.configurations import CONFIGURATIONS
+from sentry.grouping.utils import resolve_fingerprint_values
+from sentry.utils import json, metrics
+from sentry.utils.cache import cache
+
+if TYPE_CHECKING:
+    from sentry.eventstore.models import Event
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# The checksum must not depend on the order keys were inserted in, which
+# ``json.dumps`` keeps.
+_dumps_sorted = json.JSONEncoder(
+    separators=(",", ":"),
+    sort_keys=True,
+    ignore_nan=True,
+    default=json.better_default_encoder,
+).encode
+
+# Top level keys of the event payload the grouping strategies read from.
+GROUPING_INTERFACES = (
+    "exception",
+    "stacktrace",
+    "threads",
+    "logentry",
+    "template",
+    "csp",
+    "expectct",
+    "expectstaple",
+    "hpkp",
+)
+
+# Frame attributes that are never used for grouping, but make otherwise
+# identical stacktraces differ between events.
+IGNORED_FRAME_ATTRIBUTES = frozenset(["vars", "pre_context", "post_context"])
+
+
+class LocalHashCache:
+    """
+    A process-wide LRU of calculated hashes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: OrderedDict[str, Any] = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, maxsize):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+local_hash_cache = LocalHashCache()
+
+
+def _strip_frames(value):
+    if isinstance(value, dict):
+        if "frames" in value and isinstance(value["frames"], list):
+            value = dict(value)
+            value["frames"] = [
+                {k: v for k, v in frame.items() if k not in IGNORED_FRAME_ATTRIBUTES}
+                if isinstance(frame, dict)
+                else frame
+                for frame in value["frames"]
+            ]
+        return {k: _strip_frames(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_strip_frames(v) for v in value]
+    return value
+
+
+def get_cache_key(event_data: Mapping[str, Any], config: Mapping[str, Any]) -> str:
+    """
+    Returns the key for the hashes of ``event_data`` under ``config``.
+
+    Must be called after stacktraces were normalized for grouping and server
+    side fingerprinting was applied, as both modify the inputs.
+    """
+    fingerprint = event_data.get("fingerprint") or ["{{ default }}"]
+    inputs = {
+        "config": config,
+        "platform": event_data.get("platform"),
+        "checksum": event_data.get("checksum"),
+        # Resolving the fingerprint pulls in exactly those values outside
+        # of the grouping interfaces (tags, transaction, ...) it refers to.
+        "fingerprint": resolve_fingerprint_values(fingerprint, event_data),
+    }
+    for key in GROUPING_INTERFACES:
+        value = event_data.get(key)
+        if value is not None:
+            inputs[key] = _strip_frames(value)
+
+    checksum = hashlib.md5(_dumps_sorted(inputs).encode("utf-8")).hexdigest()
+    return f"grouping-hashes:{CACHE_VERSION}:{checksum}"
+
+
+def _serialize(hashes: CalculatedHashes) -> Mapping[str, Any]:
+    return {
+        "hashes": list(hashes.hashes),
+        "hierarchical_hashes": list(hashes.hierarchical_hashes),
+        "tree_labels": list(hashes.tree_labels),
+    }
+
+
+def _deserialize(value: Mapping[str, Any]) -> CalculatedHashes:
+    return CalculatedHashes(
+        hashes=list(value["hashes"]),
+        hierarchical_hashes=list(value["hierarchical_hashes"]),
+        tree_labels=list(value["tree_labels"]),
+    )
+
+
+def _get_cached(key: str, metric_tags: Mapping[str, str]) -> Optional[Mapping[str, Any]]:
+    value = local_hash_cache.get(key)
+    if value is not None:
+        metrics.incr("grouping.hash_cache", tags={"result": "local-hit", **metric_tags})
+        return value
+
+    ttl = options.get("grouping.hash-cache.ttl")
+    if ttl > 0:
+        value = cache.get(key)
+        if value is not None:
+            local_hash_cache.set(key, value, options.get("grouping.hash-cache.local-size"))
+            metrics.incr("grouping.hash_cache", tags={"result": "hit", **metric_tags})
+            return value
+
+    metrics.incr("grouping.hash_cache", tags={"result": "miss", **metric_tags})
+    return None
+
+
+def _set_cached(key: str, value: Mapping[str, Any]) -> None:
+    local_hash_cache.set(key, value, options.get("grouping.hash-cache.local-size"))
+    ttl = options.get("grouping.hash-cache.ttl")
+    if ttl > 0:
+        cache.set(key, value, ttl)
+
+
+def get_hashes_cached(event: Event, config: Mapping[str, Any]) -> CalculatedHashes:
+    """
+    Same as ``event.get_hashes(config)``, but served from the cache when an
+    event with the same grouping inputs was seen before.
+    """
+    # Unknown configs raise ``GroupingConfigNotFound`` from ``get_hashes``,
+    # which must not be masked by results cached before they were removed.
+    if not options.get("grouping.hash-cache.enabled") or config["id"] not in CONFIGURATIONS:
+        return event.get_hashes(config)
+
+    metric_tags = {"grouping_config": config["id"]}
+    key = get_cache_key(event.data, config)
+    cached = _get_cached(key, metric_tags)
+
+    if cached is not None:
+        if random.random() >= options.get("grouping.hash-cache.consistency-sample-rate"):
+            return _deserialize(cached)
+
+        value = _serialize(event.get_hashes(config))
+        if value == cached:
+            metrics.incr("grouping.hash_cache.consistency", tags={"result": "match", **metric_tags})
+            return _deserialize(value)
+
+        metrics.incr("grouping.hash_cache.consistency", tags={"result": "mismatch", **metric_tags})
+        logger.warning(
+            "grouping.hash_cache.mismatch",
+            extra={"cache_key": key, "grouping_config": config["id"]},
+        )
+        _set_cached(key, value)
+        return _deserialize(value)
+
+    hashes = event.get_hashes(config)
+    _set_cached(key, _serialize(hashes))
+    return hashes
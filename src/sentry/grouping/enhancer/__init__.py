@@ -1,4 +1,5 @@
 import base64
+import functools
 import os
 import zlib
 
@@ -17,7 +18,10 @@ from .matchers import (
     CallerMatch,
     ExceptionFieldMatch,
     FrameMatch,
+    FunctionMatch,
     Match,
+    MatchCache,
+    ModuleMatch,
     create_match_frame,
 )
 
@@ -70,6 +74,59 @@ _        = space*
 VERSIONS = [1, 2]
 LATEST_VERSION = VERSIONS[-1]
 
+# Glob results shared by all events processed in this worker, see ``MatchCache``.
+MATCH_CACHE = MatchCache(maxsize=100000)
+
+# Matchers which can be used to index rules. Their fields are never modified
+# by actions, so candidates can be determined once per stacktrace.
+INDEXABLE_MATCHERS = (FunctionMatch, ModuleMatch)
+
+
+class RuleIndex:
+    """Buckets rules by the first byte of the literal prefix of one of their
+    function or module matchers, so that for every frame only rules which can
+    possibly match it need to be evaluated. Rules without such a matcher are
+    evaluated against all frames.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._unindexed = []
+        # (field, first byte of prefix) -> positions of rules in ``rules``
+        self._buckets = {}
+
+        for pos, rule in enumerate(rules):
+            matcher = rule._index_matcher
+            if matcher is None:
+                self._unindexed.append(pos)
+            else:
+                key = (matcher.field, matcher._literal_prefix[:1])
+                self._buckets.setdefault(key, []).append(pos)
+
+        self._fields = {field for field, _ in self._buckets}
+
+    def iter_candidates(self, match_frames):
+        """Yields every rule along with the (ascending) indices of the frames
+        it may match, in the order of ``rules``."""
+        frame_indices = [None] * len(self.rules)
+        all_indices = range(len(match_frames))
+        for pos in self._unindexed:
+            frame_indices[pos] = all_indices
+
+        for idx, match_frame in enumerate(match_frames):
+            for field in self._fields:
+                value = match_frame[field]
+                if not value:
+                    continue
+                for pos in self._buckets.get((field, value[:1]), ()):
+                    if frame_indices[pos] is None:
+                        frame_indices[pos] = []
+                    frame_indices[pos].append(idx)
+
+        for rule, indices in zip(self.rules, frame_indices):
+            if indices:
+                yield rule, indices
+
 
 class StacktraceState:
     def __init__(self):
@@ -113,36 +170,36 @@ class Enhancements:
             bases = []
         self.bases = bases
 
-        self._modifier_rules = [rule for rule in self.iter_rules() if rule.is_modifier]
-        self._updater_rules = [rule for rule in self.iter_rules() if rule.is_updater]
+        self._modifier_rules = RuleIndex([rule for rule in self.iter_rules() if rule.is_modifier])
+        self._updater_rules = RuleIndex([rule for rule in self.iter_rules() if rule.is_updater])
 
     def apply_modifications_to_frame(self, frames, platform, exception_data):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
         """
 
-        cache = {}
+        cache = MATCH_CACHE
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
-        for rule in self._modifier_rules:
+        for rule, frame_indices in self._modifier_rules.iter_candidates(match_frames):
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indices
             ):
                 action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
 
     def update_frame_components_contributions(self, components, frames, platform, exception_data):
 
-        cache = {}
+        cache = MATCH_CACHE
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
+        for rule, frame_indices in self._updater_rules.iter_candidates(match_frames):
 
             for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
+                match_frames, platform, exception_data, cache, frame_indices
             ):
                 action.update_frame_components_contributions(components, frames, idx, rule=rule)
                 action.modify_stacktrace_state(stacktrace_state, rule)
@@ -251,6 +308,13 @@ class Enhancements:
     def loads(cls, data):
         if isinstance(data, str):
             data = data.encode("ascii", "ignore")
+        return cls._loads(data)
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _loads(cls, data):
+        # Enhancements are immutable once created, so the same instance (and
+        # its rule indexes) can be reused for every event using this config.
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
             return cls._from_config_structure(
@@ -285,6 +349,18 @@ class Rule:
             else:
                 self._other_matchers.append(matcher)
 
+        # The positive function or module matcher with the longest literal
+        # prefix, used by ``RuleIndex``.
+        self._index_matcher = max(
+            (
+                m
+                for m in self._other_matchers
+                if isinstance(m, INDEXABLE_MATCHERS) and not m.negated and m._literal_prefix
+            ),
+            key=lambda m: len(m._literal_prefix),
+            default=None,
+        )
+
         self.actions = actions
         self._is_updater = any(action.is_updater for action in actions)
         self._is_modifier = any(action.is_modifier for action in actions)
@@ -312,9 +388,13 @@ class Rule:
             matchers[matcher.key] = matcher.pattern
         return {"match": matchers, "actions": [str(x) for x in self.actions]}
 
-    def get_matching_frame_actions(self, frames, platform, exception_data=None, cache=None):
+    def get_matching_frame_actions(
+        self, frames, platform, exception_data=None, cache=None, frame_indices=None
+    ):
         """Given a frame returns all the matching actions based on this rule.
         If the rule does not match `None` is returned.
+
+        `frame_indices` restricts matching to the frames at these indices.
         """
         if not self.matchers:
             return []
@@ -326,8 +406,11 @@ class Rule:
 
         rv = []
 
+        if frame_indices is None:
+            frame_indices = range(len(frames))
+
         # 2 - Check if frame matchers match
-        for idx, frame in enumerate(frames):
+        for idx in frame_indices:
             if all(
                 m.matches_frame(frames, idx, platform, exception_data, cache)
                 for m in self._other_matchers
@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 from typing import Optional
 
 from sentry.grouping.utils import get_rule_bool
@@ -27,6 +29,9 @@ SHORT_MATCH_KEYS = {v: k for k, v in MATCH_KEYS.items()}
 assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are not reused
 
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
+
+# Characters that end the literal part at the start of a glob pattern.
+GLOB_SPECIAL_CHARS = frozenset(b"*?[]{}\\")
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
 
@@ -82,6 +87,46 @@ def create_match_frame(frame_data: dict, platform: Optional[str]) -> dict:
     return match_frame
 
 
+def get_literal_prefix(pattern: bytes) -> bytes:
+    """Returns the part of a glob pattern which has to match literally at the
+    start of a value."""
+    for i, char in enumerate(pattern):
+        if char in GLOB_SPECIAL_CHARS:
+            return pattern[:i]
+    return pattern
+
+
+class MatchCache:
+    """A bounded LRU cache for match results, usable with ``cached``.
+
+    Glob matches only depend on the value and the pattern, so a single
+    instance can be shared by all events and enhancements of a process.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, key):
+        with self._lock:
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
 class Match:
     description = None
 
@@ -242,21 +287,37 @@ class InAppMatch(FrameMatch):
         return ref_val is not None and ref_val == match_frame["in_app"]
 
 
-class FunctionMatch(FrameMatch):
-    def _positive_frame_match(self, match_frame, platform, exception_data, cache):
+class GlobFrameFieldMatch(FrameMatch):
+    """Matches a frame field against a glob pattern. Values which do not
+    start with the literal prefix of the pattern are rejected without running
+    the glob."""
 
-        return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
+    field = None
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._literal_prefix = get_literal_prefix(self._encoded_pattern)
 
-class FrameFieldMatch(FrameMatch):
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         field = match_frame[self.field]
         if field is None:
             return False
 
+        if not field.startswith(self._literal_prefix):
+            return False
+
         return cached(cache, glob_match, field, self._encoded_pattern)
 
 
+class FunctionMatch(GlobFrameFieldMatch):
+
+    field = "function"
+
+
+class FrameFieldMatch(GlobFrameFieldMatch):
+    pass
+
+
 class ModuleMatch(FrameFieldMatch):
 
     field = "module"
@@ -0,0 +1,25 @@
+# Note: It must be possible to import this module directly without having to
+# initialize Sentry, as `decode_message` runs in processes spawned by the
+# parallel ingest consumer.
+from typing import Any, Mapping
+
+import msgpack
+from arroyo.backends.kafka import KafkaPayload
+from arroyo.types import Message
+
+from sentry.utils import json
+
+
+def decode_payload(value: bytes) -> Mapping[str, Any]:
+    """
+    Decodes an ingest message. The JSON payload of events is parsed as well
+    and passed on as ``data``, so that `_load_event` does not have to.
+    """
+    message = msgpack.unpackb(value, use_list=False)
+    if message["type"] == "event":
+        message["data"] = json.loads(message.pop("payload"))
+    return message
+
+
+def decode_message(message: Message[KafkaPayload]) -> Mapping[str, Any]:
+    return decode_payload(message.payload.value)
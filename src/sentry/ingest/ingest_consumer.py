@@ -6,6 +6,7 @@ from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import (
     Any,
     Callable,
+    List,
     Mapping,
     MutableMapping,
     MutableSequence,
@@ -19,6 +20,16 @@ from typing import (
 
 import msgpack
 import sentry_sdk
+from arroyo import Topic
+from arroyo.backends.kafka import KafkaConsumer, KafkaPayload
+from arroyo.backends.kafka.configuration import build_kafka_consumer_configuration
+from arroyo.commit import IMMEDIATE
+from arroyo.processing import StreamProcessor
+from arroyo.processing.strategies import ProcessingStrategy, ProcessingStrategyFactory
+from arroyo.processing.strategies.collect import CollectStep
+from arroyo.processing.strategies.transform import ParallelTransformStep
+from arroyo.types import Message as ArroyoMessage
+from arroyo.types import Partition, Position
 from django.conf import settings
 from django.core.cache import cache
 
@@ -26,6 +37,7 @@ from sentry import eventstore, features
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.event_manager import save_attachment
 from sentry.eventstore.processing import event_processing_store
+from sentry.ingest.decoding import decode_message
 from sentry.ingest.types import ConsumerType
 from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
@@ -37,6 +49,7 @@ from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
 from sentry.utils.dates import to_datetime
 from sentry.utils.kafka import create_batching_kafka_consumer
+from sentry.utils.kafka_config import get_kafka_consumer_cluster_options
 from sentry.utils.sdk import mark_scope_as_unsafe
 
 logger = logging.getLogger(__name__)
@@ -188,7 +201,6 @@ def _load_event(
     processing after the event has been persisted and is available to be read by
     other processing components.
     """
-    payload = message["payload"]
     start_time = float(message["start_time"])
     event_id = message["event_id"]
     project_id = int(message["project_id"])
@@ -247,7 +259,12 @@ def _load_event(
     # serializing it again.
     # XXX: Do not use CanonicalKeyDict here. This may break preprocess_event
     # which assumes that data passed in is a raw dictionary.
-    data = json.loads(payload)
+    #
+    # Messages decoded by the parallel consumer have been parsed already.
+    if "data" in message:
+        data = message["data"]
+    else:
+        data = json.loads(message["payload"])
 
     if project_id == settings.SENTRY_PROJECT:
         metrics.incr(
@@ -435,3 +452,148 @@ def get_ingest_consumer(
     return create_batching_kafka_consumer(
         topic_names=topic_names, worker=IngestConsumerWorker(executor), **options
     )
+
+
+class DecodedMessageBatch(ProcessingStrategy[Message]):
+    """
+    Collects messages that have been decoded by `decode_message` already and
+    flushes them with `IngestConsumerWorker` once `CollectStep` closes the
+    batch.
+    """
+
+    def __init__(self, worker: IngestConsumerWorker) -> None:
+        self.__worker = worker
+        self.__batch: List[Message] = []
+        self.__closed = False
+
+    def poll(self) -> None:
+        pass
+
+    def submit(self, message: ArroyoMessage[Message]) -> None:
+        assert not self.__closed
+        self.__batch.append(message.payload)
+
+    def close(self) -> None:
+        self.__closed = True
+
+    def terminate(self) -> None:
+        self.__closed = True
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self.__batch:
+            self.__worker.flush_batch(self.__batch)
+            self.__batch = []
+
+
+class ParallelIngestStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
+    """
+    Decodes messages, including the JSON payload of events, in a pool of
+    worker processes before flushing them in batches on the main process.
+
+    Decoded messages are passed back through shared memory blocks in the
+    order they were consumed in, so offsets are still committed in order and
+    only after the batch containing them was flushed.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        max_batch_size: int,
+        max_batch_time: int,
+        max_parallel_batch_size: int,
+        max_parallel_batch_time: int,
+        input_block_size: int,
+        output_block_size: int,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.__processes = processes
+        self.__max_batch_size = max_batch_size
+        self.__max_batch_time = max_batch_time
+        self.__max_parallel_batch_size = max_parallel_batch_size
+        self.__max_parallel_batch_time = max_parallel_batch_time
+        self.__input_block_size = input_block_size
+        self.__output_block_size = output_block_size
+        self.__executor = executor
+
+    def create_with_partitions(
+        self,
+        commit: Callable[[Mapping[Partition, Position]], None],
+        partitions: Mapping[Partition, int],
+    ) -> ProcessingStrategy[KafkaPayload]:
+        worker = IngestConsumerWorker(self.__executor)
+
+        return ParallelTransformStep(
+            decode_message,
+            CollectStep(
+                lambda: DecodedMessageBatch(worker),
+                commit,
+                self.__max_batch_size,
+                # This is in seconds
+                self.__max_batch_time / 1000,
+            ),
+            self.__processes,
+            max_batch_size=self.__max_parallel_batch_size,
+            # This is in seconds
+            max_batch_time=self.__max_parallel_batch_time / 1000,
+            input_block_size=self.__input_block_size,
+            output_block_size=self.__output_block_size,
+        )
+
+
+def get_parallel_ingest_consumer(
+    consumer_types,
+    processes: int,
+    max_batch_size: int,
+    max_batch_time: int,
+    max_parallel_batch_size: int,
+    max_parallel_batch_time: int,
+    input_block_size: int,
+    output_block_size: int,
+    group_id: str,
+    auto_offset_reset: str,
+    force_topic: Optional[str] = None,
+    force_cluster: Optional[str] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> StreamProcessor[KafkaPayload]:
+    """
+    Same as `get_ingest_consumer`, but decodes messages in ``processes``
+    worker processes. Only a single topic can be consumed.
+    """
+    if force_topic and force_cluster:
+        topic_name, cluster_name = force_topic, force_cluster
+    elif force_topic or force_cluster:
+        raise ValueError(
+            "Both 'force_topic' and 'force_cluster' have to be provided to override the configuration"
+        )
+    else:
+        topic_names = {
+            ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types
+        }
+        if len(topic_names) > 1:
+            raise ValueError(
+                f"Cannot launch parallel ingest consumer listening to multiple topics ({topic_names})"
+            )
+        (topic_name,) = topic_names
+        cluster_name = settings.KAFKA_TOPICS[topic_name]["cluster"]
+
+    return StreamProcessor(
+        KafkaConsumer(
+            build_kafka_consumer_configuration(
+                get_kafka_consumer_cluster_options(cluster_name),
+                group_id=group_id,
+                auto_offset_reset=auto_offset_reset,
+            )
+        ),
+        Topic(topic_name),
+        ParallelIngestStrategyFactory(
+            processes=processes,
+            max_batch_size=max_batch_size,
+            max_batch_time=max_batch_time,
+            max_parallel_batch_size=max_parallel_batch_size,
+            max_parallel_batch_time=max_parallel_batch_time,
+            input_block_size=input_block_size,
+            output_block_size=output_block_size,
+            executor=executor,
+        ),
+        IMMEDIATE,
+    )
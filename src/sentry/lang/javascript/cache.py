@@ -1,8 +1,12 @@
+import threading
+from collections import OrderedDict
+
 from symbolic import SourceView
 
+from sentry.utils import metrics
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ParsedSourceMapCache", "parsed_sourcemap_cache"]
 
 
 def is_utf8(codec):
@@ -90,3 +94,61 @@ class SourceMapCache:
             sourcemap = self.get(sourcemap_url)
             return (sourcemap_url, sourcemap)
         return (None, None)
+
+
+class ParsedSourceMapCache:
+    """
+    A process-wide LRU of parsed source maps (``SourceMapView`` and
+    ``SourceMapCache`` from symbolic), shared by the events processed in one
+    worker. It is bounded by the total size of the contents the source maps
+    were parsed from.
+
+    Parsed source maps are never modified after they were created, and keys
+    include a checksum of those contents, so entries never go stale.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (size, sourcemap_view)
+        self._items = OrderedDict()
+        self._size = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+
+        metrics.incr("sourcemaps.parsed_cache", tags={"result": "miss" if item is None else "hit"})
+        return item[1] if item is not None else None
+
+    def set(self, key, sourcemap_view, size, max_bytes):
+        if size > max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old[0]
+            self._items[key] = (size, sourcemap_view)
+            self._size += size
+
+            while self._size > max_bytes:
+                _, (evicted_size, _) = self._items.popitem(last=False)
+                self._size -= evicted_size
+                metrics.incr("sourcemaps.parsed_cache.evicted")
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+parsed_sourcemap_cache = ParsedSourceMapCache()
@@ -1,10 +1,14 @@
 import base64
 import errno
+import hashlib
 import logging
 import re
 import sys
+import threading
 import time
 import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from io import BytesIO
 from os.path import splitext
@@ -13,16 +17,23 @@ from urllib.parse import urlsplit
 
 import sentry_sdk
 from django.conf import settings
+from django.db import connections
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 from requests.utils import get_encoding_from_headers
+from sentry_sdk import Hub
 from symbolic import SourceMapCache as SmCache
 from symbolic import SourceMapView
 
 from sentry import features, http, options
 from sentry.event_manager import set_tag
 from sentry.models import EventError, Organization, ReleaseFile
-from sentry.models.releasefile import ARTIFACT_INDEX_FILENAME, ReleaseArchive, read_artifact_index
+from sentry.models.releasefile import (
+    ARTIFACT_INDEX_FILENAME,
+    IndexedReleaseArchive,
+    ReleaseArchive,
+    read_artifact_index,
+)
 from sentry.stacktraces.processing import StacktraceProcessor
 from sentry.utils import json, metrics
 
@@ -37,7 +48,7 @@ from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path, set_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import SourceCache, SourceMapCache, parsed_sourcemap_cache
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -350,11 +361,14 @@ def result_from_cache(filename, result):
 
 
 @metrics.wraps("sourcemaps.release_file")
-def fetch_release_file(filename, release, dist=None):
+def fetch_release_file(filename, release, dist=None, prefetched_files=None):
     """
     Attempt to retrieve a release artifact from the database.
 
     Caches the result of that attempt (whether successful or not).
+
+    ``prefetched_files`` is the result of `prefetch_release_files`, which
+    saves the database query if it covers ``filename``.
     """
     dist_name = dist and dist.name or None
     cache_key, cache_key_meta = get_cache_keys(filename, release, dist)
@@ -372,13 +386,22 @@ def fetch_release_file(filename, release, dist=None):
                 "Checking database for release artifact %r (release_id=%s)", filename, release.id
             )
 
-            possible_files = list(
-                ReleaseFile.objects.filter(
-                    release_id=release.id,
-                    dist_id=dist.id if dist else dist,
-                    ident__in=filename_idents,
-                ).select_related("file")
-            )
+            if prefetched_files is not None and all(
+                ident in prefetched_files for ident in filename_idents
+            ):
+                possible_files = [
+                    prefetched_files[ident]
+                    for ident in filename_idents
+                    if prefetched_files[ident] is not None
+                ]
+            else:
+                possible_files = list(
+                    ReleaseFile.objects.filter(
+                        release_id=release.id,
+                        dist_id=dist.id if dist else dist,
+                        ident__in=filename_idents,
+                    ).select_related("file")
+                )
 
             if len(possible_files) == 0:
                 logger.debug(
@@ -470,6 +493,10 @@ def get_index_entry(release, dist, url) -> Optional[dict]:
         logger.error("sourcemaps.index_read_failed", exc_info=exc)
         return None
 
+    return find_index_entry(index, url)
+
+
+def find_index_entry(index, url) -> Optional[dict]:
     if index:
         for candidate in ReleaseFile.normalize(url):
             entry = index.get("files", {}).get(candidate)
@@ -479,14 +506,58 @@ def get_index_entry(release, dist, url) -> Optional[dict]:
     return None
 
 
+def prefetch_release_files(urls, release, dist):
+    """
+    Looks up the release files of all ``urls`` whose artifacts are not cached
+    yet with a single query. This covers both individually uploaded files and
+    the archives the artifact index maps the urls to.
+
+    Returns a mapping of all looked up release file idents to the
+    `ReleaseFile`, or ``None`` if there is no such file. `fetch_file` takes
+    it as ``prefetched_files``.
+    """
+    dist_name = dist and dist.name or None
+    cache_keys = {url: get_cache_keys(url, release, dist)[0] for url in urls}
+    cached = cache.get_many(list(cache_keys.values()))
+
+    try:
+        index = get_artifact_index(release, dist)
+    except Exception as exc:
+        logger.error("sourcemaps.index_read_failed", exc_info=exc)
+        index = None
+
+    idents = set()
+    for url, cache_key in cache_keys.items():
+        if cached.get(cache_key) is not None:
+            continue
+        idents.update(ReleaseFile.get_ident(f, dist_name) for f in ReleaseFile.normalize(url))
+        entry = find_index_entry(index, url)
+        if entry is not None:
+            idents.add(entry["archive_ident"])
+
+    if not idents:
+        return {}
+
+    with metrics.timer("sourcemaps.prefetch_release_files"):
+        prefetched_files = dict.fromkeys(idents)
+        for releasefile in ReleaseFile.objects.filter(
+            release_id=release.id, dist_id=dist.id if dist else dist, ident__in=idents
+        ).select_related("file"):
+            prefetched_files[releasefile.ident] = releasefile
+
+    return prefetched_files
+
+
 @metrics.wraps("sourcemaps.fetch_release_archive")
-def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
+def fetch_release_archive_for_url(release, dist, url, prefetched_files=None) -> Optional[IO]:
     """Fetch release archive and cache if possible.
 
     Multiple archives might have been uploaded, so we need the URL
     to get the correct archive from the artifact index.
 
     If return value is not empty, the caller is responsible for closing the stream.
+
+    ``prefetched_files`` is the result of `prefetch_release_files`.
     """
     with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_index_entry"):
         info = get_index_entry(release, dist, url)
@@ -511,10 +582,17 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
     else:
         try:
             with sentry_sdk.start_span(op="fetch_release_archive_for_url.get_releasefile_db_entry"):
-                qs = ReleaseFile.objects.filter(
-                    release_id=release.id, dist_id=dist.id if dist else dist, ident=archive_ident
-                ).select_related("file")
-                releasefile = qs[0]
+                if prefetched_files is not None and archive_ident in prefetched_files:
+                    releasefile = prefetched_files[archive_ident]
+                    if releasefile is None:
+                        raise IndexError(archive_ident)
+                else:
+                    qs = ReleaseFile.objects.filter(
+                        release_id=release.id,
+                        dist_id=dist.id if dist else dist,
+                        ident=archive_ident,
+                    ).select_related("file")
+                    releasefile = qs[0]
         except IndexError:
             # This should not happen when there is an archive_ident in the manifest
             logger.error("sourcemaps.missing_archive", exc_info=sys.exc_info())
@@ -556,13 +634,55 @@ def fetch_release_archive_for_url(release, dist, url) -> Optional[IO]:
             return file_
 
 
+@metrics.wraps("sourcemaps.fetch_indexed_release_archive")
+def fetch_indexed_release_archive_for_url(
+    release, dist, url, prefetched_files=None
+) -> Optional[Tuple[IndexedReleaseArchive, dict]]:
+    """Open the release archive containing ``url`` with `IndexedReleaseArchive`.
+
+    As opposed to `fetch_release_archive_for_url`, the archive is neither
+    loaded nor cached as a whole.
+
+    Returns the archive and the entry of ``url`` in the artifact index. If
+    return value is not empty, the caller is responsible for closing the archive.
+    """
+    info = get_index_entry(release, dist, url)
+    if info is None:
+        return None
+
+    archive_ident = info["archive_ident"]
+    if prefetched_files is not None and archive_ident in prefetched_files:
+        releasefile = prefetched_files[archive_ident]
+    else:
+        releasefile = (
+            ReleaseFile.objects.filter(
+                release_id=release.id, dist_id=dist.id if dist else dist, ident=archive_ident
+            )
+            .select_related("file")
+            .first()
+        )
+
+    if releasefile is None:
+        # This should not happen when there is an archive_ident in the manifest
+        logger.error("sourcemaps.missing_archive", extra={"archive_ident": archive_ident})
+        return None
+
+    try:
+        archive = fetch_retry_policy(lambda: IndexedReleaseArchive.from_file(releasefile.file))
+    except Exception:
+        logger.error("sourcemaps.read_archive_failed", exc_info=sys.exc_info())
+        return None
+
+    return archive, info
+
+
 def compress(fp: IO) -> Tuple[bytes, bytes]:
     """Alternative for compress_file when fp does not support chunks"""
     content = fp.read()
     return zlib.compress(content), content
 
 
-def fetch_release_artifact(url, release, dist):
+def fetch_release_artifact(url, release, dist, prefetched_files=None):
     """
     Get a release artifact either by extracting it or fetching it directly.
 
@@ -580,10 +700,52 @@ def fetch_release_artifact(url, release, dist):
         return result_from_cache(url, result)
 
     start = time.monotonic()
-    with sentry_sdk.start_span(
-        op="JavaScriptStacktraceProcessor.fetch_release_artifact.fetch_release_archive_for_url"
-    ):
-        archive_file = fetch_release_archive_for_url(release, dist, url)
+    if options.get("sourcemaps.indexed-archive-reader.enabled"):
+        # The archive is not loaded as a whole, so there is no file to fall
+        # back to below.
+        archive_file = None
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.fetch_release_artifact.fetch_indexed_release_archive_for_url"
+        ):
+            indexed = fetch_indexed_release_archive_for_url(release, dist, url, prefetched_files)
+        if indexed is not None:
+            archive, info = indexed
+            with archive:
+                try:
+                    fp = archive.open(info["filename"])
+                except KeyError:
+                    # The manifest mapped the url to an archive, but the file
+                    # is not there.
+                    logger.error(
+                        "Release artifact %r not found in archive %s", url, info["archive_ident"]
+                    )
+                    cache.set(cache_key, -1, 60)
+                    metrics.timing(
+                        "sourcemaps.release_artifact_from_archive", time.monotonic() - start
+                    )
+                    return None
+                except Exception as exc:
+                    logger.error("Failed to read %s from release %s", url, release.id, exc_info=exc)
+                else:
+                    result = fetch_and_cache_artifact(
+                        url,
+                        lambda: fp,
+                        cache_key,
+                        cache_key_meta,
+                        info.get("headers", {}),
+                        compress_fn=compress,
+                    )
+                    metrics.timing(
+                        "sourcemaps.release_artifact_from_archive", time.monotonic() - start
+                    )
+
+                    return result
+    else:
+        with sentry_sdk.start_span(
+            op="JavaScriptStacktraceProcessor.fetch_release_artifact.fetch_release_archive_for_url"
+        ):
+            archive_file = fetch_release_archive_for_url(release, dist, url, prefetched_files)
+
     if archive_file is not None:
         try:
             archive = ReleaseArchive(archive_file)
@@ -635,12 +797,20 @@ def fetch_release_artifact(url, release, dist):
     with sentry_sdk.start_span(
         op="JavaScriptStacktraceProcessor.fetch_release_artifact.fetch_release_file"
     ):
-        result = fetch_release_file(url, release, dist)
+        result = fetch_release_file(url, release, dist, prefetched_files)
 
     return result
 
 
-def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
+def fetch_file(
+    url,
+    project=None,
+    release=None,
+    dist=None,
+    allow_scraping=True,
+    prefetched_files=None,
+    domain_limiter=None,
+):
     """
     Pull down a URL, returning a UrlResult object.
 
@@ -648,6 +818,9 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
     event), then the internet. Caches the result of each of those two attempts
     separately, whether or not those attempts are successful. Used for both
     source files and source maps.
+
+    ``prefetched_files`` is the result of `prefetch_release_files` and
+    ``domain_limiter`` a `DomainLimiter` bounding concurrent requests.
     """
     # If our url has been truncated, it'd be impossible to fetch
     # so we check for this early and bail
@@ -659,7 +832,7 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.fetch_file.fetch_release_artifact"
         ):
-            result = fetch_release_artifact(url, release, dist)
+            result = fetch_release_artifact(url, release, dist, prefetched_files)
     else:
         result = None
 
@@ -699,7 +872,10 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
 
         with metrics.timer("sourcemaps.fetch"):
             with sentry_sdk.start_span(op="JavaScriptStacktraceProcessor.fetch_file.http"):
-                result = http.fetch_file(url, headers=headers, verify_ssl=verify_ssl)
+                # Other fetches may lock the domain while this one waits for
+                # the limiter, which `http.fetch_file` checks first thing.
+                with domain_limiter(url) if domain_limiter is not None else nullcontext():
+                    result = http.fetch_file(url, headers=headers, verify_ssl=verify_ssl)
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.fetch_file.compress_for_cache"
             ):
@@ -770,6 +946,41 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
     return result
 
 
+class DomainLimiter:
+    """
+    Bounds the number of concurrent requests to every domain.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __call__(self, url):
+        domain = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.get(domain)
+            if semaphore is None:
+                semaphore = self._semaphores[domain] = threading.BoundedSemaphore(self.limit)
+        return semaphore
+
+
+def _run_fetch(hub, fetch_fn, *args, **kwargs):
+    """
+    Runs ``fetch_fn`` in a worker thread of `fetch_sources`, returning the
+    result and the `http.BadSource` it raised, if any.
+    """
+    with hub:
+        try:
+            return fetch_fn(*args, **kwargs), None
+        except http.BadSource as exc:
+            return None, exc
+        finally:
+            # Worker threads are discarded along with the executor, their
+            # database connections would be left open otherwise.
+            connections.close_all()
+
+
 def get_max_age(headers):
     cache_control = headers.get("cache-control")
     max_age = CACHE_CONTROL_MIN
@@ -783,7 +994,15 @@ def get_max_age(headers):
 
 # TODO(smcache): Remove unnecessary `use_smcache` flag.
 def fetch_sourcemap(
-    url, source=b"", project=None, release=None, dist=None, allow_scraping=True, use_smcache=True
+    url,
+    source=b"",
+    project=None,
+    release=None,
+    dist=None,
+    allow_scraping=True,
+    use_smcache=True,
+    prefetched_files=None,
+    domain_limiter=None,
 ):
     if is_data_uri(url):
         try:
@@ -805,26 +1024,64 @@ def fetch_sourcemap(
                 release=release,
                 dist=dist,
                 allow_scraping=allow_scraping,
+                prefetched_files=prefetched_files,
+                domain_limiter=domain_limiter,
             )
         body = result.body
+
+    max_bytes = options.get("sourcemaps.parsed-cache.max-bytes")
+    if max_bytes > 0:
+        parsed_cache_key = get_parsed_sourcemap_cache_key(
+            url, source, body, release, dist, use_smcache
+        )
+        sourcemap_view = parsed_sourcemap_cache.get(parsed_cache_key)
+        if sourcemap_view is not None:
+            return sourcemap_view
+
     try:
         # TODO(smcache): Remove unnecessary `use_smcache` flag and use `SmCache` only.
         if use_smcache:
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.fetch_sourcemap.SmCache.from_bytes"
             ):
-                return SmCache.from_bytes(source, body)
+                sourcemap_view = SmCache.from_bytes(source, body)
         else:
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.fetch_sourcemap.SourceMapView.from_json_bytes"
             ):
-                return SourceMapView.from_json_bytes(body)
+                sourcemap_view = SourceMapView.from_json_bytes(body)
 
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(str(exc), exc_info=True)
         raise UnparseableSourcemap({"url": http.expose_url(url)})
 
+    if max_bytes > 0:
+        size = len(body) + (len(source) if use_smcache else 0)
+        parsed_sourcemap_cache.set(parsed_cache_key, sourcemap_view, size, max_bytes)
+
+    return sourcemap_view
+
+
+def get_parsed_sourcemap_cache_key(url, source, body, release, dist, use_smcache):
+    """
+    Returns the key of a parsed source map in `parsed_sourcemap_cache`. A
+    ``SourceMapCache`` is built from both the minified source and the map, so
+    both are part of its key.
+    """
+    checksum = hashlib.sha1(body)
+    if use_smcache:
+        checksum.update(force_bytes(source))
+
+    return (
+        "smcache" if use_smcache else "sourcemap",
+        release.id if release else None,
+        dist.id if dist else None,
+        # Data URIs embed the entire map, which the checksum covers already.
+        None if is_data_uri(url) else url,
+        checksum.hexdigest(),
+    )
+
 
 def is_data_uri(url):
     return url[:BASE64_PREAMBLE_LENGTH] == BASE64_SOURCEMAP_PREAMBLE
@@ -1349,10 +1606,13 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             cache.add_error(filename, exc.data)
             return
 
+        self.cache_sourcemap_view(sourcemap_url, sourcemap_view)
+
+    def cache_sourcemap_view(self, sourcemap_url, sourcemap_view):
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.cache_source.cache_sourcemap_view"
         ) as span:
-            sourcemaps.add(sourcemap_url, sourcemap_view)
+            self.sourcemaps.add(sourcemap_url, sourcemap_view)
 
             # TODO(smcache): Remove this whole iteration block
             if not isinstance(self, JavaScriptSmCacheStacktraceProcessor):
@@ -1365,6 +1625,114 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                             non_standard_url_join(sourcemap_url, source_name), source_view
                         )
 
+    def fetch_sources(self, filenames):
+        """
+        Same as calling `cache_source` for every one of ``filenames``, but all
+        release files are looked up in bulk and the sources and source maps
+        are fetched concurrently.
+
+        Source maps are only known once the sources are fetched, so this runs
+        in two rounds: first all sources, then all of their source maps.
+        Results are added to the caches on the calling thread, in the order of
+        ``filenames``.
+        """
+        filenames = list(filenames)
+        budget = max(self.max_fetches - self.fetch_count, 0)
+        self.fetch_count += len(filenames)
+        for filename in filenames[budget:]:
+            self.cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+        filenames = filenames[:budget]
+        if not filenames:
+            return
+
+        fetch_kwargs = {
+            "project": self.project,
+            "release": self.release,
+            "dist": self.dist,
+            "allow_scraping": self.allow_scraping,
+            "domain_limiter": DomainLimiter(options.get("sourcemaps.fetch-concurrency-per-domain")),
+        }
+
+        def fetch_all(executor, fetch_fn, calls):
+            prefetched_files = None
+            if self.release:
+                with sentry_sdk.start_span(
+                    op="JavaScriptStacktraceProcessor.fetch_sources.prefetch_release_files"
+                ):
+                    prefetched_files = prefetch_release_files(
+                        [url for url, _ in calls if not is_data_uri(url)], self.release, self.dist
+                    )
+
+            futures = [
+                executor.submit(
+                    _run_fetch,
+                    Hub(Hub.current),
+                    fetch_fn,
+                    url,
+                    prefetched_files=prefetched_files,
+                    **fetch_kwargs,
+                    **kwargs,
+                )
+                for url, kwargs in calls
+            ]
+            return [future.result() for future in futures]
+
+        with ThreadPoolExecutor(
+            max_workers=max(options.get("sourcemaps.fetch-concurrency"), 1)
+        ) as executor:
+            pending_sourcemaps = {}
+            results = fetch_all(executor, fetch_file, [(filename, {}) for filename in filenames])
+            for filename, (result, exc) in zip(filenames, results):
+                if exc is not None:
+                    # See `cache_source` on why missing node_modules are fine.
+                    if not (
+                        exc.data["type"] == EventError.JS_MISSING_SOURCE
+                        and "node_modules" in filename
+                    ):
+                        self.cache.add_error(filename, exc.data)
+                    continue
+
+                self.cache.add(filename, result.body, result.encoding)
+                self.cache.alias(result.url, filename)
+
+                sourcemap_url = discover_sourcemap(result)
+                if not sourcemap_url:
+                    continue
+
+                logger.debug(
+                    "Found sourcemap URL %r for minified script %r",
+                    sourcemap_url[:256],
+                    result.url,
+                )
+                self.sourcemaps.link(filename, sourcemap_url)
+                if sourcemap_url not in self.sourcemaps:
+                    # Like `cache_source`, a source map shared by several
+                    # sources is built from the first of them.
+                    pending_sourcemaps.setdefault(sourcemap_url, (result.body, []))[1].append(
+                        filename
+                    )
+
+            if not pending_sourcemaps:
+                return
+
+            # TODO(smcache): Remove unnecessary `use_smcache` flag.
+            use_smcache = isinstance(self, JavaScriptSmCacheStacktraceProcessor)
+            results = fetch_all(
+                executor,
+                fetch_sourcemap,
+                [
+                    (sourcemap_url, {"source": source, "use_smcache": use_smcache})
+                    for sourcemap_url, (source, _) in pending_sourcemaps.items()
+                ],
+            )
+            for sourcemap_url, (sourcemap_view, exc) in zip(pending_sourcemaps, results):
+                if exc is not None:
+                    for filename in pending_sourcemaps[sourcemap_url][1]:
+                        self.cache.add_error(filename, exc.data)
+                    continue
+
+                self.cache_sourcemap_view(sourcemap_url, sourcemap_view)
+
     def populate_source_cache(self, frames):
         """
         Fetch all sources that we know are required (being referenced directly
@@ -1386,6 +1754,13 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
+        if options.get("sourcemaps.fetch-planner.enabled"):
+            with sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.populate_source_cache.fetch_sources"
+            ):
+                self.fetch_sources(pending_file_list)
+            return
+
         for idx, filename in enumerate(pending_file_list):
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
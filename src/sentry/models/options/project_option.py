@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Sequence
 
 from django.db import models, transaction
 
@@ -71,6 +71,31 @@ class ProjectOptionManager(OptionManager["Project"]):
             result[instance_map[obj.project_id]] = obj.value
         return result
 
+    def get_all_values_bulk(self, projects: Sequence[Project]) -> Mapping[int, Mapping[str, Value]]:
+        """Loads the options of all ``projects`` into the local cache at once.
+
+        Equivalent to ``get_all_values`` for every project, but with a single
+        cache and database roundtrip for all projects not cached yet.
+        """
+        cache_keys = {self._make_key(project.id): project.id for project in projects}
+        missing = [key for key in cache_keys if key not in self._option_cache]
+        if missing:
+            for cache_key, result in cache.get_many(missing).items():
+                if result is not None:
+                    self._option_cache[cache_key] = result
+
+            reload_ids = [cache_keys[key] for key in missing if key not in self._option_cache]
+            if reload_ids:
+                results: Dict[int, Dict[str, Value]] = {project_id: {} for project_id in reload_ids}
+                for option in self.filter(project__in=reload_ids):
+                    results[option.project_id][option.key] = option.value
+
+                results_by_key = {self._make_key(pid): result for pid, result in results.items()}
+                cache.set_many(results_by_key)
+                self._option_cache.update(results_by_key)
+
+        return {project_id: self._option_cache[key] for key, project_id in cache_keys.items()}
+
     def get_value(
         self,
         project: Project,
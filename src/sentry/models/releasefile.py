@@ -1,7 +1,9 @@
 import errno
 import logging
 import os
+import struct
 import zipfile
+import zlib
 from contextlib import contextmanager
 from hashlib import sha1
 from io import BytesIO
@@ -27,6 +29,7 @@ from sentry.models.distribution import Distribution
 from sentry.models.file import File
 from sentry.models.release import Release
 from sentry.utils import json, metrics
+from sentry.utils.cache import cache
 from sentry.utils.db import atomic_transaction
 from sentry.utils.hashlib import sha1_text
 from sentry.utils.zip import safe_extract_zip
@@ -37,6 +40,10 @@ logger = logging.getLogger(__name__)
 ARTIFACT_INDEX_FILENAME = "artifact-index.json"
 ARTIFACT_INDEX_TYPE = "release.artifact-index"
 
+# Layout of the local file header preceding every member of a ZIP archive.
+_LOCAL_FILE_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+
 
 class PublicReleaseFileManager(models.Manager):
     """Manager for all release files that are not internal.
@@ -228,6 +235,109 @@ class ReleaseArchive:
         return temp_dir
 
 
+def read_archive_index(fileobj: IO) -> dict:
+    """Read the central directory of a ZIP-archive.
+
+    Maps the name of every member to its offset, compression method,
+    compressed size, size and CRC. Only the end of the archive is read.
+    """
+    with zipfile.ZipFile(fileobj) as zip_file:
+        return {
+            info.filename: [
+                info.header_offset,
+                info.compress_type,
+                info.compress_size,
+                info.file_size,
+                info.CRC,
+            ]
+            for info in zip_file.infolist()
+        }
+
+
+def get_archive_index(file: File) -> dict:
+    """Get the central directory of an uploaded ZIP-archive.
+
+    Archives are immutable, so the index is cached by checksum.
+    """
+    cache_key = f"release-archive-index:v1:{file.checksum}"
+    if file.checksum is not None:
+        index = cache.get(cache_key)
+        if index is not None:
+            metrics.incr("releasefile.archive_index", tags={"result": "hit"})
+            return index
+
+    metrics.incr("releasefile.archive_index", tags={"result": "miss"})
+    with metrics.timer("releasefile.read_archive_index"), file.getfile() as fp:
+        index = read_archive_index(fp)
+
+    if file.checksum is not None:
+        cache.set(cache_key, index, 3600)
+
+    return index
+
+
+class IndexedReleaseArchive:
+    """Read-only view of uploaded ZIP-archive of release files
+
+    Unlike `ReleaseArchive`, members are read straight from their offsets in
+    the central directory, which is cached by `get_archive_index`. As the
+    blobs of a `File` are loaded on demand, reading a member only loads
+    the blobs it is stored in.
+    """
+
+    def __init__(self, fileobj: IO, index: dict):
+        self._fileobj = fileobj
+        self._index = index
+
+    @classmethod
+    def from_file(cls, file: File) -> "IndexedReleaseArchive":
+        return cls(file.getfile(), get_archive_index(file))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self._fileobj.close()
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._index
+
+    def read(self, filename: str) -> bytes:
+        """Read a member of the archive.
+
+        May raise ``KeyError``
+        """
+        header_offset, compress_type, compress_size, file_size, crc = self._index[filename]
+        if compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            self._fileobj.seek(0)
+            with zipfile.ZipFile(self._fileobj) as zip_file:
+                return zip_file.read(filename)
+
+        self._fileobj.seek(header_offset)
+        header = _LOCAL_FILE_HEADER.unpack(self._fileobj.read(_LOCAL_FILE_HEADER.size))
+        if header[0] != _LOCAL_FILE_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad magic number for file header of {filename!r}")
+
+        # The lengths of file name and extra field can differ from the ones
+        # in the central directory, so they are taken from the local header.
+        self._fileobj.seek(header_offset + _LOCAL_FILE_HEADER.size + header[10] + header[11])
+        data = self._fileobj.read(compress_size)
+        if compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS)
+
+        if len(data) != file_size or zlib.crc32(data) != crc:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {filename!r}")
+
+        return data
+
+    def open(self, filename: str) -> IO:
+        """Return a file-like object for a member of the archive.
+
+        May raise ``KeyError``
+        """
+        return BytesIO(self.read(filename))
+
+
 class _ArtifactIndexData:
     """Holds data of artifact index and keeps track of changes"""
 
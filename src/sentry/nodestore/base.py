@@ -1,9 +1,13 @@
+import time
 from threading import local
 
 import sentry_sdk
 from django.core.cache import InvalidCacheBackendError, caches
 
-from sentry.utils import json
+from sentry import options
+from sentry.nodestore import codecs
+from sentry.nodestore.localcache import local_node_cache
+from sentry.utils import json, metrics
 from sentry.utils.cache import memoize
 from sentry.utils.services import Service
 
@@ -22,6 +26,15 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json._default_decoder.decode
 
+# Node ids of data deduplicated across events by ``sentry.eventstore.compressor``
+# are the checksum of the data with this prefix.
+CHUNK_ID_PREFIX = "c:"
+
+# Chunks are rewritten at most this often per thread, so that their expiry keeps
+# being extended while events referencing them are written.
+CHUNK_REWRITE_INTERVAL = 300
+MAX_WRITTEN_CHUNKS = 10000
+
 
 class NodeStorage(local, Service):
     """
@@ -92,6 +105,12 @@ class NodeStorage(local, Service):
         if value is None:
             return None
 
+        if codecs.is_encoded(value):
+            serializer = value[1:2]
+            value = codecs.decompress(value[codecs.HEADER_SIZE :], value[2:3])
+            if serializer == codecs.SERIALIZER_MSGPACK:
+                return codecs.unpack_msgpack(value, subkey)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -134,9 +153,10 @@ class NodeStorage(local, Service):
                     return item_from_cache
 
             span.set_tag("subkey", str(subkey))
-            bytes_data = self._get_bytes(id)
+            bytes_data = self._get_bytes_cached(id)
             rv = self._decode(bytes_data, subkey=subkey)
             if subkey is None:
+                self._assemble_multi([rv])
                 # set cache item only after we know decoding did not fail
                 self._set_cache_item(id, rv)
 
@@ -181,9 +201,10 @@ class NodeStorage(local, Service):
 
             items = {
                 id: self._decode(value, subkey=subkey)
-                for id, value in self._get_bytes_multi(uncached_ids).items()
+                for id, value in self._get_bytes_multi_cached(uncached_ids).items()
             }
             if subkey is None:
+                self._assemble_multi(items.values())
                 self._set_cache_items(items)
                 items.update(cache_items)
 
@@ -200,7 +221,24 @@ class NodeStorage(local, Service):
 
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
+
+        Unless the ``nodestore.serializer`` and ``nodestore.compression``
+        options select a different codec, in which case the payload is
+        prefixed with a codec header, see ``sentry.nodestore.codecs``.
         """
+        header = codecs.get_write_header()
+        if header is None:
+            return self._encode_lines(data)
+
+        serializer, compression = header[1:2], header[2:3]
+        if serializer == codecs.SERIALIZER_MSGPACK:
+            payload = codecs.pack_msgpack(data)
+        else:
+            payload = self._encode_lines(data)
+
+        return header + codecs.compress(payload, compression)
+
+    def _encode_lines(self, data):
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -241,11 +279,65 @@ class NodeStorage(local, Service):
             span.set_tag("node_id", id)
             span.set_data("subkeys_count", len(data))
             cache_item = data.get(None)
+            if isinstance(cache_item, dict) and options.get("nodestore.deduplicate"):
+                data = dict(data)
+                data[None] = self._deduplicate(data[None], ttl=ttl)
             bytes_data = self._encode(data)
-            self._set_bytes(id, bytes_data, ttl=ttl)
+            self._set_bytes_cached(id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
 
+    def _deduplicate(self, data, ttl=None):
+        """
+        Pulls data repeating across events out of ``data`` and stores it
+        under its checksum, see ``sentry.eventstore.compressor``.
+        """
+        from sentry.eventstore import compressor
+
+        data, chunks = compressor.deduplicate(data)
+
+        written_chunks = getattr(self, "_written_chunks", None)
+        if written_chunks is None or len(written_chunks) > MAX_WRITTEN_CHUNKS:
+            written_chunks = self._written_chunks = {}
+
+        now = time.time()
+        for checksum, chunk in chunks.items():
+            if written_chunks.get(checksum, 0) > now - CHUNK_REWRITE_INTERVAL:
+                metrics.incr("nodestore.deduplicate.chunk", tags={"written": "false"})
+                continue
+            self._set_bytes_cached(CHUNK_ID_PREFIX + checksum, self._encode({None: chunk}), ttl=ttl)
+            written_chunks[checksum] = now
+            metrics.incr("nodestore.deduplicate.chunk", tags={"written": "true"})
+
+        return data
+
+    def _assemble_multi(self, items):
+        """
+        Restores deduplicated data into the given (decoded) nodes, fetching
+        the chunks needed by all of them at once.
+        """
+        from sentry.eventstore import compressor
+
+        items = [item for item in items if isinstance(item, dict)]
+        checksums = {checksum for item in items for checksum in compressor.get_checksums(item)}
+        if not checksums:
+            return
+
+        chunks = {}
+        for id, value in self._get_bytes_multi_cached(
+            [CHUNK_ID_PREFIX + checksum for checksum in checksums]
+        ).items():
+            if value is not None:
+                chunks[id[len(CHUNK_ID_PREFIX) :]] = self._decode(value, subkey=None)
+
+        if len(chunks) < len(checksums):
+            metrics.incr(
+                "nodestore.deduplicate.missing_chunks", amount=len(checksums) - len(chunks)
+            )
+
+        for item in items:
+            compressor.assemble(item, lambda checksums: chunks)
+
     def cleanup(self, cutoff_timestamp):
         raise NotImplementedError
 
@@ -270,13 +362,55 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, id):
+        local_node_cache.delete_many([id])
         if self.cache:
             self.cache.delete(id)
 
     def _delete_cache_items(self, id_list):
+        local_node_cache.delete_many(id_list)
         if self.cache:
             self.cache.delete_many([id for id in id_list])
 
+    def _get_bytes_cached(self, id):
+        """
+        Like ``_get_bytes``, but serves the payload from the in-process cache
+        if it is enabled through ``nodestore.local-cache.max-bytes``.
+        """
+        if not options.get("nodestore.local-cache.max-bytes"):
+            return self._get_bytes(id)
+
+        return self._get_bytes_multi_cached([id]).get(id)
+
+    def _get_bytes_multi_cached(self, id_list):
+        """
+        Like ``_get_bytes_multi``, but serves payloads from the in-process
+        cache if it is enabled through ``nodestore.local-cache.max-bytes``.
+        """
+        if not options.get("nodestore.local-cache.max-bytes"):
+            return self._get_bytes_multi(id_list)
+
+        rv = local_node_cache.get_many(id_list)
+        missing_ids = [id for id in id_list if id not in rv]
+        if missing_ids:
+            fetched = self._get_bytes_multi(missing_ids)
+            self._set_local_cache_items(fetched)
+            rv.update(fetched)
+        return rv
+
+    def _set_bytes_cached(self, id, data, ttl=None):
+        self._set_bytes(id, data, ttl=ttl)
+        # Always overwrite, so that a node never stays cached with stale data
+        # after it was written by this process.
+        local_node_cache.delete_many([id])
+        self._set_local_cache_items({id: data})
+
+    def _set_local_cache_items(self, items):
+        max_bytes = options.get("nodestore.local-cache.max-bytes")
+        if max_bytes:
+            local_node_cache.set_many(
+                items, max_bytes=max_bytes, ttl=options.get("nodestore.local-cache.ttl")
+            )
+
     @memoize
     def cache(self):
         try:
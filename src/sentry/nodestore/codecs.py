@@ -0,0 +1,113 @@
+"""
+Versioned payload encoding for nodestore.
+
+Payloads written by older versions of Sentry are newline-separated JSON
+documents (see ``NodeStorage._encode``). Payloads written with any other
+codec are prefixed with a three byte header so both formats can be read at
+the same time::
+
+    b"\\x00" <serializer> <compression> <payload>
+
+``\\x00`` can never start a JSON document, which is how legacy payloads are
+told apart. The serializer byte is ``j`` (JSON lines) or ``m`` (msgpack), the
+compression byte is ``n`` (none) or ``z`` (zstd). zstd frames compressed with
+a trained dictionary carry the dictionary id in their frame header, so every
+dictionary listed in ``SENTRY_NODESTORE_ZSTD_DICTIONARIES`` can be used for
+decoding while ``nodestore.zstd-dictionary-id`` selects the one used for
+writing.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, MutableMapping, Optional
+
+import msgpack
+import zstandard
+from django.conf import settings
+
+from sentry import options
+from sentry.utils.json import better_default_encoder
+
+MAGIC = b"\x00"
+HEADER_SIZE = 3
+
+SERIALIZER_JSON = b"j"
+SERIALIZER_MSGPACK = b"m"
+
+COMPRESSION_NONE = b"n"
+COMPRESSION_ZSTD = b"z"
+
+SERIALIZERS = {"json": SERIALIZER_JSON, "msgpack": SERIALIZER_MSGPACK}
+COMPRESSIONS = {"none": COMPRESSION_NONE, "zstd": COMPRESSION_ZSTD}
+
+_zstd_dictionaries: Optional[Mapping[int, zstandard.ZstdCompressionDict]] = None
+
+
+def get_zstd_dictionaries() -> Mapping[int, zstandard.ZstdCompressionDict]:
+    global _zstd_dictionaries
+    if _zstd_dictionaries is None:
+        dictionaries = {}
+        for path in getattr(settings, "SENTRY_NODESTORE_ZSTD_DICTIONARIES", ()):
+            with open(path, "rb") as f:
+                dictionary = zstandard.ZstdCompressionDict(f.read())
+            dictionaries[dictionary.dict_id()] = dictionary
+        _zstd_dictionaries = dictionaries
+    return _zstd_dictionaries
+
+
+def is_encoded(value: bytes) -> bool:
+    return value[:1] == MAGIC
+
+
+def get_write_header() -> Optional[bytes]:
+    """
+    Returns the header for newly written payloads, or ``None`` if payloads
+    should still be written in the legacy format.
+    """
+    serializer = SERIALIZERS[options.get("nodestore.serializer")]
+    compression = COMPRESSIONS[options.get("nodestore.compression")]
+    if serializer == SERIALIZER_JSON and compression == COMPRESSION_NONE:
+        return None
+    return MAGIC + serializer + compression
+
+
+def compress(value: bytes, compression: bytes) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return value
+    elif compression == COMPRESSION_ZSTD:
+        dictionary_id = options.get("nodestore.zstd-dictionary-id")
+        if dictionary_id:
+            compressor = zstandard.ZstdCompressor(dict_data=get_zstd_dictionaries()[dictionary_id])
+        else:
+            compressor = zstandard.ZstdCompressor()
+        return compressor.compress(value)
+    raise ValueError(f"Unknown nodestore compression: {compression!r}")
+
+
+def decompress(value: bytes, compression: bytes) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return value
+    elif compression == COMPRESSION_ZSTD:
+        dictionary_id = zstandard.get_frame_parameters(value).dict_id
+        if dictionary_id:
+            decompressor = zstandard.ZstdDecompressor(
+                dict_data=get_zstd_dictionaries()[dictionary_id]
+            )
+        else:
+            decompressor = zstandard.ZstdDecompressor()
+        return decompressor.decompress(value)
+    raise ValueError(f"Unknown nodestore compression: {compression!r}")
+
+
+def pack_msgpack(data: MutableMapping[Optional[str], Any]) -> bytes:
+    # The default payload goes first, same as in the JSON lines format.
+    pairs = [[None, data.pop(None)]]
+    pairs.extend([key, value] for key, value in data.items())
+    return msgpack.packb(pairs, default=better_default_encoder, use_bin_type=True)
+
+
+def unpack_msgpack(value: bytes, subkey: Optional[str]) -> Any:
+    for key, data in msgpack.unpackb(value, raw=False, strict_map_key=False):
+        if key == subkey:
+            return data
+    return None
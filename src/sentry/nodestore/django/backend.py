@@ -5,6 +5,7 @@ import pickle
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
+from sentry.nodestore import codecs
 from sentry.nodestore.base import NodeStorage
 from sentry.utils.strings import compress, decompress
 
@@ -23,7 +24,7 @@ class DjangoNodeStorage(NodeStorage):
             return None
 
         try:
-            if value.startswith(b"{"):
+            if value.startswith(b"{") or codecs.is_encoded(value):
                 return NodeStorage._decode(self, value, subkey=subkey)
 
             if subkey is None:
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sentry.utils import metrics
+
+
+class LocalNodeCache:
+    """
+    A process-wide LRU cache of encoded node payloads, bounded by the total
+    size of the cached payloads in bytes. Entries expire ``ttl`` seconds
+    after they were stored.
+
+    Since payloads are cached in their encoded form, every subkey of a node
+    can be served from the same entry and callers never share (and mutate)
+    decoded objects. Other processes do not see invalidations, which is why
+    entries should only live for a short time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id -> (expires_at, payload)
+        self._items = OrderedDict()
+        self._size = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get_many(self, id_list):
+        rv = {}
+        now = time.time()
+        with self._lock:
+            for id in id_list:
+                item = self._items.get(id)
+                if item is None:
+                    continue
+                expires_at, payload = item
+                if expires_at < now:
+                    self._pop(id)
+                    continue
+                self._items.move_to_end(id)
+                rv[id] = payload
+
+        metrics.incr("nodestore.local_cache", amount=len(rv), tags={"result": "hit"})
+        metrics.incr(
+            "nodestore.local_cache", amount=len(id_list) - len(rv), tags={"result": "miss"}
+        )
+        return rv
+
+    def set_many(self, items, max_bytes, ttl):
+        expires_at = time.time() + ttl
+        with self._lock:
+            for id, payload in items.items():
+                self._pop(id)
+                if payload is None or len(payload) > max_bytes:
+                    continue
+                self._items[id] = (expires_at, payload)
+                self._size += len(payload)
+
+            while self._size > max_bytes:
+                _, (_, payload) = self._items.popitem(last=False)
+                self._size -= len(payload)
+                metrics.incr("nodestore.local_cache.evicted")
+
+    def delete_many(self, id_list):
+        with self._lock:
+            for id in id_list:
+                self._pop(id)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def _pop(self, id):
+        item = self._items.pop(id, None)
+        if item is not None:
+            self._size -= len(item[1])
+
+
+local_node_cache = LocalNodeCache()
@@ -86,6 +86,9 @@ register("mail.enable-replies", default=False, flags=FLAG_PRIORITIZE_DISK)
 register("mail.reply-hostname", default="", flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
 register("mail.mailgun-api-key", default="", flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
 register("mail.timeout", default=10, type=Int, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
+# Store digest records as event, group and rule ids rather than pickled events, see
+# sentry.digests.codecs.NotificationCodec. Records of both kinds can always be read.
+register("digests.compact-records", default=False, flags=FLAG_PRIORITIZE_DISK)
 
 # TOTP (Auth app)
 register(
@@ -135,6 +138,16 @@ register(
 
 
 register("api.rate-limit.org-create", default=5, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
+# Fraction of a rate limit each process counts in Redis at once, and then serves from
+# memory. Leases of a single request are not taken.
+register("ratelimits.local-lease-fraction", default=0.0, flags=FLAG_PRIORITIZE_DISK)
+# Fraction of a rate limit that may be leased to processes but not served yet. This
+# bounds how early requests can be limited: a limit of N is hit after no less than
+# N * (1 - this fraction) requests. Processes count single requests while it is reached.
+register("ratelimits.local-lease-max-outstanding", default=0.1, flags=FLAG_PRIORITIZE_DISK)
+# Check and use sliding window quotas atomically in a Lua script. Counters are stored under
+# different keys in this mode, so toggling it resets all sliding windows.
+register("ratelimits.sliding-window.lua", default=False, flags=FLAG_PRIORITIZE_DISK)
 
 # Beacon
 register("beacon.anonymous", type=Bool, flags=FLAG_REQUIRED)
@@ -261,6 +274,19 @@ register("snuba.search.max-total-chunk-time-seconds", default=30.0)
 register("snuba.search.hits-sample-size", default=100)
 register("snuba.track-outcomes-sample-rate", default=0.0)
 
+# Whether identical cacheable Snuba queries wait for the one already running, instead
+# of querying Snuba again.
+register("snuba.query-cache.coalesce", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Seconds to wait for an identical query running in another process. 0 only coalesces
+# queries within a process.
+register("snuba.query-cache.lease-timeout", default=5.0, flags=FLAG_PRIORITIZE_DISK)
+# Whether Snuba results are cached compressed, instead of as JSON strings.
+register("snuba.query-cache.compress", default=False, flags=FLAG_PRIORITIZE_DISK)
+
+# Number of issue alert rules kept compiled in memory by each process. 0 compiles rules
+# for every event.
+register("rules.compiled-rule-cache.size", default=0, flags=FLAG_PRIORITIZE_DISK)
+
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
 register("snuba.tagstore.cache-tagkeys-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 
@@ -322,6 +348,28 @@ register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)  # unused
 register("nodedata.cache-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 register("nodedata.cache-on-save", default=False, flags=FLAG_PRIORITIZE_DISK)
 
+# Codec used for writing nodestore payloads, see sentry.nodestore.codecs.
+# Payloads in any of the formats can always be read.
+register("nodestore.serializer", default="json", flags=FLAG_PRIORITIZE_DISK)
+register("nodestore.compression", default="none", flags=FLAG_PRIORITIZE_DISK)
+# Id of a dictionary in SENTRY_NODESTORE_ZSTD_DICTIONARIES to compress with, 0 for none.
+register("nodestore.zstd-dictionary-id", default=0, flags=FLAG_PRIORITIZE_DISK)
+# Store data repeating across events only once, see sentry.eventstore.compressor.
+register("nodestore.deduplicate", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Size in bytes of the in-process cache of nodestore payloads, 0 to disable.
+register("nodestore.local-cache.max-bytes", default=0, flags=FLAG_PRIORITIZE_DISK)
+# Seconds a payload is kept in the in-process cache.
+register("nodestore.local-cache.ttl", default=30, flags=FLAG_PRIORITIZE_DISK)
+
+# Cache calculated hashes by the grouping inputs of events, see sentry.grouping.cache.
+register("grouping.hash-cache.enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Number of results kept in the in-process cache.
+register("grouping.hash-cache.local-size", default=10000, flags=FLAG_PRIORITIZE_DISK)
+# Seconds results are kept in the shared cache, 0 to only use the in-process cache.
+register("grouping.hash-cache.ttl", default=3600, flags=FLAG_PRIORITIZE_DISK)
+# Fraction of cache hits that are recalculated and compared to the cached result.
+register("grouping.hash-cache.consistency-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
+
 # Use nodestore for eventstore.get_events
 register("eventstore.use-nodestore", default=False, flags=FLAG_PRIORITIZE_DISK)
 
@@ -432,6 +480,19 @@ register("subscriptions-query.sample-rate", default=0.01)
 # removed once it is fully rolled out.
 register("symbolicate-event.low-priority.metrics.submission-rate", default=0.0)
 
+# Size of the contents of source maps kept parsed in memory by each worker, 0 to disable.
+register("sourcemaps.parsed-cache.max-bytes", default=0, flags=FLAG_PRIORITIZE_DISK)
+
+# Look up the release artifacts of an event in bulk and fetch its sources and source maps
+# concurrently, see `JavaScriptStacktraceProcessor.fetch_sources`.
+register("sourcemaps.fetch-planner.enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+# Upper bound of concurrent source and source map fetches per event.
+register("sourcemaps.fetch-concurrency", default=4, flags=FLAG_PRIORITIZE_DISK)
+# Upper bound of concurrent requests to the same domain when scraping sources.
+register("sourcemaps.fetch-concurrency-per-domain", default=2, flags=FLAG_PRIORITIZE_DISK)
+# Read single artifacts from release archives instead of loading entire archives.
+register("sourcemaps.indexed-archive-reader.enabled", default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # Sampling rate for controlled rollout of a change where ignest-consumer spawns
 # special save_event task for transactions avoiding the preprocess.
 register("store.save-transactions-ingest-consumer-rate", default=0.0)
@@ -500,6 +561,12 @@ register("sentry-metrics.cardinality-limiter.limits.performance.per-org", defaul
 register("sentry-metrics.cardinality-limiter.limits.releasehealth.per-org", default=[])
 register("sentry-metrics.cardinality-limiter.orgs-rollout-rate", default=0.0)
 
+# Number of resolved strings kept in memory by each indexer process, in front of the
+# indexer cache. 0 disables the in-memory cache.
+register("sentry-metrics.indexer.local-cache.size", default=0, flags=FLAG_PRIORITIZE_DISK)
+# Seconds resolved strings are kept in memory, a jitter of up to 25% is added.
+register("sentry-metrics.indexer.local-cache.ttl", default=600, flags=FLAG_PRIORITIZE_DISK)
+
 # Performance issue options to change both detection (which we can monitor with metrics),
 # and the creation of performance problems, which will eventually get turned into issues.
 register("performance.issues.all.problem-detection", default=0.0)
@@ -522,6 +589,9 @@ register("performance.issues.n_plus_one_db.problem-detection", default=0.0)
 register("performance.issues.n_plus_one_db.problem-creation", default=0.0)
 register("performance.issues.n_plus_one_db_ext.problem-creation", default=0.0)
 
+# Run detectors over the spans of a transaction in batched passes, see SpanColumns.
+register("performance.issues.columnar-detection", default=False)
+
 # System-wide options for default performance detection settings for any org opted into the performance-issues-ingest feature. Meant for rollout.
 register("performance.issues.n_plus_one_db.count_threshold", default=5)
 register("performance.issues.n_plus_one_db.duration_threshold", default=100.0)
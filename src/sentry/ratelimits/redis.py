@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import logging
+import threading
 from time import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, List, MutableMapping
 
 from django.conf import settings
 from redis.exceptions import RedisError
 
+from sentry import options
 from sentry.exceptions import InvalidConfiguration
 from sentry.ratelimits.base import RateLimiter
 from sentry.utils import redis
@@ -17,6 +19,8 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+lease_script = redis.load_script("ratelimits/lease.lua")
+
 
 def _time_bucket(request_time: float, window: int) -> int:
     """Bucket number lookup for given UTC time since epoch"""
@@ -28,6 +32,96 @@ def _bucket_start_time(bucket_number: int, window: int) -> int:
     return bucket_number * window
 
 
+class LocalLeases:
+    """
+    Requests of rate limit windows this process has counted in Redis ahead
+    of time, but not served yet.
+
+    Leased requests are counted before they are served, so a limit is never
+    exceeded. Requests that were leased but not served yet may make other
+    processes hit the limit early, though. Their number is capped in Redis
+    (see ``ratelimits.local-lease-max-outstanding``), and the unused part of
+    a lease is given back when it is renewed or after ``MAX_AGE`` seconds.
+    """
+
+    # Windows that ended are dropped once there are more leases than this.
+    MAX_LEASES = 1000
+
+    # Seconds after which the unused part of a lease is returned, with the
+    # next request of its window.
+    MAX_AGE = 1.0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # redis key -> [requests left, value of the next request, reset time,
+        #               is exhausted, requests leased in redis, expiry]
+        self._leases: MutableMapping[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._leases)
+
+    def take(self, redis_key: str) -> tuple[bool, int] | None:
+        """
+        Serves a request from the lease of ``redis_key``, and returns whether
+        it is limited and its value. Returns None if a new lease is needed.
+        """
+        with self._lock:
+            lease = self._leases.get(redis_key)
+            if lease is None or lease[5] <= time():
+                return None
+            left, value, _, is_exhausted, _, _ = lease
+            if left > 0:
+                lease[0] -= 1
+                lease[1] += 1
+                return False, value
+            if is_exhausted:
+                return True, value
+            return None
+
+    def release(self, redis_key: str) -> tuple[int, int]:
+        """
+        Drops the lease of ``redis_key``, and returns the number of requests
+        it holds in Redis and how many of them were not served.
+        """
+        with self._lock:
+            lease = self._leases.pop(redis_key, None)
+            if lease is None:
+                return 0, 0
+            return lease[4], min(lease[0], lease[4])
+
+    def add(
+        self,
+        redis_key: str,
+        left: int,
+        value: int,
+        reset_time: int,
+        is_exhausted: bool,
+        leased: int = 0,
+    ) -> None:
+        with self._lock:
+            now = time()
+            if len(self._leases) >= self.MAX_LEASES:
+                # Leases of windows that ended do not have to be returned, the
+                # counters they were taken from are gone.
+                for key in [k for k, lease in self._leases.items() if lease[2] <= now]:
+                    del self._leases[key]
+            self._leases[redis_key] = [
+                left,
+                value,
+                reset_time,
+                is_exhausted,
+                leased,
+                min(now + self.MAX_AGE, reset_time),
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._leases.clear()
+
+
+local_leases = LocalLeases()
+
+
 class RedisRateLimiter(RateLimiter):
     def __init__(self, **options: Any) -> None:
         cluster_key = getattr(settings, "SENTRY_RATE_LIMIT_REDIS_CLUSTER", "default")
@@ -105,9 +199,16 @@ class RedisRateLimiter(RateLimiter):
         expiration = window - int(request_time % window)
         # Reset Time = next time bucket's start time
         reset_time = _bucket_start_time(_time_bucket(request_time, window) + 1, window)
+
+        lease_size = int(limit * options.get("ratelimits.local-lease-fraction"))
+        if lease_size > 1:
+            return self._is_limited_with_lease(redis_key, limit, lease_size, expiration, reset_time)
+
         try:
-            result = self.client.incr(redis_key)
-            self.client.expire(redis_key, expiration)
+            with self.client.pipeline() as pipe:
+                pipe.incr(redis_key)
+                pipe.expire(redis_key, expiration)
+                result = pipe.execute()[0]
         except RedisError:
             # We don't want rate limited endpoints to fail when ratelimits
             # can't be updated. We do want to know when that happens.
@@ -115,3 +216,45 @@ class RedisRateLimiter(RateLimiter):
             return False, 0, reset_time
 
         return result > limit, result, reset_time
+
+    def _is_limited_with_lease(
+        self, redis_key: str, limit: int, lease_size: int, expiration: int, reset_time: int
+    ) -> tuple[bool, int, int]:
+        """
+        Same as ``is_limited_with_value``, but counts ``lease_size`` requests
+        in Redis at once and serves the following requests from memory.
+        """
+        taken = local_leases.take(redis_key)
+        if taken is not None:
+            limited, value = taken
+            return limited, value, reset_time
+
+        returned_leased, returned_unused = local_leases.release(redis_key)
+        max_leased = int(limit * options.get("ratelimits.local-lease-max-outstanding"))
+
+        try:
+            previous, size, granted = lease_script(
+                self.client,
+                # Both keys hash to the same slot.
+                [redis_key, f"{{{redis_key}}}:leased"],
+                [limit, lease_size, max_leased, expiration, returned_leased, returned_unused],
+            )
+        except RedisError:
+            logger.exception("Failed to retrieve current value from redis")
+            return False, 0, reset_time
+
+        if granted == 0:
+            local_leases.add(redis_key, 0, previous + 1, reset_time, is_exhausted=True)
+            return True, previous + 1, reset_time
+
+        if granted > 1 or granted < size:
+            # This request uses the first of the granted ones.
+            local_leases.add(
+                redis_key,
+                granted - 1,
+                previous + 2,
+                reset_time,
+                is_exhausted=granted < size,
+                leased=granted - 1,
+            )
+        return False, previous + 1, reset_time
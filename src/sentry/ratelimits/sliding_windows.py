@@ -10,6 +10,8 @@ Additionally this rate-limiter is not coupled to per-project/organization
 scopes, and can apply multiple sliding windows at once. On the flipside it is
 not strongly consistent and depending on usage it is very easy to over-spend
 quota, as checking quota and spending quota are two separate steps.
+`check_and_use_quotas` can do both in one step with the
+`ratelimits.sliding-window.lua` option, see its Redis implementation.
 
 Example
 =======
@@ -78,12 +80,15 @@ When using the quotas, the keys change as follows:
 from collections import defaultdict
 from dataclasses import dataclass
 from time import time
-from typing import Any, Iterator, MutableMapping, Optional, Sequence, Tuple
+from typing import Any, Iterator, List, MutableMapping, Optional, Sequence, Set, Tuple
 
+from sentry import options
 from sentry.exceptions import InvalidConfiguration
 from sentry.utils import redis
 from sentry.utils.services import Service
 
+check_and_use_quotas_script = redis.load_script("ratelimits/sliding_windows.lua")
+
 
 @dataclass(frozen=True)
 class Quota:
@@ -286,7 +291,9 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
         except Exception as e:
             raise InvalidConfiguration(str(e))
 
-    def _build_redis_key_raw(self, prefix: str, window: int, granularity: int, granule: int) -> str:
+    def _build_redis_key_raw(
+        self, prefix: str, window: int, granularity: int, granule: int, sharded: bool = False
+    ) -> str:
         if "{" in prefix or "}" in prefix:
             # The rate limiter currently does not allow you to control the
             # Redis sharding key through the prefix`. This is currently an
@@ -297,14 +304,22 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
             # would have to take control of sharding itself.
             raise ValueError("Explicit sharding not allowed in RequestedQuota.prefix")
 
+        if sharded:
+            # All keys of a prefix hit the same Redis node, so that
+            # `check_and_use_quotas` can check and use them atomically.
+            prefix = f"{{{prefix}}}"
+
         return f"sliding-window-rate-limit:{prefix}:{window}:{granularity}:{granule}"
 
-    def _build_redis_key(self, request: RequestedQuota, quota: Quota, granule: int) -> str:
+    def _build_redis_key(
+        self, request: RequestedQuota, quota: Quota, granule: int, sharded: bool = False
+    ) -> str:
         return self._build_redis_key_raw(
             prefix=quota.prefix_override or request.prefix,
             window=quota.window_seconds,
             granularity=quota.granularity_seconds,
             granule=granule,
+            sharded=sharded,
         )
 
     def check_within_quotas(
@@ -428,3 +443,110 @@ class RedisSlidingWindowRateLimiter(SlidingWindowRateLimiter):
                 pipeline.expire(key, keys_ttl[key])
 
             pipeline.execute()
+
+    def check_and_use_quotas(
+        self, requests: Sequence[RequestedQuota], timestamp: Optional[Timestamp] = None
+    ) -> Sequence[GrantedQuota]:
+        """
+        With the `ratelimits.sliding-window.lua` option set, quotas are checked
+        and used by a Lua script in a single round-trip per prefix, rather than
+        with the two steps of `check_within_quotas` and `use_quotas`.
+        Concurrent calls then cannot overcommit quotas of the same prefix.
+
+        As explained in `use_quotas`, quotas with different prefixes (such as
+        a global quota and a per-organization quota) live on different Redis
+        nodes. Each prefix grants as much as it can on its own, a request is
+        granted the minimum of those, and the excess is given back afterwards.
+        In between, concurrent calls may see too little remaining quota, but
+        never too much.
+
+        The keys used in this mode differ from the ones of
+        `check_within_quotas`, so toggling the option resets all windows.
+        """
+        if not options.get("ratelimits.sliding-window.lua"):
+            return super().check_and_use_quotas(requests, timestamp)
+
+        if timestamp is None:
+            timestamp = int(time())
+        else:
+            timestamp = int(timestamp)
+
+        # prefix -> request index -> [(quota index, quota)]
+        groups: MutableMapping[str, MutableMapping[int, List[Tuple[int, Quota]]]] = defaultdict(
+            dict
+        )
+        for request_i, request in enumerate(requests):
+            assert request.quotas
+
+            for quota_i, quota in enumerate(request.quotas):
+                prefix = quota.prefix_override or request.prefix
+                groups[prefix].setdefault(request_i, []).append((quota_i, quota))
+
+        granted = [request.requested for request in requests]
+        # (prefix, request index) -> (granted, indices of reached quotas)
+        group_grants: MutableMapping[Tuple[str, int], Tuple[int, Sequence[int]]] = {}
+
+        for prefix, group in groups.items():
+            keys: List[str] = []
+            args: List[int] = [len(group)]
+
+            for request_i, quotas in group.items():
+                request = requests[request_i]
+                args += [request.requested, len(quotas)]
+
+                for quota_i, quota in quotas:
+                    granules = list(quota.iter_window(timestamp))
+                    args += [quota_i, quota.limit, quota.window_seconds, len(granules)]
+                    keys += [
+                        self._build_redis_key(
+                            request=request, quota=quota, granule=granule, sharded=True
+                        )
+                        for granule in granules
+                    ]
+
+            results = check_and_use_quotas_script(self.client, keys, args)
+
+            for request_i, (group_granted, reached_quotas) in zip(group, results):
+                group_grants[prefix, request_i] = (int(group_granted), reached_quotas)
+                granted[request_i] = min(granted[request_i], int(group_granted))
+
+        reached: List[Set[int]] = [set() for _ in requests]
+        keys_to_decr: MutableMapping[str, int] = defaultdict(int)
+        for prefix, group in groups.items():
+            for request_i, quotas in group.items():
+                group_granted, reached_quotas = group_grants[prefix, request_i]
+                excess = group_granted - granted[request_i]
+                if excess <= 0:
+                    # Only quotas of the prefixes that limited the request
+                    # are reported as reached.
+                    reached[request_i].update(int(quota_i) for quota_i in reached_quotas)
+                    continue
+
+                for _, quota in quotas:
+                    key = self._build_redis_key(
+                        request=requests[request_i],
+                        quota=quota,
+                        granule=next(quota.iter_window(timestamp)),
+                        sharded=True,
+                    )
+                    keys_to_decr[key] += excess
+
+        if keys_to_decr:
+            with self.client.pipeline(transaction=False) as pipeline:
+                for key, value in keys_to_decr.items():
+                    pipeline.incrby(key, -value)
+
+                pipeline.execute()
+
+        return [
+            GrantedQuota(
+                prefix=request.prefix,
+                granted=granted[request_i],
+                reached_quotas=[
+                    quota
+                    for quota_i, quota in enumerate(request.quotas)
+                    if quota_i in reached[request_i]
+                ],
+            )
+            for request_i, request in enumerate(requests)
+        ]
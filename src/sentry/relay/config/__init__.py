@@ -1,10 +1,13 @@
 import logging
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Literal,
     Mapping,
@@ -33,7 +36,7 @@ from sentry.ingest.inbound_filters import (
     get_filter_key,
 )
 from sentry.interfaces.security import DEFAULT_DISALLOWED_SOURCES
-from sentry.models import Project, ProjectKey
+from sentry.models import Organization, Project, ProjectKey, ProjectOption
 from sentry.relay.config.metric_extraction import get_metric_conditional_tagging_rules
 from sentry.relay.utils import to_camel_case_name
 from sentry.search.utils import get_latest_release
@@ -46,17 +49,71 @@ from .measurements import CUSTOM_MEASUREMENT_LIMIT, get_measurements_config
 #: These features will be listed in the project config
 EXPOSABLE_FEATURES = ["organizations:profiling", "organizations:session-replay"]
 
+#: All features project configs depend on, see `prefetch_project_configs`
+CONFIG_FEATURES = EXPOSABLE_FEATURES + [
+    "organizations:dynamic-sampling",
+    "organizations:dynamic-sampling-deprecated",
+    "organizations:metrics-extraction",
+    "organizations:release-health-drop-sessions",
+    "organizations:server-side-sampling",
+    "organizations:transaction-metrics-extraction",
+    "projects:custom-inbound-filters",
+]
+
 logger = logging.getLogger(__name__)
 
+_prefetched = threading.local()
+
+
+@contextmanager
+def prefetch_project_configs(
+    organization: Organization, projects: Sequence[Project]
+) -> Iterator[None]:
+    """Bulk loads what the configs of ``projects`` depend on.
+
+    Within the context, configs of these projects are computed without
+    further lookups of project options and features. Options are loaded for
+    all projects at once, organization features are checked once and project
+    features with ``features.has_for_batch``.
+    """
+    ProjectOption.objects.get_all_values_bulk(projects)
+
+    prefetched_features = {}
+    for feature in CONFIG_FEATURES:
+        if feature.startswith("organizations:"):
+            prefetched_features[(feature, organization.id)] = features.has(feature, organization)
+        elif projects:
+            for project, has_feature in features.has_for_batch(
+                feature, organization, projects
+            ).items():
+                prefetched_features[(feature, project.id)] = has_feature
+
+    previous = getattr(_prefetched, "features", None)
+    _prefetched.features = prefetched_features
+    try:
+        yield
+    finally:
+        _prefetched.features = previous
+
+
+def _has_feature(feature: str, entity: Union[Organization, Project]) -> bool:
+    prefetched_features = getattr(_prefetched, "features", None)
+    if prefetched_features is not None:
+        has_feature = prefetched_features.get((feature, entity.id))
+        if has_feature is not None:
+            return has_feature
+
+    return features.has(feature, entity)
+
 
 def get_exposed_features(project: Project) -> Sequence[str]:
 
     active_features = []
     for feature in EXPOSABLE_FEATURES:
         if feature.startswith("organizations:"):
-            has_feature = features.has(feature, project.organization)
+            has_feature = _has_feature(feature, project.organization)
         elif feature.startswith("projects:"):
-            has_feature = features.has(feature, project)
+            has_feature = _has_feature(feature, project)
         else:
             raise RuntimeError("EXPOSABLE_FEATURES must start with 'organizations:' or 'projects:'")
 
@@ -102,7 +159,7 @@ def get_filter_settings(project: Project) -> Mapping[str, Any]:
         settings = _load_filter_settings(flt, project)
         filter_settings[filter_id] = settings
 
-    if features.has("projects:custom-inbound-filters", project):
+    if _has_feature("projects:custom-inbound-filters", project):
         invalid_releases = project.get_option(f"sentry:{FilterTypes.RELEASES}")
         if invalid_releases:
             filter_settings["releases"] = {"releases": invalid_releases}
@@ -152,7 +209,7 @@ def get_project_config(
 
 
 def get_dynamic_sampling_config(project: Project) -> Optional[Mapping[str, Any]]:
-    feature_multiplexer = DynamicSamplingFeatureMultiplexer(project)
+    feature_multiplexer = DynamicSamplingFeatureMultiplexer(project, has_feature=_has_feature)
 
     # In this case we should override old conditionnal rules if they exists
     # or just return uniform rule
@@ -269,10 +326,10 @@ def _get_project_config(
             config, "metricConditionalTagging", get_metric_conditional_tagging_rules, project
         )
 
-    if features.has("organizations:metrics-extraction", project.organization):
+    if _has_feature("organizations:metrics-extraction", project.organization):
         config["sessionMetrics"] = {
             "version": 1,
-            "drop": features.has(
+            "drop": _has_feature(
                 "organizations:release-health-drop-sessions", project.organization
             ),
         }
@@ -503,7 +560,7 @@ class TransactionMetricsSettings(TypedDict):
 def _should_extract_transaction_metrics(project: Project) -> bool:
     return (
         sample_modulo("relay.transaction-metrics-org-sample-rate", project.organization_id)
-        or features.has("organizations:transaction-metrics-extraction", project.organization)
+        or _has_feature("organizations:transaction-metrics-extraction", project.organization)
     ) and not killswitches.killswitch_matches_context(
         "relay.drop-transaction-metrics", {"project_id": project.id}
     )
@@ -2,7 +2,7 @@ from sentry.utils.services import Service
 
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "delete_many", "get", "exists_many")
 
     def __init__(self, **options):
         pass
@@ -15,3 +15,7 @@ class ProjectConfigCache(Service):
 
     def get(self, public_key):
         raise NotImplementedError()
+
+    def exists_many(self, public_keys):
+        """Returns the subset of ``public_keys`` that have a cached config."""
+        return {public_key for public_key in public_keys if self.get(public_key) is not None}
@@ -54,6 +54,16 @@ class RedisProjectConfigCache(ProjectConfigCache):
             "relay.projectconfig_cache.write", amount=sum(return_values), tags={"action": "delete"}
         )
 
+    def exists_many(self, public_keys):
+        public_keys = list(public_keys)
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster_read.pipeline() as p:
+            for public_key in public_keys:
+                p.exists(self.__get_redis_key(public_key))
+            return_values = p.execute()
+
+        return {public_key for public_key, exists in zip(public_keys, return_values) if exists}
+
     def get(self, public_key):
         rv = self.cluster_read.get(self.__get_redis_key(public_key))
         if rv is not None:
@@ -3,7 +3,7 @@ from __future__ import annotations
 import abc
 import logging
 from collections import namedtuple
-from typing import Any, Callable, Dict, MutableMapping, Sequence, Type
+from typing import Any, Callable, Dict, Hashable, MutableMapping, Sequence, Type
 
 from django import forms
 
@@ -120,8 +120,12 @@ class EventState:
         is_regression: bool,
         is_new_group_environment: bool,
         has_reappeared: bool,
+        rate_cache: MutableMapping[Hashable, int] | None = None,
     ) -> None:
         self.is_new = is_new
         self.is_regression = is_regression
         self.is_new_group_environment = is_new_group_environment
         self.has_reappeared = has_reappeared
+        # Rates queried by frequency conditions, shared by all rules that are
+        # evaluated for the same event.
+        self.rate_cache = rate_cache if rate_cache is not None else {}
@@ -117,7 +117,21 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
             return False
 
         # TODO(mgaeta): Bug: Rule is optional.
-        current_value = self.get_rate(event, interval, self.rule.environment_id)  # type: ignore
+        environment_id = self.rule.environment_id  # type: ignore
+        rate_key = (
+            self.id,
+            event.group_id,
+            environment_id,
+            interval,
+            self.get_option("comparisonType", COMPARISON_TYPE_COUNT),
+            self.get_option("comparisonInterval"),
+        )
+        current_value = state.rate_cache.get(rate_key)
+        if current_value is None:
+            current_value = self.get_rate(event, interval, environment_id)
+            state.rate_cache[rate_key] = current_value
+        else:
+            metrics.incr("rules.conditions.rate_cache_hit")
         logging.info(f"event_frequency_rule current: {current_value}, threshold: {value}")
         return current_value > value
 
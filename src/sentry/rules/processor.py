@@ -1,14 +1,30 @@
 from __future__ import annotations
 
 import logging
+import threading
+from collections import OrderedDict
 from datetime import timedelta
 from random import randrange
-from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Sequence, Set, Tuple
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import analytics, features
+from sentry import analytics, features, options
 from sentry.eventstore.models import GroupEvent
 from sentry.mail.actions import NotifyActiveReleaseEmailAction
 from sentry.models import GroupRuleStatus, Rule
@@ -19,11 +35,16 @@ from sentry.rules.base import CallbackFuture
 from sentry.rules.conditions.active_release import ActiveReleaseEventCondition
 from sentry.rules.conditions.base import EventCondition
 from sentry.rules.filters.base import EventFilter
+from sentry.rules.registry import RuleRegistry
 from sentry.types.rules import RuleFuture
+from sentry.utils import json, metrics
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
 SLOW_CONDITION_MATCHES = ["event_frequency"]
+# Filters that need the database or cache, as opposed to only the event and
+# its group.
+SLOW_FILTER_MATCHES = ["latest_release", "assigned_to"]
 
 
 def get_match_function(match_name: str) -> Callable[..., bool] | None:
@@ -36,6 +57,66 @@ def get_match_function(match_name: str) -> Callable[..., bool] | None:
     return None
 
 
+class CompiledRule(NamedTuple):
+    """
+    The condition and filter classes of a rule along with their data, ordered
+    so that expensive ones run last. Unregistered ones have no class.
+
+    Compiled rules are shared between events, so they are instantiated for
+    each event with its project (see ``RuleProcessor.instantiate``).
+    """
+
+    conditions: Sequence[Tuple[Optional[Type[EventCondition]], Mapping[str, Any]]]
+    filters: Sequence[Tuple[Optional[Type[EventFilter]], Mapping[str, Any]]]
+    condition_match: str
+    filter_match: str
+
+
+class CompiledRuleCache:
+    """
+    A process-wide LRU of compiled rules.
+
+    Entries are keyed by the contents of the rule, so that saving a rule in
+    any process makes the other ones compile it again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._items: OrderedDict[Hashable, Tuple[RuleRegistry, CompiledRule]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, registry: RuleRegistry) -> Optional[CompiledRule]:
+        with self._lock:
+            item = self._items.get(key)
+            # Rules compiled against another registry refer to other classes.
+            if item is None or item[0] is not registry:
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(
+        self, key: Hashable, registry: RuleRegistry, compiled: CompiledRule, maxsize: int
+    ) -> None:
+        with self._lock:
+            self._items[key] = (registry, compiled)
+            self._items.move_to_end(key)
+            while len(self._items) > maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+compiled_rule_cache = CompiledRuleCache()
+
+
+def _is_slow(predicate: Mapping[str, Any], slow_matches: Sequence[str]) -> bool:
+    return any(slow_match in predicate["id"] for slow_match in slow_matches)
+
+
 class RuleProcessor:
     logger = logging.getLogger("sentry.rules")
 
@@ -59,6 +140,9 @@ class RuleProcessor:
         self.grouped_futures: MutableMapping[
             str, Tuple[Callable[[GroupEvent, Sequence[RuleFuture]], None], List[RuleFuture]]
         ] = {}
+        # Rules of a project often check the same frequency with different
+        # thresholds, which only needs to be queried once per event.
+        self.rate_cache: MutableMapping[Hashable, int] = {}
 
     def get_rules(self) -> Sequence[Rule]:
         """Get all of the rules for this project from the DB (or cache)."""
@@ -126,15 +210,63 @@ class RuleProcessor:
 
         return rule_statuses
 
-    def condition_matches(
-        self, condition: Mapping[str, Any], state: EventState, rule: Rule
-    ) -> bool | None:
-        condition_cls = rules.get(condition["id"])
-        if condition_cls is None:
-            self.logger.warning("Unregistered condition %r", condition["id"])
+    def compile_rule(self, rule: Rule) -> CompiledRule:
+        """
+        Returns the conditions and filters of ``rule``, ready to be evaluated.
+        """
+        maxsize = options.get("rules.compiled-rule-cache.size")
+        if maxsize > 0:
+            cache_key = (
+                rule.id,
+                rule.environment_id,
+                rule.label,
+                # Rules are loaded from the same stored data in every
+                # process, so their keys are always in the same order.
+                json.dumps(rule.data),
+            )
+            compiled = compiled_rule_cache.get(cache_key, rules)
+            if compiled is not None:
+                metrics.incr("rules.compiled_rule_cache", tags={"result": "hit"})
+                return compiled
+            metrics.incr("rules.compiled_rule_cache", tags={"result": "miss"})
+
+        condition_list = []
+        filter_list = []
+        for rule_cond in rule.data.get("conditions", ()):
+            if self.get_rule_type(rule_cond) == "condition/event":
+                condition_list.append(rule_cond)
+            else:
+                filter_list.append(rule_cond)
+
+        # Sort so that the most expensive conditions and filters run last.
+        condition_list.sort(key=lambda condition: _is_slow(condition, SLOW_CONDITION_MATCHES))
+        filter_list.sort(key=lambda rule_filter: _is_slow(rule_filter, SLOW_FILTER_MATCHES))
+
+        compiled = CompiledRule(
+            conditions=[(rules.get(condition["id"]), condition) for condition in condition_list],
+            filters=[(rules.get(rule_filter["id"]), rule_filter) for rule_filter in filter_list],
+            condition_match=rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH,
+            filter_match=rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH,
+        )
+        if maxsize > 0:
+            compiled_rule_cache.set(cache_key, rules, compiled, maxsize)
+        return compiled
+
+    def instantiate(
+        self, compiled: Sequence[Tuple[Optional[Type[Any]], Mapping[str, Any]]], rule: Rule
+    ) -> List[Any]:
+        """
+        Instantiates compiled conditions or filters for the current event.
+        """
+        return [
+            None if condition_cls is None else condition_cls(self.project, data=data, rule=rule)
+            for condition_cls, data in compiled
+        ]
+
+    def condition_matches(self, condition_inst: Any, state: EventState) -> bool | None:
+        if condition_inst is None:
             return None
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
         passes: bool = safe_execute(
             condition_inst.passes, self.event, state, _with_transaction=False
         )
@@ -155,6 +287,7 @@ class RuleProcessor:
             is_regression=self.is_regression,
             is_new_group_environment=self.is_new_group_environment,
             has_reappeared=self.has_reappeared,
+            rate_cache=self.rate_cache,
         )
 
     def apply_rule(self, rule: Rule, status: GroupRuleStatus) -> None:
@@ -164,9 +297,6 @@ class RuleProcessor:
         :param rule: `Rule` object
         :return: void
         """
-        condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
-        filter_match = rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
-        rule_condition_list = rule.data.get("conditions", ())
         frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
 
         if (
@@ -181,29 +311,17 @@ class RuleProcessor:
             return
 
         state = self.get_state()
-
-        condition_list = []
-        filter_list = []
-        for rule_cond in rule_condition_list:
-            if self.get_rule_type(rule_cond) == "condition/event":
-                condition_list.append(rule_cond)
-            else:
-                filter_list.append(rule_cond)
-
-        # Sort `condition_list` so that most expensive conditions run last.
-        condition_list.sort(
-            key=lambda condition: any(
-                condition_match in condition["id"] for condition_match in SLOW_CONDITION_MATCHES
-            )
-        )
+        compiled = self.compile_rule(rule)
+        filter_match = compiled.filter_match
 
         for predicate_list, match, name in (
-            (filter_list, filter_match, "filter"),
-            (condition_list, condition_match, "condition"),
+            (compiled.filters, compiled.filter_match, "filter"),
+            (compiled.conditions, compiled.condition_match, "condition"),
         ):
             if not predicate_list:
                 continue
-            predicate_iter = (self.condition_matches(f, state, rule) for f in predicate_list)
+            predicates = self.instantiate(predicate_list, rule)
+            predicate_iter = (self.condition_matches(f, state) for f in predicates)
             predicate_func = get_match_function(match)
             if predicate_func:
                 if not predicate_func(predicate_iter):
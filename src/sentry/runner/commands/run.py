@@ -529,6 +529,16 @@ def batching_kafka_options(group):
     default=None,
     help="Thread pool size (only utilitized for message types that support concurrent processing)",
 )
+@click.option(
+    "--processes",
+    type=int,
+    default=None,
+    help="Decode messages in this many worker processes. Requires a single consumer type.",
+)
+@click.option("--input-block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+@click.option("--output-block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+@click.option("max_parallel_batch_size", "--max-parallel-batch-size", type=int, default=50)
+@click.option("max_parallel_batch_time", "--max-parallel-batch-time-ms", type=int, default=1000)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -537,7 +547,7 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     The "ingest consumer" tasks read events from a kafka topic (coming from Relay) and schedules
     process event celery tasks for them
     """
-    from sentry.ingest.ingest_consumer import get_ingest_consumer
+    from sentry.ingest.ingest_consumer import get_ingest_consumer, get_parallel_ingest_consumer
     from sentry.utils import metrics
 
     if all_consumer_types:
@@ -557,10 +567,38 @@ def ingest_consumer(consumer_types, all_consumer_types, **options):
     else:
         executor = None
 
+    parallel_options = {
+        key: options.pop(key)
+        for key in (
+            "processes",
+            "input_block_size",
+            "output_block_size",
+            "max_parallel_batch_size",
+            "max_parallel_batch_time",
+        )
+    }
+
     with metrics.global_tags(
         ingest_consumer_types=",".join(sorted(consumer_types)), _all_threads=True
     ):
-        get_ingest_consumer(consumer_types=consumer_types, executor=executor, **options).run()
+        if parallel_options["processes"] is None:
+            get_ingest_consumer(consumer_types=consumer_types, executor=executor, **options).run()
+            return
+
+        try:
+            consumer = get_parallel_ingest_consumer(
+                consumer_types=consumer_types, executor=executor, **parallel_options, **options
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        def handler(signum, frame):
+            consumer.signal_shutdown()
+
+        signal.signal(signal.SIGINT, handler)
+        signal.signal(signal.SIGTERM, handler)
+
+        consumer.run()
 
 
 @run.command("region-to-control-consumer")
@@ -0,0 +1,56 @@
+-- Leases requests of a fixed window rate limit (see sentry.ratelimits.redis)
+-- to a process, which then serves them from memory.
+--
+-- Next to the counter of the window, the number of leased requests that may
+-- still be unserved is tracked. A new lease is only granted while that number
+-- stays within max_leased, otherwise only the current request is counted. The
+-- previous lease of the process is returned first: the unused requests of it
+-- are taken off the counter.
+--
+-- Input:
+-- keys:
+--  counter_key, leased_key (must hash to the same slot)
+-- args:
+--  limit, lease_size, max_leased, expiration, returned_leased, returned_unused
+--
+-- Output:
+-- previous (counter value before this request), size (requests counted),
+-- granted (requests within the limit, including the current one)
+local counter_key = KEYS[1]
+local leased_key = KEYS[2]
+
+local limit = tonumber(ARGV[1])
+local lease_size = tonumber(ARGV[2])
+local max_leased = tonumber(ARGV[3])
+local expiration = tonumber(ARGV[4])
+local returned_leased = tonumber(ARGV[5])
+local returned_unused = tonumber(ARGV[6])
+
+local leased = tonumber(redis.call("GET", leased_key) or 0)
+
+if returned_leased > 0 then
+    leased = math.max(0, leased - returned_leased)
+    if returned_unused > 0 and redis.call("EXISTS", counter_key) == 1 then
+        redis.call("DECRBY", counter_key, returned_unused)
+    end
+end
+
+local size = 1
+if lease_size > 1 and leased + lease_size - 1 <= max_leased then
+    size = lease_size
+end
+
+local total = redis.call("INCRBY", counter_key, size)
+redis.call("EXPIRE", counter_key, expiration)
+
+local previous = total - size
+local granted = math.max(0, math.min(size, limit - previous))
+
+-- The current request is served right away, the others of the lease are
+-- outstanding until they are served or returned.
+if granted > 1 then
+    leased = leased + granted - 1
+end
+redis.call("SET", leased_key, leased, "EX", expiration)
+
+return {previous, size, granted}
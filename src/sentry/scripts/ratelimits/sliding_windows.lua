@@ -0,0 +1,64 @@
+-- Atomically checks and uses quotas of the sliding window rate limiter (see
+-- sentry.ratelimits.sliding_windows). All keys passed to one invocation share
+-- a prefix and therefore a hash slot.
+--
+-- Requests are granted in order, so a request sees the quota used by all
+-- requests before it, within this invocation and outside of it.
+--
+-- Input:
+-- keys:
+--  for every quota of every request, the keys of all granules of its window,
+--  newest (the one to increment) first
+-- args:
+--  num_requests,
+--  for every request: requested, num_quotas,
+--    for every quota: quota_index, limit, window_seconds, num_granules
+--
+-- Output:
+-- for every request: {granted, {quota_index of reached quotas...}}
+local num_requests = tonumber(ARGV[1])
+local arg_i = 2
+local key_i = 1
+local results = {}
+
+for request_i = 1, num_requests do
+    local granted = tonumber(ARGV[arg_i])
+    local num_quotas = tonumber(ARGV[arg_i + 1])
+    arg_i = arg_i + 2
+
+    local reached_quotas = {}
+    local keys_to_incr = {}
+
+    for _ = 1, num_quotas do
+        local quota_index = tonumber(ARGV[arg_i])
+        local limit = tonumber(ARGV[arg_i + 1])
+        local window_seconds = tonumber(ARGV[arg_i + 2])
+        local num_granules = tonumber(ARGV[arg_i + 3])
+        arg_i = arg_i + 4
+
+        local used_quota = 0
+        for granule_i = key_i, key_i + num_granules - 1 do
+            used_quota = used_quota + (tonumber(redis.call("GET", KEYS[granule_i])) or 0)
+        end
+
+        local remaining_quota = math.max(0, limit - used_quota)
+        if remaining_quota < granted then
+            granted = remaining_quota
+            table.insert(reached_quotas, quota_index)
+        end
+
+        table.insert(keys_to_incr, {KEYS[key_i], window_seconds})
+        key_i = key_i + num_granules
+    end
+
+    if granted > 0 then
+        for _, key in ipairs(keys_to_incr) do
+            redis.call("INCRBY", key[1], granted)
+            redis.call("EXPIRE", key[1], key[2])
+        end
+    end
+
+    results[request_i] = {granted, reached_quotas}
+end
+
+return results
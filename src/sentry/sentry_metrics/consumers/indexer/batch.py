@@ -64,6 +64,43 @@ def invalid_metric_tags(tags: Mapping[str, str]) -> Sequence[str]:
     return invalid_strs
 
 
+class ResolvedString(NamedTuple):
+    """
+    The outcome of indexing a string, as needed to rewrite messages using it.
+    """
+
+    # None if the string was rate limited.
+    id: Optional[int]
+    # The value of the `FetchType`, None if there is no metadata for the string.
+    fetch_type: Optional[str]
+    # The id from the metadata, as written to the `mapping_meta` of messages.
+    meta_id: str
+    is_global_limit: bool
+
+
+def build_string_table(
+    mapping: Mapping[str, Optional[int]], meta: Mapping[str, Metadata]
+) -> Mapping[str, ResolvedString]:
+    """
+    Merges the results and the metadata of an organization's strings, so that
+    every message only needs a single lookup per string.
+    """
+    table = {}
+    for string in {*mapping.keys(), *meta.keys()}:
+        metadata = meta.get(string)
+        if metadata is None:
+            table[string] = ResolvedString(mapping.get(string), None, "", False)
+        else:
+            table[string] = ResolvedString(
+                mapping.get(string),
+                metadata.fetch_type.value,
+                str(metadata.id),
+                bool(metadata.fetch_type_ext and metadata.fetch_type_ext.is_global),
+            )
+
+    return table
+
+
 class InboundMessage(TypedDict):
     # Note: This is only the subset of fields we access in this file.
     org_id: int
@@ -207,9 +244,11 @@ class IndexerBatch:
         bulk_record_meta: Mapping[int, Mapping[str, Metadata]],
     ) -> List[Message[KafkaPayload]]:
         new_messages: List[Message[KafkaPayload]] = []
+        # Most strings are shared by many messages of an organization, so they
+        # are resolved once per batch rather than once per message.
+        string_tables: MutableMapping[int, Mapping[str, ResolvedString]] = {}
 
         for message in self.outer_message.payload:
-            used_tags: Set[str] = set()
             output_message_meta: Mapping[str, MutableMapping[str, str]] = defaultdict(dict)
             partition_offset = PartitionIdxOffset(message.partition.index, message.offset)
             if partition_offset in self.skipped_offsets:
@@ -227,8 +266,14 @@ class IndexerBatch:
             org_id = new_payload_value["org_id"]
             sentry_sdk.set_tag("sentry_metrics.organization_id", org_id)
             tags = new_payload_value.get("tags", {})
-            used_tags.add(metric_name)
 
+            strings = string_tables.get(org_id)
+            if strings is None:
+                strings = string_tables[org_id] = build_string_table(
+                    mapping.get(org_id, {}), bulk_record_meta.get(org_id, {})
+                )
+
+            used_tags: Set[str] = {metric_name}
             new_tags: MutableMapping[str, int] = {}
             exceeded_global_quotas = 0
             exceeded_org_quotas = 0
@@ -236,14 +281,9 @@ class IndexerBatch:
             try:
                 for k, v in tags.items():
                     used_tags.update({k, v})
-                    new_k = mapping[org_id][k]
-                    if new_k is None:
-                        metadata = bulk_record_meta[org_id].get(k)
-                        if (
-                            metadata
-                            and metadata.fetch_type_ext
-                            and metadata.fetch_type_ext.is_global
-                        ):
+                    resolved_k = strings[k]
+                    if resolved_k.id is None:
+                        if resolved_k.is_global_limit:
                             exceeded_global_quotas += 1
                         else:
                             exceeded_org_quotas += 1
@@ -251,22 +291,17 @@ class IndexerBatch:
 
                     value_to_write = v
                     if self.__should_index_tag_values:
-                        new_v = mapping[org_id][v]
-                        if new_v is None:
-                            metadata = bulk_record_meta[org_id].get(v)
-                            if (
-                                metadata
-                                and metadata.fetch_type_ext
-                                and metadata.fetch_type_ext.is_global
-                            ):
+                        resolved_v = strings[v]
+                        if resolved_v.id is None:
+                            if resolved_v.is_global_limit:
                                 exceeded_global_quotas += 1
                             else:
                                 exceeded_org_quotas += 1
                             continue
                         else:
-                            value_to_write = new_v
+                            value_to_write = resolved_v.id
 
-                    new_tags[str(new_k)] = value_to_write
+                    new_tags[str(resolved_k.id)] = value_to_write
             except KeyError:
                 logger.error("process_messages.key_error", extra={"tags": tags}, exc_info=True)
                 continue
@@ -294,14 +329,12 @@ class IndexerBatch:
 
             fetch_types_encountered = set()
             for tag in used_tags:
-                if tag in bulk_record_meta[org_id]:
-                    metadata = bulk_record_meta[org_id][tag]
-                    fetch_types_encountered.add(metadata.fetch_type)
-                    output_message_meta[metadata.fetch_type.value][str(metadata.id)] = tag
+                resolved = strings.get(tag)
+                if resolved is not None and resolved.fetch_type is not None:
+                    fetch_types_encountered.add(resolved.fetch_type)
+                    output_message_meta[resolved.fetch_type][resolved.meta_id] = tag
 
-            mapping_header_content = bytes(
-                "".join(sorted(t.value for t in fetch_types_encountered)), "utf-8"
-            )
+            mapping_header_content = bytes("".join(sorted(fetch_types_encountered)), "utf-8")
 
             # When sending tag values as strings, set the version on the payload
             # to 2. This is used by the consumer to determine how to decode the
@@ -309,9 +342,9 @@ class IndexerBatch:
             if not self.__should_index_tag_values:
                 new_payload_value["version"] = 2
             new_payload_value["tags"] = new_tags
-            new_payload_value["metric_id"] = numeric_metric_id = mapping[org_id][metric_name]
+            resolved_name = strings[metric_name]
+            new_payload_value["metric_id"] = numeric_metric_id = resolved_name.id
             if numeric_metric_id is None:
-                metadata = bulk_record_meta[org_id].get(metric_name)
                 metrics.incr(
                     "sentry_metrics.indexer.process_messages.dropped_message",
                     tags={
@@ -324,11 +357,7 @@ class IndexerBatch:
                         "process_messages.dropped_message",
                         extra={
                             "string_type": "metric_id",
-                            "is_global_quota": bool(
-                                metadata
-                                and metadata.fetch_type_ext
-                                and metadata.fetch_type_ext.is_global
-                            ),
+                            "is_global_quota": resolved_name.is_global_limit,
                             "org_batch_size": len(mapping[org_id]),
                         },
                     )
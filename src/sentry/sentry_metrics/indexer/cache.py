@@ -1,10 +1,14 @@
 import logging
 import random
-from typing import Mapping, MutableMapping, Optional, Sequence, Set
+import threading
+import time
+from collections import OrderedDict
+from typing import Mapping, MutableMapping, Optional, Sequence, Set, Tuple
 
 from django.conf import settings
 from django.core.cache import caches
 
+from sentry import options
 from sentry.sentry_metrics.configuration import UseCaseKey
 from sentry.sentry_metrics.indexer.base import (
     FetchType,
@@ -21,6 +25,7 @@ logger = logging.getLogger(__name__)
 _INDEXER_CACHE_METRIC = "sentry_metrics.indexer.memcache"
 # only used to compare to the older version of the PGIndexer
 _INDEXER_CACHE_FETCH_METRIC = "sentry_metrics.indexer.memcache.fetch"
+_INDEXER_LOCAL_CACHE_METRIC = "sentry_metrics.indexer.local_cache"
 
 
 class StringIndexerCache:
@@ -97,6 +102,63 @@ class StringIndexerCache:
         self.cache.delete_many(cache_keys, version=self.version)
 
 
+class LocalStringIndexerCache:
+    """
+    A process-wide LRU of resolved strings, bounded by the number of entries.
+
+    Indexer consumers see the same metric names, tag keys and tag values over
+    and over, so most lookups are served from here instead of going to the
+    shared cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (cache_namespace, "org_id:string") -> (expires_at, id)
+        self._items: OrderedDict[Tuple[str, str], Tuple[float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_many(self, keys: Sequence[str], cache_namespace: str) -> MutableMapping[str, int]:
+        rv = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                item = self._items.get((cache_namespace, key))
+                if item is None:
+                    continue
+                expires_at, id = item
+                if expires_at < now:
+                    del self._items[(cache_namespace, key)]
+                    continue
+                self._items.move_to_end((cache_namespace, key))
+                rv[key] = id
+
+        return rv
+
+    def set_many(
+        self, key_values: Mapping[str, int], cache_namespace: str, maxsize: int, ttl: int
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            for key, id in key_values.items():
+                # Jitter the expiry, so that entries added at once (e.g. on
+                # startup) do not all expire at once either.
+                expires_at = now + ttl * (1 + random.uniform(0, 0.25))
+                self._items[(cache_namespace, key)] = (expires_at, id)
+                self._items.move_to_end((cache_namespace, key))
+
+            while len(self._items) > maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+local_indexer_cache = LocalStringIndexerCache()
+
+
 class CachingIndexer(StringIndexer):
     def __init__(self, cache: StringIndexerCache, indexer: StringIndexer) -> None:
         self.cache = cache
@@ -108,7 +170,26 @@ class CachingIndexer(StringIndexer):
         cache_keys = KeyCollection(org_strings)
         metrics.gauge("sentry_metrics.indexer.lookups_per_batch", value=cache_keys.size)
         cache_key_strs = cache_keys.as_strings()
-        cache_results = self.cache.get_many(cache_key_strs, use_case_id.value)
+
+        local_cache_size = options.get("sentry-metrics.indexer.local-cache.size")
+        local_results: Mapping[str, int] = {}
+        if local_cache_size > 0:
+            local_results = local_indexer_cache.get_many(cache_key_strs, use_case_id.value)
+            metrics.incr(
+                _INDEXER_LOCAL_CACHE_METRIC,
+                tags={"cache_hit": "true"},
+                amount=len(local_results),
+            )
+            metrics.incr(
+                _INDEXER_LOCAL_CACHE_METRIC,
+                tags={"cache_hit": "false"},
+                amount=len(cache_key_strs) - len(local_results),
+            )
+            cache_key_strs = [k for k in cache_key_strs if k not in local_results]
+
+        cache_results = (
+            self.cache.get_many(cache_key_strs, use_case_id.value) if cache_key_strs else {}
+        )
 
         hits = [k for k, v in cache_results.items() if v is not None]
         metrics.incr(
@@ -128,6 +209,16 @@ class CachingIndexer(StringIndexer):
             amount=cache_keys.size,
         )
 
+        if local_cache_size > 0:
+            local_ttl = options.get("sentry-metrics.indexer.local-cache.ttl")
+            local_indexer_cache.set_many(
+                {k: v for k, v in cache_results.items() if v is not None},
+                use_case_id.value,
+                local_cache_size,
+                local_ttl,
+            )
+            cache_results.update(local_results)
+
         cache_key_results = KeyResults()
         cache_key_results.add_key_results(
             [KeyResult.from_string(k, v) for k, v in cache_results.items() if v is not None],
@@ -140,9 +231,12 @@ class CachingIndexer(StringIndexer):
             return cache_key_results
 
         db_record_key_results = self.indexer.bulk_record(use_case_id, db_record_keys.mapping)
-        self.cache.set_many(
-            db_record_key_results.get_mapped_key_strings_to_ints(), use_case_id.value
-        )
+        db_record_key_strings = db_record_key_results.get_mapped_key_strings_to_ints()
+        self.cache.set_many(db_record_key_strings, use_case_id.value)
+        if local_cache_size > 0:
+            local_indexer_cache.set_many(
+                db_record_key_strings, use_case_id.value, local_cache_size, local_ttl
+            )
         return cache_key_results.merge(db_record_key_results)
 
     def record(self, use_case_id: UseCaseKey, org_id: int, string: str) -> Optional[int]:
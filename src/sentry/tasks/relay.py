@@ -121,22 +121,7 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
         # it could be possible that refrequent invalidations cause the task to take excessive time
         # to complete.
         for organization in Organization.objects.filter(id=organization_id):
-            for project in Project.objects.filter(organization_id=organization_id):
-                project.set_cached_field_value("organization", organization)
-                for key in ProjectKey.objects.filter(project_id=project.id):
-                    key.set_cached_field_value("project", project)
-                    # If we find the config in the cache it means it was active.  As such we want to
-                    # recalculate it.  If the config was not there at all, we leave it and avoid the
-                    # cost of re-computation.
-                    if projectconfig_cache.get(key.public_key) is not None:
-                        configs[key.public_key] = compute_projectkey_config(key)
-                        action = "recompute"
-                    else:
-                        action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "organization"},
-                    )
+            configs.update(compute_organization_configs(organization))
     elif project_id:
         for project in Project.objects.filter(id=project_id):
             for key in ProjectKey.objects.filter(project_id=project_id):
@@ -175,6 +160,52 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
+def compute_organization_configs(organization):
+    """Computes the configs of all cached public keys of an organization.
+
+    Unlike computing the configs one by one, this checks which keys are cached
+    and loads the project keys, project options and features of all projects
+    in bulk.
+
+    :returns: A dict mapping the affected public keys to their config.
+    """
+    from sentry.models import Project, ProjectKey
+    from sentry.relay.config import prefetch_project_configs
+
+    projects = {
+        project.id: project for project in Project.objects.filter(organization_id=organization.id)
+    }
+    keys = list(ProjectKey.objects.filter(project_id__in=projects))
+    cached_public_keys = projectconfig_cache.exists_many([key.public_key for key in keys])
+
+    keys_to_compute = []
+    for key in keys:
+        project = projects[key.project_id]
+        project.set_cached_field_value("organization", organization)
+        key.set_cached_field_value("project", project)
+        # If we find the config in the cache it means it was active.  As such we want to
+        # recalculate it.  If the config was not there at all, we leave it and avoid the
+        # cost of re-computation.
+        if key.public_key in cached_public_keys:
+            keys_to_compute.append(key)
+            action = "recompute"
+        else:
+            action = "not-cached"
+        metrics.incr(
+            "relay.projectconfig_cache.invalidation.recompute",
+            tags={"action": action, "scope": "organization"},
+        )
+
+    configs = {}
+    if keys_to_compute:
+        affected_projects = list({key.project_id: key.project for key in keys_to_compute}.values())
+        with prefetch_project_configs(organization, affected_projects):
+            for key in keys_to_compute:
+                configs[key.public_key] = compute_projectkey_config(key)
+
+    return configs
+
+
 def compute_projectkey_config(key):
     """Computes a single config for the given :class:`ProjectKey`.
 
@@ -12,6 +12,7 @@ from django.utils.encoding import force_bytes
 from pkg_resources import resource_string
 
 from sentry.tsdb.base import BaseTSDB
+from sentry.tsdb.writebuffer import TSDBWriteBuffer
 from sentry.utils.compat import crc32
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.redis import SentryScript, check_cluster_versions, get_cluster_from_options
@@ -105,6 +106,10 @@ class RedisTSDB(BaseTSDB):
     frequency table can be displayed as percentages of the whole data set.
     (Additional documentation and the bulk of the logic for implementing the
     frequency table API can be found in the ``cmsketch.lua`` script.)
+
+    Setting ``write_buffer_interval`` (in seconds) enables an in-process
+    write-behind buffer for simple and distinct counters, see
+    ``TSDBWriteBuffer``. ``write_buffer_max_items`` bounds its size.
     """
 
     DEFAULT_SKETCH_PARAMETERS = SketchParameters(3, 128, 50)
@@ -114,8 +119,16 @@ class RedisTSDB(BaseTSDB):
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+        write_buffer_interval = options.pop("write_buffer_interval", None)
+        write_buffer_max_items = options.pop("write_buffer_max_items", 10000)
         super().__init__(**options)
 
+        self.write_buffer = None
+        if write_buffer_interval:
+            self.write_buffer = TSDBWriteBuffer(
+                self, write_buffer_interval, max_items=write_buffer_max_items
+            )
+
     def validate(self):
         logger.debug("Validating Redis version...")
         version = Version((2, 8, 18)) if self.enable_frequency_sketches else Version((2, 8, 9))
@@ -215,11 +228,17 @@ class RedisTSDB(BaseTSDB):
         ...             (TimeSeriesModel.group, 5, {"timestamp": ...})])
         """
 
+        self.validate_arguments([item[0] for item in items], [environment_id])
+
+        if self.write_buffer is not None:
+            self.write_buffer.incr_multi(items, timestamp, count, environment_id)
+        else:
+            self._incr_multi(items, timestamp, count, environment_id)
+
+    def _incr_multi(self, items, timestamp=None, count=1, environment_id=None):
         default_timestamp = timestamp
         default_count = count
 
-        self.validate_arguments([item[0] for item in items], [environment_id])
-
         if default_timestamp is None:
             default_timestamp = timezone.now()
 
@@ -396,6 +415,12 @@ class RedisTSDB(BaseTSDB):
         """
         self.validate_arguments([model for model, key, values in items], [environment_id])
 
+        if self.write_buffer is not None:
+            self.write_buffer.record_multi(items, timestamp, environment_id)
+        else:
+            self._record_multi(items, timestamp, environment_id)
+
+    def _record_multi(self, items, timestamp=None, environment_id=None):
         if timestamp is None:
             timestamp = timezone.now()
 
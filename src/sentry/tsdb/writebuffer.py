@@ -0,0 +1,167 @@
+import atexit
+import logging
+import math
+import threading
+from collections import defaultdict
+from functools import reduce
+
+from celery.signals import worker_process_shutdown
+from django.utils import timezone
+
+from sentry.utils import metrics
+from sentry.utils.dates import to_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class TSDBWriteBuffer:
+    """\
+    Aggregates counter increments and distinct counter records in process
+    before writing them to a ``RedisTSDB``.
+
+    Writes are merged by ``(model, key, bucket, environment_id)``, where the
+    bucket is the timestamp normalized to the greatest common divisor of all
+    configured rollups. Every rollup bucket is therefore a union of buffer
+    buckets and merging does not change the stored values.
+
+    Pending writes are flushed when ``max_items`` distinct entries have been
+    buffered, ``interval`` seconds after the first write following a flush,
+    and when the process (or Celery worker process) exits. Until then they
+    are not visible to readers. Writes of a failed flush are put back into
+    the buffer and retried with the next one.
+    """
+
+    def __init__(self, tsdb, interval, max_items=10000):
+        assert interval > 0
+        assert max_items > 0
+        self.tsdb = tsdb
+        self.interval = interval
+        self.max_items = max_items
+        self.resolution = reduce(math.gcd, tsdb.rollups.keys())
+
+        self._lock = threading.Lock()
+        self._timer = None
+        # (model, key, epoch, environment_id) -> count
+        self._counters = defaultdict(int)
+        # (model, key, epoch, environment_id) -> set of values
+        self._records = defaultdict(set)
+
+        atexit.register(self.flush)
+        # Celery worker processes exit through ``os._exit``, which skips
+        # ``atexit`` handlers.
+        worker_process_shutdown.connect(self._on_worker_process_shutdown, weak=False)
+
+    def _on_worker_process_shutdown(self, **kwargs):
+        self.flush()
+
+    def __len__(self):
+        return len(self._counters) + len(self._records)
+
+    def _get_epoch(self, timestamp):
+        if timestamp is None:
+            timestamp = timezone.now()
+        return self.tsdb.normalize_to_epoch(timestamp, self.resolution)
+
+    def incr_multi(self, items, timestamp=None, count=1, environment_id=None):
+        default_epoch = self._get_epoch(timestamp)
+
+        with self._lock:
+            for item in items:
+                if len(item) == 2:
+                    model, key = item
+                    options = {}
+                else:
+                    model, key, options = item
+
+                epoch = (
+                    self._get_epoch(options["timestamp"])
+                    if "timestamp" in options
+                    else default_epoch
+                )
+                self._counters[(model, key, epoch, environment_id)] += options.get("count", count)
+
+        self._after_write()
+
+    def record_multi(self, items, timestamp=None, environment_id=None):
+        epoch = self._get_epoch(timestamp)
+
+        with self._lock:
+            for model, key, values in items:
+                self._records[(model, key, epoch, environment_id)].update(values)
+
+        self._after_write()
+
+    def _after_write(self):
+        if len(self) >= self.max_items:
+            self.flush()
+            return
+
+        with self._lock:
+            self._start_timer()
+
+    def _start_timer(self):
+        # Must be called with ``self._lock`` held.
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _restore(self, counters, records):
+        with self._lock:
+            for bucket, count in counters.items():
+                self._counters[bucket] += count
+            for bucket, values in records.items():
+                self._records[bucket].update(values)
+            self._start_timer()
+
+    def flush(self):
+        with self._lock:
+            counters, self._counters = self._counters, defaultdict(int)
+            records, self._records = self._records, defaultdict(set)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not counters and not records:
+            return
+
+        metrics.timing("tsdb.write-buffer.flush.counters", len(counters))
+        metrics.timing("tsdb.write-buffer.flush.records", len(records))
+
+        counters_by_environment = defaultdict(dict)
+        for (model, key, epoch, environment_id), count in counters.items():
+            counters_by_environment[environment_id][(model, key, epoch, environment_id)] = count
+
+        records_by_bucket = defaultdict(list)
+        for (model, key, epoch, environment_id), values in records.items():
+            records_by_bucket[(epoch, environment_id)].append((model, key, values))
+
+        try:
+            with metrics.timer("tsdb.write-buffer.flush"):
+                for environment_id, buckets in list(counters_by_environment.items()):
+                    self.tsdb._incr_multi(
+                        [
+                            (model, key, {"timestamp": to_datetime(epoch), "count": count})
+                            for (model, key, epoch, _), count in buckets.items()
+                        ],
+                        environment_id=environment_id,
+                    )
+                    # Increments are not idempotent and must not be retried
+                    # once written.
+                    del counters_by_environment[environment_id]
+
+                for (epoch, environment_id), items in records_by_bucket.items():
+                    self.tsdb._record_multi(
+                        items, timestamp=to_datetime(epoch), environment_id=environment_id
+                    )
+        except Exception:
+            logger.exception("tsdb.write-buffer.flush-failed")
+            metrics.incr("tsdb.write-buffer.flush-failed")
+            self._restore(
+                {
+                    bucket: count
+                    for buckets in counters_by_environment.values()
+                    for bucket, count in buckets.items()
+                },
+                records,
+            )
@@ -65,9 +65,9 @@ def cached(cache, function, *args, **kwargs):
     """
     key = (function, args, tuple(sorted(kwargs.items())))
 
-    if key in cache:
+    try:
         rv = cache[key]
-    else:
+    except KeyError:
         rv = cache[key] = function(*args)
 
     return rv
@@ -316,8 +316,13 @@ def _detect_performance_problems(data: Event, sdk_span: Any) -> List[Performance
         ),
     }
 
-    for _, detector in detectors.items():
-        run_detector_on_data(detector, data)
+    if options.get("performance.issues.columnar-detection"):
+        columns = SpanColumns(data.get("spans", []))
+        for _, detector in detectors.items():
+            run_detector_on_columns(detector, columns)
+    else:
+        for _, detector in detectors.items():
+            run_detector_on_data(detector, data)
 
     # Metrics reporting only for detection, not created issues.
     report_metrics_for_detectors(data, event_id, detectors, sdk_span)
@@ -363,6 +368,11 @@ def run_detector_on_data(detector, data):
     detector.on_complete()
 
 
+def run_detector_on_columns(detector, columns):
+    detector.visit_spans(columns)
+    detector.on_complete()
+
+
 # Uses options and flags to determine which orgs and which detectors automatically create performance issues.
 def get_allowed_issue_creation_detectors(project_id: str):
     project = Project.objects.get_from_cache(id=project_id)
@@ -451,6 +461,32 @@ def get_span_duration(span: Span):
     )
 
 
+class SpanColumns:
+    """
+    The spans of a transaction as parallel lists, so that values every
+    detector needs are computed once per span rather than once per detector.
+    Fingerprints are only computed for the spans they are requested for.
+    """
+
+    def __init__(self, spans: TransactionSpans):
+        self.spans = spans
+        self.span_ids = [span.get("span_id", None) for span in spans]
+        self.ops = [span.get("op", None) for span in spans]
+        self.hashes = [span.get("hash", None) for span in spans]
+        self.durations = [get_span_duration(span) for span in spans]
+        self._fingerprints: Dict[int, Optional[str]] = {}
+
+    def __len__(self):
+        return len(self.spans)
+
+    def fingerprint(self, index: int) -> Optional[str]:
+        try:
+            return self._fingerprints[index]
+        except KeyError:
+            rv = self._fingerprints[index] = fingerprint_span(self.spans[index])
+            return rv
+
+
 class PerformanceDetector(ABC):
     """
     Classes of this type have their visit functions called as the event is walked once and will store a performance issue if one is detected.
@@ -484,6 +520,31 @@ class PerformanceDetector(ABC):
                 return op, span_id, op_prefix, span_duration, setting
         return None
 
+    def settings_for_spans(
+        self, columns: SpanColumns
+    ) -> List[Optional[Tuple[Any, Dict[str, Any]]]]:
+        """
+        Returns ``(op_prefix, settings)`` for every span, or ``None`` for the
+        spans ``settings_for_span`` skips. Matching only depends on the op, so
+        it is done once per distinct op.
+        """
+        settings_by_op = {}
+        rv = []
+        for op, span_id in zip(columns.ops, columns.span_ids):
+            if not op or not span_id:
+                rv.append(None)
+                continue
+
+            if op not in settings_by_op:
+                settings_by_op[op] = None
+                for setting in self.settings:
+                    op_prefix = self.find_span_prefix(setting, op)
+                    if op_prefix:
+                        settings_by_op[op] = (op_prefix, setting)
+                        break
+            rv.append(settings_by_op[op])
+        return rv
+
     def event(self) -> Event:
         return self._event
 
@@ -496,6 +557,15 @@ class PerformanceDetector(ABC):
     def visit_span(self, span: Span) -> None:
         raise NotImplementedError
 
+    def visit_spans(self, columns: SpanColumns) -> None:
+        """
+        Visits all spans of the transaction at once. Detectors can override
+        this with a batched pass, which has to store exactly the problems
+        calling `visit_span` for every span would.
+        """
+        for span in columns.spans:
+            self.visit_span(span)
+
     def on_complete(self) -> None:
         pass
 
@@ -550,6 +620,9 @@ class DuplicateSpanDetector(PerformanceDetector):
                     span_id, op_prefix, spans_involved
                 )
 
+    def visit_spans(self, columns: SpanColumns):
+        _visit_duplicate_spans(self, columns, columns.fingerprint)
+
 
 class DuplicateSpanHashDetector(PerformanceDetector):
     """
@@ -597,6 +670,51 @@ class DuplicateSpanHashDetector(PerformanceDetector):
                     span_id, op_prefix, spans_involved, hash
                 )
 
+    def visit_spans(self, columns: SpanColumns):
+        _visit_duplicate_spans(self, columns, columns.hashes.__getitem__, with_fingerprint=True)
+
+
+def _visit_duplicate_spans(detector, columns, get_key, with_fingerprint=False):
+    """
+    Batched version of `visit_span` of the duplicate span detectors, grouping
+    the spans by the key returned by ``get_key`` first. Problems are stored
+    in the order `visit_span` would have stored them.
+    """
+    indexes_by_key: Dict[str, List[int]] = {}
+    settings_for_spans = detector.settings_for_spans(columns)
+    for index, settings_for_span in enumerate(settings_for_spans):
+        if not settings_for_span:
+            continue
+        key = get_key(index)
+        if key:
+            indexes_by_key.setdefault(key, []).append(index)
+
+    triggers = []
+    for key, indexes in indexes_by_key.items():
+        cumulative_duration = timedelta(0)
+        trigger = None
+        for count, index in enumerate(indexes, 1):
+            cumulative_duration += columns.durations[index]
+            if trigger is None:
+                settings = settings_for_spans[index][1]
+                if count >= settings.get("count") and cumulative_duration >= timedelta(
+                    milliseconds=settings.get("cumulative_duration")
+                ):
+                    trigger = index
+
+        detector.cumulative_durations[key] = cumulative_duration
+        detector.duplicate_spans_involved[key] = [columns.span_ids[index] for index in indexes]
+        if trigger is not None:
+            triggers.append((trigger, key))
+
+    for index, key in sorted(triggers):
+        detector.stored_problems[key] = PerformanceSpanProblem(
+            columns.span_ids[index],
+            settings_for_spans[index][0],
+            detector.duplicate_spans_involved[key],
+            fingerprint=key if with_fingerprint else "",
+        )
+
 
 class SlowSpanDetector(PerformanceDetector):
     """
@@ -630,6 +748,24 @@ class SlowSpanDetector(PerformanceDetector):
                 span_id, op_prefix, spans_involved
             )
 
+    def visit_spans(self, columns: SpanColumns):
+        for index, settings_for_span in enumerate(self.settings_for_spans(columns)):
+            if not settings_for_span:
+                continue
+            op_prefix, settings = settings_for_span
+
+            fingerprint = columns.fingerprint(index)
+            if not fingerprint or fingerprint in self.stored_problems:
+                continue
+
+            if columns.durations[index] >= timedelta(
+                milliseconds=settings.get("duration_threshold")
+            ):
+                span_id = columns.span_ids[index]
+                self.stored_problems[fingerprint] = PerformanceSpanProblem(
+                    span_id, op_prefix, [span_id]
+                )
+
 
 class SequentialSlowSpanDetector(PerformanceDetector):
     """
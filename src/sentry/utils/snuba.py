@@ -3,9 +3,11 @@ import logging
 import os
 import random
 import re
+import threading
 import time
+import zlib
 from collections import namedtuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime, timedelta
@@ -23,6 +25,7 @@ from sentry_sdk import Hub
 from snuba_sdk import Request
 from snuba_sdk.legacy import json_to_snql
 
+from sentry import options
 from sentry.models import (
     Environment,
     Group,
@@ -739,6 +742,107 @@ def bulk_raw_query(
     return _apply_cache_and_build_results(params, referrer=referrer, use_cache=use_cache)
 
 
+class InflightQueries:
+    """
+    Tracks the cacheable queries this process is running, so that threads
+    asking for an identical query wait for its result instead of sending
+    the query again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._futures: MutableMapping[str, Future] = {}
+
+    def claim(self, cache_key: str) -> Tuple[Future, bool]:
+        """
+        Returns the future for the result of the query, and whether the
+        caller is the one that has to run the query and `resolve` it.
+        """
+        with self._lock:
+            future = self._futures.get(cache_key)
+            if future is not None:
+                return future, False
+            future = self._futures[cache_key] = Future()
+            return future, True
+
+    def resolve(
+        self,
+        cache_key: str,
+        encoded_result: Optional[Union[str, bytes]] = None,
+        exc: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            future = self._futures.pop(cache_key, None)
+        if future is None:
+            return
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(encoded_result)
+
+
+inflight_queries = InflightQueries()
+
+
+def _encode_result(result: Mapping[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(result).encode("utf-8"))
+
+
+def _decode_result(value: Union[str, bytes]) -> Mapping[str, Any]:
+    # Results are cached as plain JSON strings unless
+    # `snuba.query-cache.compress` is enabled.
+    if isinstance(value, bytes):
+        value = zlib.decompress(value).decode("utf-8")
+    return json.loads(value)
+
+
+def _acquire_query_leases(
+    to_query: Sequence[Tuple[int, SnubaQueryBody, Optional[str]]], duration: float
+) -> Tuple[List[Any], List[Any], List[Any]]:
+    """
+    Takes a lease on each query, so that other processes running the same
+    query wait for its result to be cached. Returns the queries with a
+    lease, the queries another process holds the lease of, and the leases.
+    """
+    from sentry.locks import locks
+    from sentry.utils.locking import UnableToAcquireLock
+
+    leased = []
+    leased_elsewhere = []
+    leases = []
+    for item in to_query:
+        lock = locks.get(
+            f"sqc-lease:{item[2]}", duration=max(1, int(duration)), name="snuba_query_cache"
+        )
+        try:
+            lock.acquire()
+        except UnableToAcquireLock:
+            leased_elsewhere.append(item)
+        else:
+            leased.append(item)
+            leases.append(lock)
+
+    return leased, leased_elsewhere, leases
+
+
+def _wait_for_cached_results(cache_keys: Sequence[str], timeout: float) -> Mapping[str, Any]:
+    """
+    Polls the cache for results other processes are querying for, until all
+    of them are there or ``timeout`` seconds passed.
+    """
+    found: MutableMapping[str, Any] = {}
+    pending = list(cache_keys)
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        time.sleep(0.05)
+        for key, value in cache.get_many(pending).items():
+            if value is not None:
+                found[key] = value
+        pending = [key for key in pending if key not in found]
+
+    return found
+
+
 def _apply_cache_and_build_results(
     snuba_param_list: Sequence[SnubaQueryBody],
     referrer: Optional[str] = None,
@@ -753,6 +857,11 @@ def _apply_cache_and_build_results(
     query_param_list = list(enumerate(snuba_param_list))
 
     results = []
+    # Queries an identical one of which is already running in this process.
+    coalesced: List[Tuple[int, Future]] = []
+    coalesce = use_cache and options.get("snuba.query-cache.coalesce")
+    compress = use_cache and options.get("snuba.query-cache.compress")
+    metric_tags = {"referrer": referrer} if referrer else None
 
     if use_cache:
         cache_keys = [get_cache_key(query_params[0]) for _, query_params in query_param_list]
@@ -760,23 +869,73 @@ def _apply_cache_and_build_results(
         to_query: List[Tuple[int, SnubaQueryBody, Optional[str]]] = []
         for (query_pos, query_params), cache_key in zip(query_param_list, cache_keys):
             cached_result = cache_data.get(cache_key)
-            metric_tags = {"referrer": referrer} if referrer else None
             if cached_result is None:
                 metrics.incr("snuba.query_cache.miss", tags=metric_tags)
+                if coalesce:
+                    future, is_owner = inflight_queries.claim(cache_key)
+                    if not is_owner:
+                        metrics.incr("snuba.query_cache.coalesced", tags=metric_tags)
+                        coalesced.append((query_pos, future))
+                        continue
                 to_query.append((query_pos, query_params, cache_key))
             else:
                 metrics.incr("snuba.query_cache.hit", tags=metric_tags)
-                results.append((query_pos, json.loads(cached_result)))
+                results.append((query_pos, _decode_result(cached_result)))
     else:
         to_query = [(query_pos, query_params, None) for query_pos, query_params in query_param_list]
 
-    if to_query:
-        query_results = _bulk_snuba_query([item[1] for item in to_query], headers)
-        for result, (query_pos, _, cache_key) in zip(query_results, to_query):
+    def run_queries(queries: Sequence[Tuple[int, SnubaQueryBody, Optional[str]]]) -> None:
+        query_results = _bulk_snuba_query([item[1] for item in queries], headers)
+        for result, (query_pos, _, cache_key) in zip(query_results, queries):
             if cache_key:
-                cache.set(cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
+                # Waiting threads decode the same value that is cached.
+                encoded_result = _encode_result(result) if compress else json.dumps(result)
+                cache.set(cache_key, encoded_result, settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
+                if coalesce:
+                    inflight_queries.resolve(cache_key, encoded_result)
             results.append((query_pos, result))
 
+    leases = []
+    try:
+        leased_elsewhere = []
+        lease_timeout = options.get("snuba.query-cache.lease-timeout") if coalesce else 0
+        if to_query and lease_timeout > 0:
+            to_query, leased_elsewhere, leases = _acquire_query_leases(to_query, lease_timeout)
+
+        if to_query:
+            run_queries(to_query)
+
+        if leased_elsewhere:
+            found = _wait_for_cached_results(
+                [cache_key for _, _, cache_key in leased_elsewhere], lease_timeout
+            )
+            remaining = []
+            for query_pos, query_params, cache_key in leased_elsewhere:
+                if cache_key in found:
+                    metrics.incr("snuba.query_cache.lease_hit", tags=metric_tags)
+                    inflight_queries.resolve(cache_key, found[cache_key])
+                    results.append((query_pos, _decode_result(found[cache_key])))
+                else:
+                    metrics.incr("snuba.query_cache.lease_timeout", tags=metric_tags)
+                    remaining.append((query_pos, query_params, cache_key))
+            if remaining:
+                run_queries(remaining)
+    except BaseException as e:
+        # Do not leave threads waiting for queries that will never finish.
+        if coalesce:
+            for _, _, cache_key in to_query:
+                inflight_queries.resolve(cache_key, exc=e)
+            for _, _, cache_key in leased_elsewhere:
+                inflight_queries.resolve(cache_key, exc=e)
+        raise
+    finally:
+        for lease in leases:
+            lease.release()
+
+    for query_pos, future in coalesced:
+        # Every waiter decodes its own copy, as callers modify results.
+        results.append((query_pos, _decode_result(future.result())))
+
     # Sort so that we get the results back in the original param list order
     results.sort()
     # Drop the sort order val
@@ -838,7 +997,12 @@ def _bulk_snuba_query(
             query_results = [query_fn((snuba_param_list[0], Hub(Hub.current), headers))]
 
     results = []
-    for response, _, reverse in query_results:
+    # Decode one response at a time, and drop it as soon as it is decoded.
+    # Otherwise the raw bodies of all responses are kept alive next to the
+    # decoded results until every query was decoded.
+    query_results.reverse()
+    while query_results:
+        response, _, reverse = query_results.pop()
         try:
             body = json.loads(response.data)
             if SNUBA_INFO:
@@ -875,8 +1039,13 @@ def _bulk_snuba_query(
             else:
                 raise SnubaError(f"HTTP {response.status}")
 
-        # Forward and reverse translation maps from model ids to snuba keys, per column
-        body["data"] = [reverse(d) for d in body["data"]]
+        del response
+
+        # Forward and reverse translation maps from model ids to snuba keys, per column.
+        # Rows are translated in place, as a result can be large.
+        rows = body["data"]
+        for i, row in enumerate(rows):
+            rows[i] = reverse(row)
         results.append(body)
 
     return results
@@ -1,4 +1,8 @@
+from unittest import mock
+
+from sentry import features
 from sentry.api.serializers import Serializer, serialize
+from sentry.api.serializers.models.project import ProjectSerializer
 from sentry.testutils import TestCase
 
 
@@ -16,6 +20,11 @@ class VariadicSerializer(Serializer):
         return {"kw": kw}
 
 
+class NestedProjectSerializer(Serializer):
+    def serialize(self, obj, attrs, user):
+        return serialize(obj, user, ProjectSerializer())
+
+
 class BaseSerializerTest(TestCase):
     def test_serialize(self):
         assert serialize([]) == []
@@ -53,3 +62,28 @@ class BaseSerializerTest(TestCase):
         user = self.create_user()
         result = serialize(foo, user, VariadicSerializer(), kw="keyword")
         assert result["kw"] == "keyword"
+
+    def test_serialize_memoizes_features(self):
+        feature_name = "projects:test-serialize-memoize"
+        checked = []
+
+        class TestProjectHandler(features.FeatureHandler):
+            features = {feature_name}
+
+            def has(self, feature, actor):
+                checked.append(feature.project)
+                return True
+
+        with mock.patch.dict(
+            features.default_manager._feature_registry, {feature_name: features.ProjectFeature}
+        ), mock.patch.dict(
+            features.default_manager._handler_registry, {feature_name: [TestProjectHandler()]}
+        ):
+            result = serialize([self.project, self.project], self.user, NestedProjectSerializer())
+
+            assert all("test-serialize-memoize" in r["features"] for r in result)
+            assert checked == [self.project]
+
+            # The results are not remembered across calls
+            serialize(self.project, self.user, NestedProjectSerializer())
+            assert checked == [self.project, self.project]
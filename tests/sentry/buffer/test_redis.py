@@ -103,6 +103,45 @@ class RedisBufferTest(TestCase):
         group = Group.objects.get_from_cache(id=self.group.id)
         assert group.times_seen == orig_times_seen + times_seen_incr
 
+    @freeze_time()
+    def test_bulk_flush_updates_groups(self):
+        self.buf.bulk_flush = True
+        self.buf.incr_batch_size = 10
+        other_group = self.create_group()
+        orig_times_seen = Group.objects.get_from_cache(id=self.group.id).times_seen
+        other_orig_times_seen = other_group.times_seen
+        now = timezone.now()
+
+        self.buf.incr(Group, {"times_seen": 5}, {"pk": self.group.id}, {"last_seen": now})
+        self.buf.incr(Group, {"times_seen": 2}, {"id": other_group.id}, {"message": "foo"})
+        with self.tasks(), mock.patch("sentry.buffer", self.buf):
+            self.buf.process_pending()
+
+        group = Group.objects.get_from_cache(id=self.group.id)
+        assert group.times_seen == orig_times_seen + 5
+        assert group.last_seen == now
+        other_group = Group.objects.get(id=other_group.id)
+        assert other_group.times_seen == other_orig_times_seen + 2
+        assert other_group.message == "foo"
+        assert other_group.last_seen != now
+
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_bulk_flush_falls_back_for_other_models(self, process):
+        self.buf.bulk_flush = True
+        client = self.buf.cluster.get_routing_client()
+        client.hmset(
+            "foo",
+            {
+                "f": '{"pk": ["i","1"]}',
+                "i+times_seen": "1",
+                "m": "unittest.mock.Mock",
+            },
+        )
+        self.buf.process(batch_keys=["foo"])
+        process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, None)
+        assert client.hgetall("foo") == {}
+
     def test_get(self):
         model = mock.Mock()
         model.__name__ = "Mock"
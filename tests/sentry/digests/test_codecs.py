@@ -0,0 +1,38 @@
+from sentry.digests.codecs import CompressedPickleCodec, NotificationCodec
+from sentry.digests.notifications import Notification
+from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+
+
+class NotificationCodecTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.codec = NotificationCodec()
+        self.event = self.store_event(data={"message": "hello"}, project_id=self.project.id)
+        self.notification = Notification(self.event, [1, 2])
+
+    def test_pickle(self):
+        value = self.codec.encode(self.notification)
+        assert CompressedPickleCodec().decode(value).event == self.event
+
+        decoded = self.codec.decode(value)
+        assert decoded.event.data["logentry"] == self.event.data["logentry"]
+        assert decoded.rules == [1, 2]
+
+        assert self.codec.decode(self.codec.encode("value")) == "value"
+
+    @override_options({"digests.compact-records": True})
+    def test_compact(self):
+        value = self.codec.encode(self.notification)
+        assert len(value) < 100
+
+        decoded = self.codec.decode(value)
+        assert decoded.event.event_id == self.event.event_id
+        assert decoded.event.project_id == self.project.id
+        assert decoded.event.group_id == self.event.group_id
+        assert decoded.rules == [1, 2]
+
+        # The payload is loaded from nodestore.
+        assert decoded.event.data["logentry"] == self.event.data["logentry"]
+
+        assert self.codec.decode(self.codec.encode("value")) == "value"
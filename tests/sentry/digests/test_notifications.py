@@ -12,8 +12,10 @@ from sentry.digests.notifications import (
     sort_group_contents,
     sort_rule_groups,
     split_key,
+    summarize_records,
     unsplit_key,
 )
+from sentry.eventstore.models import Event
 from sentry.models import Rule
 from sentry.notifications.types import ActionTargetType
 from sentry.testutils import TestCase
@@ -82,6 +84,33 @@ class GroupRecordsTestCase(TestCase):
         }
 
 
+class SummarizeRecordsTestCase(TestCase):
+    def test_success(self):
+        def record(i, group_id, rules):
+            event = Event(self.project.id, f"{i:032x}", group_id=group_id)
+            return Record(event.event_id, Notification(event, rules), 1000 - i)
+
+        # Records are in reverse chronological order.
+        records = [
+            record(0, 1, [1]),
+            record(1, 1, [1, 2]),
+            record(2, 1, [1]),
+            record(3, 2, [1]),
+            record(4, 1, [1]),
+            record(5, 1, []),
+            record(6, 1, [2]),
+        ]
+
+        assert summarize_records(records) == [
+            records[0],
+            records[1],
+            records[3],
+            records[4],
+            records[5],
+            records[6],
+        ]
+
+
 class SortRecordsTestCase(TestCase):
     def test_success(self):
         Rule.objects.create(
@@ -35,6 +35,7 @@ from sentry.event_manager import (
     _get_event_instance,
     _save_grouphash_and_group,
     has_pending_commit_resolution,
+    save_error_events,
 )
 from sentry.eventstore.models import Event
 from sentry.grouping.utils import hash_from_values
@@ -2385,6 +2386,64 @@ class EventManagerTest(TestCase, SnubaTestCase, EventManagerTestMixin):
             assert data3["hashes"] == [expected_hash]
 
 
+@region_silo_test
+class SaveErrorEventsTest(TestCase):
+    def make_job(self, **kwargs):
+        manager = EventManager(make_event(**kwargs))
+        manager.normalize(project_id=self.project.id)
+        return {
+            "data": manager.get_data(),
+            "project_id": self.project.id,
+            "raw": False,
+            "start_time": None,
+            "cache_key": None,
+        }
+
+    def test_saves_batch(self):
+        jobs = [
+            self.make_job(message="foo", checksum="a" * 32),
+            self.make_job(message="foo", checksum="a" * 32),
+            self.make_job(message="bar", checksum="b" * 32),
+        ]
+
+        saved = save_error_events(jobs, {self.project.id: self.project})
+
+        assert len(saved) == 3
+        assert saved[0]["event"].group_id == saved[1]["event"].group_id
+        assert saved[0]["event"].group_id != saved[2]["event"].group_id
+        assert Group.objects.get(id=saved[0]["event"].group_id).times_seen == 2
+        for job in saved:
+            node_id = Event.generate_node_id(self.project.id, job["event"].event_id)
+            assert nodestore.get(node_id)["event_id"] == job["event"].event_id
+
+    @mock.patch("sentry.event_manager.eventstream.insert")
+    def test_discarded_hash_is_dropped_from_batch(self, eventstream_insert):
+        discarded_job = self.make_job(message="foo", checksum="a" * 32)
+        save_error_events([discarded_job], {self.project.id: self.project})
+
+        group = Group.objects.get(id=discarded_job["event"].group_id)
+        tombstone = GroupTombstone.objects.create(
+            project_id=group.project_id,
+            level=group.level,
+            message=group.message,
+            culprit=group.culprit,
+            data=group.data,
+            previous_group_id=group.id,
+        )
+        GroupHash.objects.filter(group=group).update(group=None, group_tombstone_id=tombstone.id)
+        eventstream_insert.reset_mock()
+
+        jobs = [
+            self.make_job(message="foo", checksum="a" * 32),
+            self.make_job(message="bar", checksum="b" * 32),
+        ]
+        saved = save_error_events(jobs, {self.project.id: self.project})
+
+        assert saved == [jobs[1]]
+        assert isinstance(jobs[0]["discarded"], HashDiscarded)
+        assert eventstream_insert.call_count == 1
+
+
 class AutoAssociateCommitTest(TestCase, EventManagerTestMixin):
     def setUp(self):
         super().setUp()
@@ -1,4 +1,5 @@
 import copy
+from unittest import mock
 
 from sentry.eventstore.compressor import assemble, deduplicate
 
@@ -52,3 +53,48 @@ def test_basic():
             }
         },
     )
+
+
+def test_nested_interfaces():
+    data = {
+        "modules": {"foo": "1.0", "bar": "2.0"},
+        "sdk": {"name": "sentry.cocoa", "packages": [{"name": "cocoapods:sentry"}]},
+        "contexts": {
+            "os": {"name": "iOS", "version": "16.0"},
+            "runtime": {"name": "CPython", "version": "3.8"},
+            "device": {"model": "iPhone14,2", "family": "iPhone", "free_memory": 12345},
+            "trace": {"trace_id": "a" * 32},
+        },
+        "breadcrumbs": {"values": [{"category": "ui.click", "message": "foo"}, {}]},
+    }
+    original = copy.deepcopy(data)
+
+    _assert_roundtrip(data)
+
+    new_data, extra_keys = deduplicate(data)
+    assert data == original
+    assert "modules" not in new_data
+    assert new_data["sdk"] == {"name": "sentry.cocoa"}
+    assert new_data["contexts"] == {"trace": {"trace_id": "a" * 32}}
+    assert ["contexts.device", mock.ANY, {"free_memory": 12345}] in new_data[
+        "__nodestore_patchsets"
+    ]
+    assert {"model": "iPhone14,2", "family": "iPhone"} in extra_keys.values()
+    # Breadcrumbs differ between almost all events and are kept inline.
+    assert new_data["breadcrumbs"] == original["breadcrumbs"]
+
+
+def test_missing_extra_keys():
+    new_data, extra_keys = deduplicate({"modules": {"foo": "1.0"}, "platform": "python"})
+    assert assemble(new_data, lambda checksums: {}) == {"platform": "python"}
+
+
+def test_assembled_data_is_not_shared():
+    new_data, extra_keys = deduplicate({"modules": {"foo": "1.0"}, "platform": "python"})
+
+    first = assemble(copy.deepcopy(new_data), lambda checksums: extra_keys)
+    second = assemble(copy.deepcopy(new_data), lambda checksums: extra_keys)
+    first["modules"]["bar"] = "2.0"
+
+    assert second["modules"] == {"foo": "1.0"}
+    assert list(extra_keys.values()) == [{"foo": "1.0"}]
@@ -227,6 +227,46 @@ class FeatureManagerTest(TestCase):
         assert manager.has("projects:feature", actor=self.user, project=self.project)
         assert manager.has("auth:register", actor=self.user)
 
+    def test_memoize(self):
+        project_flag = "projects:test_memoize"
+        checked = []
+
+        class TestProjectHandler(features.FeatureHandler):
+            features = {project_flag}
+
+            def has(self, feature, actor):
+                checked.append(feature.project)
+                return feature.project.slug == "enabled"
+
+        enabled = self.create_project(slug="enabled")
+        disabled = self.create_project(slug="disabled")
+
+        manager = features.FeatureManager()
+        manager.add(project_flag, features.ProjectFeature)
+        manager.add_handler(TestProjectHandler())
+
+        with manager.memoize():
+            assert manager.has(project_flag, enabled, actor=self.user)
+            assert manager.has(project_flag, enabled, actor=self.user)
+            assert checked == [enabled]
+
+            with manager.memoize():
+                assert manager.has_for_batch(
+                    project_flag, self.organization, [enabled], actor=self.user
+                ) == {enabled: True}
+                assert manager.has_for_batch(
+                    project_flag, self.organization, [enabled, disabled], actor=self.user
+                ) == {enabled: True, disabled: False}
+            assert checked == [enabled, enabled, disabled]
+
+            assert manager.has_for_batch(
+                project_flag, self.organization, [enabled, disabled], actor=self.user
+            ) == {enabled: True, disabled: False}
+            assert len(checked) == 3
+
+        assert manager.has(project_flag, enabled, actor=self.user)
+        assert len(checked) == 4
+
     def test_user_flag(self):
         manager = features.FeatureManager()
         manager.add("users:feature", features.UserFeature)
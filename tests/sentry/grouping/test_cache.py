@@ -0,0 +1,128 @@
+from unittest import mock
+
+import pytest
+
+from sentry.eventstore.models import Event
+from sentry.grouping.api import get_default_grouping_config_dict
+from sentry.grouping.cache import get_cache_key, get_hashes_cached, local_hash_cache
+from sentry.testutils.helpers import override_options
+
+
+def make_event(**kwargs):
+    data = {
+        "platform": "python",
+        "exception": {
+            "values": [
+                {
+                    "type": "ZeroDivisionError",
+                    "value": "division by zero",
+                    "stacktrace": {
+                        "frames": [
+                            {
+                                "function": "divide",
+                                "module": "app.math",
+                                "in_app": True,
+                                "vars": {"a": 1, "b": 0},
+                            }
+                        ]
+                    },
+                }
+            ]
+        },
+    }
+    data.update(kwargs)
+    return Event(project_id=1, event_id="a" * 32, data=data)
+
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    local_hash_cache.clear()
+    yield
+    local_hash_cache.clear()
+
+
+def test_cache_key_ignores_unrelated_data():
+    config = get_default_grouping_config_dict()
+    key = get_cache_key(make_event().data, config)
+
+    assert key == get_cache_key(make_event(release="1.0", tags=[["foo", "bar"]]).data, config)
+
+    frame_vars = make_event().data
+    frame_vars["exception"]["values"][0]["stacktrace"]["frames"][0]["vars"] = {"a": 2}
+    assert key == get_cache_key(frame_vars, config)
+
+    reordered = make_event().data
+    frames = reordered["exception"]["values"][0]["stacktrace"]["frames"]
+    frames[0] = dict(reversed(list(frames[0].items())))
+    assert key == get_cache_key(reordered, dict(reversed(list(config.items()))))
+
+
+def test_cache_key_covers_grouping_inputs():
+    config = get_default_grouping_config_dict()
+    key = get_cache_key(make_event().data, config)
+
+    assert key != get_cache_key(make_event(platform="javascript").data, config)
+    assert key != get_cache_key(make_event(fingerprint=["foo"]).data, config)
+    assert key != get_cache_key(make_event().data, dict(config, enhancements="other"))
+
+    other_function = make_event().data
+    other_function["exception"]["values"][0]["stacktrace"]["frames"][0]["function"] = "other"
+    assert key != get_cache_key(other_function, config)
+
+    # Fingerprint variables are resolved, so unrelated tags do not matter
+    # but referenced ones do.
+    fingerprint = ["{{ tags.foo }}"]
+    assert get_cache_key(
+        make_event(fingerprint=fingerprint, tags=[["foo", "a"]]).data, config
+    ) != get_cache_key(make_event(fingerprint=fingerprint, tags=[["foo", "b"]]).data, config)
+
+
+@pytest.mark.django_db
+@override_options({"grouping.hash-cache.enabled": True, "grouping.hash-cache.ttl": 0})
+def test_get_hashes_cached():
+    config = get_default_grouping_config_dict()
+    expected = make_event().get_hashes(config)
+
+    with mock.patch.object(Event, "get_hashes", autospec=True, side_effect=Event.get_hashes) as m:
+        assert get_hashes_cached(make_event(), config) == expected
+        assert get_hashes_cached(make_event(release="1.0"), config) == expected
+        assert m.call_count == 1
+
+        get_hashes_cached(make_event(platform="javascript"), config)
+        assert m.call_count == 2
+
+
+@pytest.mark.django_db
+@override_options(
+    {
+        "grouping.hash-cache.enabled": True,
+        "grouping.hash-cache.ttl": 0,
+        "grouping.hash-cache.consistency-sample-rate": 1.0,
+    }
+)
+def test_get_hashes_cached_consistency_sampling():
+    config = get_default_grouping_config_dict()
+    event = make_event()
+    expected = event.get_hashes(config)
+
+    local_hash_cache.set(
+        get_cache_key(event.data, config),
+        {"hashes": ["stale"], "hierarchical_hashes": [], "tree_labels": []},
+        10,
+    )
+
+    with mock.patch.object(Event, "get_hashes", autospec=True, side_effect=Event.get_hashes) as m:
+        assert get_hashes_cached(event, config) == expected
+        assert get_hashes_cached(event, config) == expected
+        assert m.call_count == 2
+
+
+@pytest.mark.django_db
+@override_options({"grouping.hash-cache.enabled": True, "grouping.hash-cache.ttl": 0})
+def test_get_hashes_cached_unknown_config():
+    config = dict(get_default_grouping_config_dict(), id="unknown:2000-01-01")
+
+    with mock.patch.object(Event, "get_hashes", autospec=True) as m:
+        get_hashes_cached(make_event(), config)
+        get_hashes_cached(make_event(), config)
+        assert m.call_count == 2
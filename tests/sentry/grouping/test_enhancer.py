@@ -1,7 +1,13 @@
 import pytest
 
 from sentry.grouping.component import GroupingComponent
-from sentry.grouping.enhancer import Enhancements, InvalidEnhancerConfig, create_match_frame
+from sentry.grouping.enhancer import (
+    Enhancements,
+    InvalidEnhancerConfig,
+    RuleIndex,
+    create_match_frame,
+)
+from sentry.grouping.enhancer.matchers import get_literal_prefix
 
 
 def dump_obj(obj):
@@ -442,3 +448,54 @@ def test_app_no_matches(frame):
     enhancements = Enhancements.from_config_string("app:no +app")
     enhancements.apply_modifications_to_frame([frame], "native", None)
     assert frame.get("in_app")
+
+
+def test_get_literal_prefix():
+    assert get_literal_prefix(b"foo") == b"foo"
+    assert get_literal_prefix(b"std::*") == b"std::"
+    assert get_literal_prefix(b"java.util.?ap") == b"java.util."
+    assert get_literal_prefix(b"[fb]oo") == b""
+    assert get_literal_prefix(b"**/foo.js") == b""
+
+
+def test_rule_index_matches_all_rules():
+    enhancements = Enhancements.from_config_string(
+        """
+        function:std::*                 -app
+        function:foo*                   +app
+        !function:foo*                  -group
+        module:java.util.*              -group
+        [ function:foo ] | function:bar +group
+        function:bar | [ function:baz ] -group
+        module:*.internal.*             -app
+        app:yes                         +group
+        family:native function:panic    ^-group
+        function:*                      category=other
+    """
+    )
+    frames = [
+        {"function": "main", "in_app": True},
+        {"function": "foo"},
+        {"function": "bar", "module": "java.util.HashMap"},
+        {"function": "baz", "module": "com.example.internal.Foo"},
+        {"function": "std::panicking::begin_panic", "platform": "native"},
+        {"function": "panic", "platform": "native"},
+        {"module": "java.util.concurrent.Executor"},
+    ]
+    match_frames = [create_match_frame(frame, "java") for frame in frames]
+    rules = list(enhancements.iter_rules())
+    index = RuleIndex(rules)
+
+    expected = [
+        (rule, rule.get_matching_frame_actions(match_frames, "java"))
+        for rule in rules
+        if rule.get_matching_frame_actions(match_frames, "java")
+    ]
+    actual = [
+        (rule, rule.get_matching_frame_actions(match_frames, "java", frame_indices=indices))
+        for rule, indices in index.iter_candidates(match_frames)
+    ]
+    assert [(rule, actions) for rule, actions in actual if actions] == expected
+
+    # Only rules with a literal function or module prefix are indexed
+    assert len(index._unindexed) == 4
@@ -1,12 +1,19 @@
 import datetime
 import time
 import uuid
+from unittest import mock
 from unittest.mock import Mock
 
+import msgpack
 import pytest
+from arroyo.backends.kafka import KafkaPayload
+from arroyo.types import Message, Partition, Position, Topic
 
 from sentry.event_manager import EventManager
+from sentry.ingest.decoding import decode_payload
 from sentry.ingest.ingest_consumer import (
+    IngestConsumerWorker,
+    ParallelIngestStrategyFactory,
     process_attachment_chunk,
     process_event,
     process_individual_attachment,
@@ -70,6 +77,85 @@ def test_deduplication_works(default_project, task_runner, preprocess_event):
     }
 
 
+@pytest.mark.django_db
+def test_decoded_payload(default_project, task_runner, preprocess_event):
+    payload = get_normalized_event({"message": "hello world"}, default_project)
+    event_id = payload["event_id"]
+    project_id = default_project.id
+    start_time = time.time() - 3600
+
+    message = decode_payload(
+        msgpack.packb(
+            {
+                "type": "event",
+                "payload": json.dumps(payload),
+                "start_time": start_time,
+                "event_id": event_id,
+                "project_id": project_id,
+                "remote_addr": "127.0.0.1",
+            }
+        )
+    )
+    assert "payload" not in message
+    assert message["data"] == payload
+
+    process_event(message, projects={default_project.id: default_project})
+
+    (kwargs,) = preprocess_event
+    assert kwargs["data"] == payload
+    assert kwargs["cache_key"] == f"e:{event_id}:{project_id}"
+
+
+def test_parallel_ingest_strategy_factory():
+    payload = {"message": "hello world", "platform": "python"}
+    partition = Partition(Topic("ingest-events"), 0)
+    commit = Mock()
+
+    factory = ParallelIngestStrategyFactory(
+        processes=1,
+        max_batch_size=10,
+        max_batch_time=1000,
+        max_parallel_batch_size=1,
+        max_parallel_batch_time=1,
+        input_block_size=16384,
+        output_block_size=16384,
+    )
+
+    with mock.patch.object(IngestConsumerWorker, "flush_batch") as flush_batch:
+        strategy = factory.create_with_partitions(commit, {partition: 0})
+        for offset in range(2):
+            strategy.submit(
+                Message(
+                    partition,
+                    offset,
+                    KafkaPayload(
+                        None,
+                        msgpack.packb(
+                            {
+                                "type": "event",
+                                "payload": json.dumps(payload),
+                                "start_time": time.time(),
+                                "event_id": uuid.uuid4().hex,
+                                "project_id": 1,
+                                "remote_addr": "127.0.0.1",
+                            }
+                        ),
+                        [],
+                    ),
+                    datetime.datetime.now(),
+                )
+            )
+            strategy.poll()
+
+        strategy.close()
+        strategy.join()
+
+    # Messages are decoded in the worker process and flushed in one batch.
+    (batch,) = flush_batch.call_args[0]
+    assert [message["data"] for message in batch] == [payload, payload]
+    commit.assert_called_once_with({partition: Position(2, mock.ANY)})
+
+
 @pytest.mark.django_db
 def test_transactions_spawn_save_event_transaction(
     default_project,
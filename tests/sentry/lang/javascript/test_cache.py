@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import ParsedSourceMapCache, SourceCache
 
 
 class BasicCacheTest(TestCase):
@@ -34,3 +34,27 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ParsedSourceMapCacheTest(TestCase):
+    def test_lru_eviction(self):
+        cache = ParsedSourceMapCache()
+        a, b, c = object(), object(), object()
+
+        cache.set("a", a, 4, max_bytes=10)
+        cache.set("b", b, 4, max_bytes=10)
+        assert cache.get("a") is a
+        assert cache.size == 8
+
+        # "b" is the least recently used entry
+        cache.set("c", c, 4, max_bytes=10)
+        assert cache.get("b") is None
+        assert cache.get("a") is a
+        assert cache.get("c") is c
+        assert cache.size == 8
+
+    def test_too_large(self):
+        cache = ParsedSourceMapCache()
+        cache.set("a", object(), 11, max_bytes=10)
+        assert len(cache) == 0
+        assert cache.get("a") is None
@@ -12,6 +12,7 @@ from requests.exceptions import RequestException
 
 from sentry import http, options
 from sentry.event_manager import get_tag
+from sentry.lang.javascript.cache import parsed_sourcemap_cache
 from sentry.lang.javascript.errormapping import REACT_MAPPING_URL, rewrite_exception
 from sentry.lang.javascript.processor import (
     CACHE_CONTROL_MAX,
@@ -29,6 +30,7 @@ from sentry.lang.javascript.processor import (
     get_max_age,
     get_release_file_cache_key,
     get_release_file_cache_key_meta,
+    prefetch_release_files,
     should_retry_fetch,
     trim_line,
 )
@@ -686,6 +688,10 @@ class FetchFileTest(TestCase):
         result2 = fetch_file("/example.js", release=release)
         assert result2 == result
 
+    @override_options({"sourcemaps.indexed-archive-reader.enabled": True})
+    def test_non_url_with_release_archive_indexed(self):
+        self.test_non_url_with_release_archive()
+
     def _create_archive(self, release, url):
         pseudo_archive = File.objects.create(name="", type="release.bundle")
         pseudo_archive.putfile(BytesIO(b"0123456789"))
@@ -1160,6 +1166,20 @@ class FetchSourcemapTest(TestCase):
         with pytest.raises(UnparseableSourcemap):
             fetch_sourcemap("data:application/json;base64,xxx")
 
+    @override_options({"sourcemaps.parsed-cache.max-bytes": 1024 * 1024})
+    def test_parsed_cache(self):
+        parsed_sourcemap_cache.clear()
+        self.addCleanup(parsed_sourcemap_cache.clear)
+
+        smap_view = fetch_sourcemap(base64_sourcemap, use_smcache=False)
+        assert fetch_sourcemap(base64_sourcemap, use_smcache=False) is smap_view
+        assert fetch_sourcemap(base64_sourcemap.rstrip("="), use_smcache=False) is smap_view
+
+        smcache = fetch_sourcemap(base64_sourcemap, source=b"console.log('a')")
+        assert smcache is not smap_view
+        assert fetch_sourcemap(base64_sourcemap, source=b"console.log('a')") is smcache
+        assert fetch_sourcemap(base64_sourcemap, source=b"console.log('b')") is not smcache
+
     @responses.activate
     def test_garbage_json(self):
         responses.add(
@@ -1518,3 +1538,94 @@ class CacheSourceTest(TestCase):
         # now we have an error
         assert len(processor.cache.get_errors(abs_path)) == 1
         assert processor.cache.get_errors(abs_path)[0] == {"url": map_url, "type": "js_no_source"}
+
+
+class FetchSourcesTest(TestCase):
+    def test_prefetch_release_files(self):
+        release = Release.objects.create(version="1", organization_id=self.project.organization_id)
+        release.add_project(self.project)
+        releasefile = self.create_release_file(release_id=release.id, name="app:///foo.js")
+
+        prefetched = prefetch_release_files(["app:///foo.js", "app:///bar.js"], release, None)
+        assert prefetched[releasefile.ident].id == releasefile.id
+        assert prefetched[ReleaseFile.get_ident("app:///bar.js")] is None
+
+        with self.assertNumQueries(0):
+            assert fetch_release_file("app:///bar.js", release, None, prefetched) is None
+
+        # Cached artifacts are not looked up again.
+        assert prefetch_release_files(["app:///bar.js"], release, None) == {}
+
+    @override_options(
+        {
+            "sourcemaps.fetch-planner.enabled": True,
+            "sourcemaps.fetch-concurrency": 4,
+        }
+    )
+    @patch("sentry.lang.javascript.processor.fetch_sourcemap")
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_populate_source_cache(self, mock_fetch_file, mock_fetch_sourcemap):
+        def fetch_file(url, **kwargs):
+            if "missing" in url:
+                raise http.CannotFetch({"type": EventError.JS_MISSING_SOURCE, "url": url})
+            return http.UrlResult(url, {}, b"foo()\n//# sourceMappingURL=bundle.js.map", 200, None)
+
+        sourcemap_view = MagicMock()
+        sourcemap_view.iter_sources.return_value = []
+        mock_fetch_file.side_effect = fetch_file
+        mock_fetch_sourcemap.return_value = sourcemap_view
+
+        processor = JavaScriptStacktraceProcessor(
+            data={}, stacktrace_infos=None, project=self.project
+        )
+        processor.populate_source_cache(
+            [
+                {"abs_path": "http://example.com/a.js"},
+                {"abs_path": "http://example.com/b.js"},
+                {"abs_path": "http://example.com/missing.js"},
+                {"abs_path": "http://example.com/node_modules/missing.js"},
+            ]
+        )
+
+        assert mock_fetch_file.call_count == 4
+        assert processor.fetch_count == 4
+        assert processor.cache.get("http://example.com/a.js") is not None
+        assert processor.cache.get("http://example.com/b.js") is not None
+        assert processor.cache.get_errors("http://example.com/missing.js") == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": "http://example.com/missing.js"}
+        ]
+        assert processor.cache.get_errors("http://example.com/node_modules/missing.js") == []
+
+        # Both sources share the same source map, which is fetched once.
+        mock_fetch_sourcemap.assert_called_once_with(
+            "http://example.com/bundle.js.map",
+            source=b"foo()\n//# sourceMappingURL=bundle.js.map",
+            use_smcache=False,
+            project=self.project,
+            release=None,
+            dist=None,
+            allow_scraping=True,
+            prefetched_files=None,
+            domain_limiter=ANY,
+        )
+        assert processor.sourcemaps.get_link("http://example.com/a.js") == (
+            "http://example.com/bundle.js.map",
+            sourcemap_view,
+        )
+
+    @override_options({"sourcemaps.fetch-planner.enabled": True})
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_too_many_sources(self, mock_fetch_file):
+        mock_fetch_file.return_value = http.UrlResult("", {}, b"foo()", 200, None)
+
+        processor = JavaScriptStacktraceProcessor(
+            data={}, stacktrace_infos=None, project=self.project
+        )
+        processor.max_fetches = 1
+        processor.fetch_sources(["http://example.com/a.js", "http://example.com/b.js"])
+
+        assert mock_fetch_file.call_count == 1
+        assert processor.fetch_count == 2
+        assert processor.cache.get_errors("http://example.com/b.js") == [
+            {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES}
+        ]
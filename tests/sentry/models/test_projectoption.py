@@ -30,3 +30,15 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.create(project=self.project, key="foo", value="bar")
         result = ProjectOption.objects.get_value_bulk([self.project], "foo")
         assert result == {self.project: "bar"}
+
+    def test_get_all_values_bulk(self):
+        other_project = self.create_project()
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+
+        result = ProjectOption.objects.get_all_values_bulk([self.project, other_project])
+        assert result == {self.project.id: {"foo": "bar"}, other_project.id: {}}
+
+        # Values are served from the local cache afterwards
+        with self.assertNumQueries(0):
+            assert ProjectOption.objects.get_value(self.project, "foo") == "bar"
+            assert ProjectOption.objects.get_all_values(other_project) == {}
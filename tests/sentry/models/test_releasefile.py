@@ -4,7 +4,8 @@ from datetime import datetime, timezone
 from io import BytesIO
 from threading import Thread
 from time import sleep
-from zipfile import ZipFile
+from unittest import mock
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 import pytest
 
@@ -14,8 +15,10 @@ from sentry.models.distribution import Distribution
 from sentry.models.file import File
 from sentry.models.releasefile import (
     ARTIFACT_INDEX_FILENAME,
+    IndexedReleaseArchive,
     _ArtifactIndexGuard,
     delete_from_artifact_index,
+    read_archive_index,
     read_artifact_index,
     update_artifact_index,
 )
@@ -242,6 +245,53 @@ class ReleaseArchiveTestCase(TestCase):
         assert file_.checksum == index["files"]["fake://foo"]["sha1"]
 
 
+class IndexedReleaseArchiveTestCase(TestCase):
+    def create_file(self, files):
+        buffer = BytesIO()
+        with ZipFile(buffer, mode="w") as zf:
+            for filename, (content, compress_type) in files.items():
+                zf.writestr(filename, content, compress_type=compress_type)
+
+        buffer.seek(0)
+        file_ = File.objects.create(name="bundle.zip", type="release.bundle")
+        # Small blobs, so that members are spread across several of them
+        file_.putfile(buffer, blob_size=64)
+        return file_
+
+    def test_read(self):
+        files = {
+            "stored.js": (b"stored" * 50, ZIP_STORED),
+            "deflated.js.map": (b"deflated" * 50, ZIP_DEFLATED),
+            "empty.js": (b"", ZIP_DEFLATED),
+        }
+        file_ = self.create_file(files)
+
+        with IndexedReleaseArchive.from_file(file_) as archive:
+            for filename, (content, _) in files.items():
+                assert filename in archive
+                assert archive.read(filename) == content
+                assert archive.open(filename).read() == content
+
+            assert "missing.js" not in archive
+            with pytest.raises(KeyError):
+                archive.read("missing.js")
+
+    def test_index_cached_by_checksum(self):
+        file_ = self.create_file({"foo.js": (b"foo", ZIP_DEFLATED)})
+        other_file = self.create_file({"foo.js": (b"foo", ZIP_DEFLATED)})
+        assert file_.checksum == other_file.checksum
+
+        with mock.patch(
+            "sentry.models.releasefile.read_archive_index", side_effect=read_archive_index
+        ) as read_index:
+            with IndexedReleaseArchive.from_file(file_) as archive:
+                assert archive.read("foo.js") == b"foo"
+            with IndexedReleaseArchive.from_file(other_file) as archive:
+                assert archive.read("foo.js") == b"foo"
+
+        assert read_index.call_count == 1
+
+
 @pytest.mark.skip(reason="Causes 'There is 1 other session using the database.'")
 class ArtifactIndexGuardTestCase(TransactionTestCase):
     tick = 0.1  # seconds
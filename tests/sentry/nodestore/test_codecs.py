@@ -0,0 +1,42 @@
+import pytest
+import zstandard
+
+from sentry.nodestore import codecs
+from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.testutils.helpers import override_options
+
+
+@pytest.fixture
+def zstd_dictionary(monkeypatch):
+    samples = [
+        f'{{"platform": "cocoa", "debug_meta": {{"images": [{{"code_file": "/usr/lib/{i}.dylib"}}]}}}}'.encode()
+        for i in range(1000)
+    ]
+    dictionary = zstandard.train_dictionary(1024, samples)
+    monkeypatch.setattr(codecs, "_zstd_dictionaries", {dictionary.dict_id(): dictionary})
+    return dictionary
+
+
+def test_legacy_payload_is_not_encoded():
+    assert not codecs.is_encoded(b'{"foo":"bar"}')
+    assert codecs.is_encoded(b"\x00mz")
+
+
+@pytest.mark.django_db
+def test_zstd_dictionary(zstd_dictionary):
+    ns = DjangoNodeStorage()
+    data = {"platform": "cocoa", "debug_meta": {"images": [{"code_file": "/usr/lib/a.dylib"}]}}
+
+    with override_options(
+        {
+            "nodestore.serializer": "json",
+            "nodestore.compression": "zstd",
+            "nodestore.zstd-dictionary-id": zstd_dictionary.dict_id(),
+        }
+    ):
+        encoded = ns._encode({None: dict(data)})
+
+    assert encoded[: codecs.HEADER_SIZE] == b"\x00jz"
+    frame = encoded[codecs.HEADER_SIZE :]
+    assert zstandard.get_frame_parameters(frame).dict_id == zstd_dictionary.dict_id()
+    assert ns._decode(encoded, subkey=None) == data
@@ -3,10 +3,13 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 `ns` fixture to have it tested.
 """
 from contextlib import nullcontext
+from unittest import mock
 
 import pytest
 
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.nodestore.localcache import local_node_cache
+from sentry.testutils.helpers import override_options
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
     get_temporary_bigtable_nodestorage,
@@ -91,3 +94,66 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@pytest.mark.parametrize("serializer", ["json", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zstd"])
+def test_codecs(ns, serializer, compression):
+    codec_options = {"nodestore.serializer": serializer, "nodestore.compression": compression}
+
+    with override_options(codec_options):
+        ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+        ns.set("node_2", {"foo": ["c", 1, 1.5, None, True]})
+
+    # Payloads stay readable regardless of the codec currently used for writes
+    assert ns.get("node_1") == {"foo": "a"}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_1", subkey="missing") is None
+    assert ns.get_multi(["node_2"]) == {"node_2": {"foo": ["c", 1, 1.5, None, True]}}
+
+    ns.set("node_3", {"foo": "legacy"})
+    with override_options(codec_options):
+        assert ns.get("node_3") == {"foo": "legacy"}
+
+
+def test_deduplicate(ns):
+    images = [{"debug_id": f"{i:032x}", "code_file": f"/usr/lib/{i}.dylib"} for i in range(10)]
+    data = {"platform": "cocoa", "modules": {"foo": "1.0"}, "debug_meta": {"images": images}}
+
+    with override_options({"nodestore.deduplicate": True}):
+        ns.set("node_1", data)
+        ns.set("node_2", dict(data, platform="native"))
+
+    assert data["debug_meta"]["images"] == images
+    assert ns.get("node_1") == data
+    assert ns.get_multi(["node_1", "node_2"]) == {
+        "node_1": data,
+        "node_2": dict(data, platform="native"),
+    }
+
+
+def test_get_without_local_cache(ns):
+    ns.set("node_1", {"foo": "a"})
+
+    with mock.patch.object(ns, "_get_bytes_multi") as get_bytes_multi:
+        assert ns.get("node_1") == {"foo": "a"}
+        assert not get_bytes_multi.called
+
+
+def test_local_cache(ns):
+    local_node_cache.clear()
+
+    with override_options({"nodestore.local-cache.max-bytes": 1024 * 1024}):
+        ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+
+        with mock.patch.object(ns, "_get_bytes_multi") as get_bytes_multi:
+            assert ns.get("node_1") == {"foo": "a"}
+            assert ns.get("node_1", subkey="other") == {"foo": "b"}
+            assert ns.get_multi(["node_1"]) == {"node_1": {"foo": "a"}}
+            assert not get_bytes_multi.called
+
+        ns.delete("node_1")
+        assert ns.get("node_1") is None
+        assert ns.get("node_1", subkey="other") is None
+
+    local_node_cache.clear()
@@ -0,0 +1,49 @@
+from unittest import mock
+
+from sentry.nodestore.localcache import LocalNodeCache
+
+
+def test_get_set_delete():
+    cache = LocalNodeCache()
+    cache.set_many({"a": b"foo", "b": b"bar", "c": None}, max_bytes=100, ttl=60)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": b"foo", "b": b"bar"}
+    assert cache.size == 6
+
+    cache.delete_many(["a", "d"])
+    assert cache.get_many(["a", "b"]) == {"b": b"bar"}
+    assert cache.size == 3
+
+
+def test_evicts_least_recently_used():
+    cache = LocalNodeCache()
+    cache.set_many({"a": b"a" * 4, "b": b"b" * 4}, max_bytes=10, ttl=60)
+    cache.get_many(["a"])
+    cache.set_many({"c": b"c" * 4}, max_bytes=10, ttl=60)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": b"a" * 4, "c": b"c" * 4}
+    assert cache.size == 8
+
+    cache.set_many({"d": b"d" * 11}, max_bytes=10, ttl=60)
+    assert "d" not in cache.get_many(["d"])
+
+
+def test_overwrite_updates_size():
+    cache = LocalNodeCache()
+    cache.set_many({"a": b"foo"}, max_bytes=10, ttl=60)
+    cache.set_many({"a": b"foobar"}, max_bytes=10, ttl=60)
+
+    assert cache.get_many(["a"]) == {"a": b"foobar"}
+    assert cache.size == 6
+    assert len(cache) == 1
+
+
+def test_ttl():
+    cache = LocalNodeCache()
+    with mock.patch("time.time", return_value=1000):
+        cache.set_many({"a": b"foo"}, max_bytes=10, ttl=60)
+    with mock.patch("time.time", return_value=1059):
+        assert cache.get_many(["a"]) == {"a": b"foo"}
+    with mock.patch("time.time", return_value=1061):
+        assert cache.get_many(["a"]) == {}
+    assert cache.size == 0
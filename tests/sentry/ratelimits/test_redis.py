@@ -2,8 +2,9 @@ from time import time
 
 from freezegun import freeze_time
 
-from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.ratelimits.redis import RedisRateLimiter, local_leases
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
 
 
 class RedisRateLimiterTest(TestCase):
@@ -65,3 +66,46 @@ class RedisRateLimiterTest(TestCase):
             assert not limited
             assert value == 1
             assert reset_time == expected_reset_time + 5
+
+    @override_options(
+        {"ratelimits.local-lease-fraction": 0.5, "ratelimits.local-lease-max-outstanding": 1.0}
+    )
+    def test_is_limited_with_lease(self):
+        local_leases.clear()
+        with freeze_time("2000-01-01"):
+            # Requests are counted in Redis 5 at a time
+            for i in range(5):
+                assert self.backend.is_limited_with_value("foo", 10, window=5)[:2] == (False, i + 1)
+            assert self.backend.current_value("foo", window=5) == 5
+
+            # Another process leased the next 4 requests
+            self.backend.client.incrby(self.backend._construct_redis_key("foo", window=5), 4)
+
+            assert self.backend.is_limited_with_value("foo", 10, window=5)[:2] == (False, 10)
+            assert self.backend.is_limited_with_value("foo", 10, window=5)[:2] == (True, 11)
+            assert self.backend.is_limited_with_value("foo", 10, window=5)[:2] == (True, 11)
+            assert self.backend.current_value("foo", window=5) == 14
+
+        local_leases.clear()
+
+    @override_options(
+        {"ratelimits.local-lease-fraction": 0.5, "ratelimits.local-lease-max-outstanding": 0.5}
+    )
+    def test_is_limited_with_lease_returned(self):
+        local_leases.clear()
+        with freeze_time("2000-01-01") as frozen_time:
+            assert self.backend.is_limited_with_value("foo", 10, window=10)[:2] == (False, 1)
+            assert self.backend.is_limited_with_value("foo", 10, window=10)[:2] == (False, 2)
+            assert self.backend.current_value("foo", window=10) == 5
+
+            # The 3 unused requests of the stale lease are returned with the next one
+            frozen_time.tick(local_leases.MAX_AGE + 1)
+            assert self.backend.is_limited_with_value("foo", 10, window=10)[:2] == (False, 3)
+            assert self.backend.current_value("foo", window=10) == 7
+
+            # Another process is not leased more than 5 outstanding requests
+            local_leases.clear()
+            assert self.backend.is_limited_with_value("foo", 10, window=10)[:2] == (False, 8)
+            assert self.backend.current_value("foo", window=10) == 8
+
+        local_leases.clear()
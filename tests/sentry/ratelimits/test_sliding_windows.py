@@ -6,11 +6,13 @@ from sentry.ratelimits.sliding_windows import (
     RedisSlidingWindowRateLimiter,
     RequestedQuota,
 )
+from sentry.testutils.helpers import override_options
 
 
-@pytest.fixture
-def limiter():
-    return RedisSlidingWindowRateLimiter()
+@pytest.fixture(params=[False, True], ids=["two-phase", "lua"])
+def limiter(request):
+    with override_options({"ratelimits.sliding-window.lua": request.param}):
+        yield RedisSlidingWindowRateLimiter()
 
 
 TIMESTAMP_OFFSET = 100
@@ -121,3 +123,32 @@ def test_conflicting_quotas(limiter):
         GrantedQuota(prefix="foo", granted=6, reached_quotas=[]),
         GrantedQuota(prefix="bar", granted=4, reached_quotas=quotas),
     ]
+
+
+@override_options({"ratelimits.sliding-window.lua": True})
+def test_lua_multiple_prefixes():
+    limiter = RedisSlidingWindowRateLimiter()
+    global_quota = Quota(window_seconds=10, granularity_seconds=1, limit=10, prefix_override="all")
+    org_quota = Quota(window_seconds=10, granularity_seconds=1, limit=5)
+
+    resp = limiter.check_and_use_quotas(
+        [
+            RequestedQuota(prefix="foo", requested=4, quotas=[org_quota, global_quota]),
+            RequestedQuota(prefix="bar", requested=8, quotas=[org_quota, global_quota]),
+        ],
+        timestamp=TIMESTAMP_OFFSET,
+    )
+
+    assert resp == [
+        GrantedQuota(prefix="foo", granted=4, reached_quotas=[]),
+        GrantedQuota(prefix="bar", granted=5, reached_quotas=[org_quota]),
+    ]
+
+    # "bar" reserved 6 of the global quota, but only used 5 of it due to its
+    # own quota. The excess has been given back.
+    resp = limiter.check_and_use_quotas(
+        [RequestedQuota(prefix="baz", requested=2, quotas=[org_quota, global_quota])],
+        timestamp=TIMESTAMP_OFFSET,
+    )
+
+    assert resp == [GrantedQuota(prefix="baz", granted=1, reached_quotas=[global_quota])]
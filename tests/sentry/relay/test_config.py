@@ -14,7 +14,7 @@ from sentry.dynamic_sampling.rules_generator import HEALTH_CHECK_GLOBS
 from sentry.dynamic_sampling.utils import RESERVED_IDS, RuleType
 from sentry.models import ProjectKey
 from sentry.models.transaction_threshold import TransactionMetric
-from sentry.relay.config import ProjectConfig, get_project_config
+from sentry.relay.config import ProjectConfig, get_project_config, prefetch_project_configs
 from sentry.testutils.factories import Factories
 from sentry.testutils.helpers import Feature
 from sentry.testutils.helpers.options import override_options
@@ -187,6 +187,24 @@ def test_project_config_uses_filter_features(
         assert cfg_client_ips is None
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("has_custom_filters", [False, True])
+def test_prefetch_project_configs(default_project, has_custom_filters):
+    default_project.update_option("sentry:error_messages", ["some_error"])
+
+    with Feature({"projects:custom-inbound-filters": has_custom_filters}):
+        expected = get_project_config(default_project, full_config=True).to_dict()
+        with prefetch_project_configs(default_project.organization, [default_project]):
+            with mock.patch("sentry.relay.config.features.has") as has:
+                cfg = get_project_config(default_project, full_config=True).to_dict()
+
+    assert mock.call("projects:custom-inbound-filters", default_project) not in has.call_args_list
+    for key in ("lastFetch", "lastChange", "rev"):
+        del expected[key]
+        del cfg[key]
+    assert cfg == expected
+
+
 @pytest.mark.django_db
 @mock.patch("sentry.relay.config.EXPOSABLE_FEATURES", ["projects:custom-inbound-filters"])
 def test_project_config_exposed_features(default_project):
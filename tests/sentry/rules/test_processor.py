@@ -26,8 +26,9 @@ from sentry.notifications.types import (
 from sentry.rules import init_registry
 from sentry.rules.conditions import EventCondition
 from sentry.rules.filters.base import EventFilter
-from sentry.rules.processor import RuleProcessor
+from sentry.rules.processor import RuleProcessor, compiled_rule_cache
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
 from sentry.types.integrations import ExternalProviders
 
 EMAIL_ACTION_DATA = {
@@ -221,6 +222,114 @@ class RuleProcessorTest(TestCase):
         # mock condition first.
         assert passes.call_count == 0
 
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        [
+            "sentry.mail.actions.NotifyEmailAction",
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+        ],
+    )
+    def test_frequency_queried_once(self):
+        # Rules checking the same frequency with different thresholds share the
+        # queried rate.
+        frequency_cond_data = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "interval": "1h",
+        }
+        self.rule.update(
+            data={
+                "conditions": [{**frequency_cond_data, "value": 100}],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [{**frequency_cond_data, "value": 1}],
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+        with patch("sentry.rules.processor.rules", init_registry()), patch(
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition.query_hook",
+            return_value=10,
+        ) as query_hook:
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            results = list(rp.apply())
+
+        assert query_hook.call_count == 1
+        assert len(results) == 1
+        assert len(results[0][1]) == 1
+
+    @override_options({"rules.compiled-rule-cache.size": 10})
+    def test_compiled_rule_cache(self):
+        compiled_rule_cache.clear()
+
+        def apply():
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            GroupRuleStatus.objects.filter(rule=self.rule).update(last_active=None)
+            cache.clear()
+            return list(rp.apply())
+
+        with patch.object(
+            RuleProcessor, "get_rule_type", autospec=True, side_effect=RuleProcessor.get_rule_type
+        ) as get_rule_type:
+            assert len(apply()) == 1
+            assert len(apply()) == 1
+            assert get_rule_type.call_count == 1
+
+            # Changing the rule compiles it again
+            self.rule.update(
+                data={
+                    "conditions": [EVERY_EVENT_COND_DATA],
+                    "action_match": "none",
+                    "actions": [EMAIL_ACTION_DATA],
+                }
+            )
+            assert len(apply()) == 0
+            assert get_rule_type.call_count == 2
+
+        assert len(compiled_rule_cache) == 2
+        compiled_rule_cache.clear()
+
+    @override_options({"rules.compiled-rule-cache.size": 10})
+    def test_compiled_rule_cache_instances_per_event(self):
+        compiled_rule_cache.clear()
+
+        def instantiate(event):
+            rp = RuleProcessor(
+                event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            return rp.instantiate(rp.compile_rule(self.rule).conditions, self.rule)
+
+        event = self.store_event(data={}, project_id=self.project.id)
+        event = next(event.build_group_events())
+        [first] = instantiate(self.event)
+        [second] = instantiate(event)
+
+        # Conditions are not shared between events, only their classes are
+        assert first is not second
+        assert type(first) is type(second)
+        assert first.project is self.event.project
+        assert second.project is event.project
+        assert len(compiled_rule_cache) == 1
+        compiled_rule_cache.clear()
+
 
 class MockFilterTrue(EventFilter):
     id = "tests.sentry.rules.test_processor.MockFilterTrue"
@@ -12,7 +12,11 @@ import pytest
 
 from sentry.sentry_metrics.configuration import UseCaseKey
 from sentry.sentry_metrics.indexer.base import FetchType, FetchTypeExt, Metadata
-from sentry.sentry_metrics.indexer.cache import CachingIndexer, StringIndexerCache
+from sentry.sentry_metrics.indexer.cache import (
+    CachingIndexer,
+    StringIndexerCache,
+    local_indexer_cache,
+)
 from sentry.sentry_metrics.indexer.mock import RawSimpleIndexer
 from sentry.sentry_metrics.indexer.postgres.postgres_v2 import PGStringIndexerV2
 from sentry.sentry_metrics.indexer.strings import SHARED_STRINGS, StaticStringIndexer
@@ -326,3 +330,38 @@ def test_rate_limited(indexer):
 
     assert len(rate_limited_strings2) == 1
     assert len(rate_limited_strings - rate_limited_strings2) == 2
+
+
+@override_options({"sentry-metrics.indexer.local-cache.size": 100})
+def test_local_cache(indexer, indexer_cache) -> None:
+    """
+    Test that strings resolved once are served from the process' memory
+    without going to the shared cache.
+    """
+    org_id = 9
+    local_indexer_cache.clear()
+
+    raw_indexer = indexer
+    indexer = CachingIndexer(indexer_cache, indexer)
+
+    results = indexer.bulk_record(use_case_id=use_case_id, org_strings={org_id: {"a", "b"}})
+    assert len(local_indexer_cache) == 2
+
+    indexer_cache.cache.clear()
+    new_results = indexer.bulk_record(
+        use_case_id=use_case_id, org_strings={org_id: {"a", "b", "c"}}
+    )
+    assert new_results[org_id]["a"] == results[org_id]["a"]
+    assert new_results[org_id]["b"] == results[org_id]["b"]
+    assert new_results[org_id]["c"] == raw_indexer.resolve(use_case_id, org_id, "c")
+
+    fetch_meta = new_results.get_fetch_metadata()
+    assert_fetch_type_for_tag_string_set(fetch_meta[org_id], FetchType.CACHE_HIT, {"a", "b"})
+    assert_fetch_type_for_tag_string_set(fetch_meta[org_id], FetchType.FIRST_SEEN, {"c"})
+
+    # only "c" went through the shared cache
+    assert indexer_cache.get_many([f"{org_id}:a", f"{org_id}:c"], use_case_id.value) == {
+        f"{org_id}:a": None,
+        f"{org_id}:c": new_results[org_id]["c"],
+    }
+    local_indexer_cache.clear()
@@ -6,7 +6,12 @@ from arroyo.backends.kafka import KafkaPayload
 from arroyo.types import Message, Partition, Topic
 
 from sentry.sentry_metrics.configuration import UseCaseKey
-from sentry.sentry_metrics.consumers.indexer.batch import IndexerBatch, PartitionIdxOffset
+from sentry.sentry_metrics.consumers.indexer.batch import (
+    IndexerBatch,
+    PartitionIdxOffset,
+    ResolvedString,
+    build_string_table,
+)
 from sentry.sentry_metrics.indexer.base import FetchType, FetchTypeExt, Metadata
 from sentry.snuba.metrics.naming_layer.mri import SessionMRI
 from sentry.utils import json
@@ -931,3 +936,23 @@ def test_cardinality_limiter(caplog, settings):
             ],
         )
     ]
+
+
+def test_build_string_table():
+    table = build_string_table(
+        {"environment": 1, "production": None, "init": 3},
+        {
+            "environment": Metadata(id=1, fetch_type=FetchType.CACHE_HIT),
+            "production": Metadata(
+                id=None,
+                fetch_type=FetchType.RATE_LIMITED,
+                fetch_type_ext=FetchTypeExt(is_global=True),
+            ),
+        },
+    )
+
+    assert table == {
+        "environment": ResolvedString(1, FetchType.CACHE_HIT.value, "1", False),
+        "production": ResolvedString(None, FetchType.RATE_LIMITED.value, "None", True),
+        "init": ResolvedString(3, None, "", False),
+    }
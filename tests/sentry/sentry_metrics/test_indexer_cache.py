@@ -1,8 +1,10 @@
+from unittest import mock
+
 import pytest
 from django.conf import settings
 
 from sentry.sentry_metrics.configuration import UseCaseKey
-from sentry.sentry_metrics.indexer.cache import StringIndexerCache
+from sentry.sentry_metrics.indexer.cache import LocalStringIndexerCache, StringIndexerCache
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
 
@@ -71,3 +73,22 @@ def test_separate_namespacing() -> None:
     indexer_cache.set("a", 2, UseCaseKey.PERFORMANCE.value)
     assert indexer_cache.get("a", UseCaseKey.RELEASE_HEALTH.value) == 1
     assert indexer_cache.get("a", UseCaseKey.PERFORMANCE.value) == 2
+
+
+def test_local_cache() -> None:
+    local_cache = LocalStringIndexerCache()
+    local_cache.set_many({"1:a": 1, "1:b": 2}, "release-health", maxsize=3, ttl=60)
+    local_cache.set_many({"1:a": 3}, "performance", maxsize=3, ttl=60)
+
+    assert local_cache.get_many(["1:a", "1:b", "1:c"], "release-health") == {"1:a": 1, "1:b": 2}
+    assert local_cache.get_many(["1:a", "1:b"], "performance") == {"1:a": 3}
+
+    # "1:a" was used last, so "1:b" is evicted first
+    local_cache.get_many(["1:a"], "release-health")
+    local_cache.set_many({"1:c": 4}, "release-health", maxsize=3, ttl=60)
+    assert len(local_cache) == 3
+    assert local_cache.get_many(["1:a", "1:b", "1:c"], "release-health") == {"1:a": 1, "1:c": 4}
+
+    with mock.patch("time.time", return_value=10**10):
+        assert local_cache.get_many(["1:a", "1:c"], "release-health") == {}
+    assert len(local_cache) == 1
@@ -9,6 +9,7 @@ from sentry.relay.projectconfig_cache.redis import RedisProjectConfigCache
 from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDebounceCache
 from sentry.tasks.relay import (
     build_project_config,
+    compute_organization_configs,
     invalidate_project_config,
     schedule_build_project_config,
     schedule_invalidate_project_config,
@@ -79,6 +80,7 @@ def redis_cache(monkeypatch):
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.exists_many", cache.exists_many)
 
     return cache
 
@@ -292,6 +294,22 @@ def test_projectkeys(default_project, emulate_transactions, redis_cache, django_
         assert not redis_cache.get(key.public_key)
 
 
+@pytest.mark.django_db
+def test_compute_organization_configs(
+    default_project, default_projectkey, factories, redis_cache, django_cache
+):
+    other_project = factories.create_project(organization=default_project.organization)
+    other_projectkey = factories.create_project_key(other_project)
+
+    # Only configs that are cached are recomputed
+    redis_cache.set_many({default_projectkey.public_key: {"dummy-key": "val"}})
+
+    configs = compute_organization_configs(default_project.organization)
+    assert list(configs) == [default_projectkey.public_key]
+    assert configs[default_projectkey.public_key]["projectId"] == default_project.id
+    assert other_projectkey.public_key not in configs
+
+
 @pytest.mark.django_db(transaction=True)
 def test_db_transaction(
     default_project, default_projectkey, redis_cache, task_runner, django_cache
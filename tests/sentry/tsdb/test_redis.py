@@ -1,13 +1,16 @@
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from unittest import mock
 
 import pytest
 import pytz
+from celery.signals import worker_process_shutdown
 from django.test import override_settings
 
 from sentry.testutils import TestCase
 from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
 from sentry.tsdb.redis import CountMinScript, RedisTSDB, SuppressionWrapper
+from sentry.tsdb.writebuffer import TSDBWriteBuffer
 from sentry.utils.dates import to_datetime, to_timestamp
 
 
@@ -70,6 +73,76 @@ class RedisTSDBTest(TestCase):
         result = self.db.make_counter_key(TSDBModel.project, 1, to_datetime(1368889980), "foo", 1)
         assert result == ("ts:1:1368889980:46", self.db.get_model_key("foo") + "?e=1")
 
+    def test_write_buffer(self):
+        self.db.write_buffer = TSDBWriteBuffer(self.db, interval=60)
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+        epoch = int(to_timestamp(now))
+
+        for _ in range(3):
+            self.db.incr_multi([(TSDBModel.project, 1), (TSDBModel.group, 2)], now)
+        self.db.incr(TSDBModel.project, 1, now, count=2, environment_id=1)
+        self.db.record_multi([(TSDBModel.users_affected_by_group, 2, ["foo", "bar"])], now)
+        self.db.record(TSDBModel.users_affected_by_group, 2, ["bar", "baz"], now)
+
+        assert len(self.db.write_buffer) == 4
+        assert self.db.get_sums(TSDBModel.project, [1], now, now) == {1: 0}
+
+        self.db.write_buffer.flush()
+
+        assert len(self.db.write_buffer) == 0
+        assert self.db.get_sums(TSDBModel.project, [1], now, now) == {1: 5}
+        assert self.db.get_sums(TSDBModel.project, [1], now, now, environment_id=1) == {1: 2}
+        assert self.db.get_sums(TSDBModel.group, [2], now, now) == {2: 3}
+        assert self.db.get_range(TSDBModel.project, [1], now, now, rollup=ONE_HOUR) == {
+            1: [(epoch - (epoch % ONE_HOUR), 5)]
+        }
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [2], now, now
+        ) == {2: 3}
+
+    def test_write_buffer_flushes_when_full(self):
+        self.db.write_buffer = TSDBWriteBuffer(self.db, interval=60, max_items=2)
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+
+        self.db.incr(TSDBModel.project, 1, now)
+        assert self.db.get_sums(TSDBModel.project, [1], now, now) == {1: 0}
+        self.db.incr(TSDBModel.project, 2, now)
+        assert self.db.get_sums(TSDBModel.project, [1, 2], now, now) == {1: 1, 2: 1}
+        assert len(self.db.write_buffer) == 0
+
+    def test_write_buffer_flush_failed(self):
+        self.db.write_buffer = TSDBWriteBuffer(self.db, interval=60)
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+
+        self.db.incr(TSDBModel.project, 1, now)
+        self.db.incr(TSDBModel.project, 1, now, environment_id=1)
+        self.db.record(TSDBModel.users_affected_by_group, 2, ["foo"], now)
+
+        incr_multi = self.db._incr_multi
+        with mock.patch.object(self.db, "_incr_multi", side_effect=[None, Exception("Boom!")]) as m:
+            self.db.write_buffer.flush()
+            assert m.call_count == 2
+
+        # Only the increments that were not written are retried.
+        assert len(self.db.write_buffer) == 2
+        with mock.patch.object(self.db, "_incr_multi", side_effect=incr_multi) as m:
+            self.db.write_buffer.flush()
+            assert m.call_count == 1
+
+        assert self.db.get_distinct_counts_totals(
+            TSDBModel.users_affected_by_group, [2], now, now
+        ) == {2: 1}
+
+    def test_write_buffer_flushes_on_worker_process_shutdown(self):
+        self.db.write_buffer = TSDBWriteBuffer(self.db, interval=60)
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=1)
+
+        self.db.incr(TSDBModel.project, 1, now)
+        worker_process_shutdown.send(sender=None, pid=1, exitcode=0)
+
+        assert len(self.db.write_buffer) == 0
+        assert self.db.get_sums(TSDBModel.project, [1], now, now) == {1: 1}
+
     def test_get_model_key(self):
         result = self.db.get_model_key(1)
         assert result == 1
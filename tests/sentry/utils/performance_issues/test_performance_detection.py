@@ -17,11 +17,18 @@ from sentry.types.issues import GroupType
 from sentry.utils.performance_issues.performance_detection import (
     DETECTOR_TYPE_TO_GROUP_TYPE,
     DetectorType,
+    DuplicateSpanDetector,
+    DuplicateSpanHashDetector,
     EventPerformanceProblem,
     PerformanceProblem,
+    SlowSpanDetector,
+    SpanColumns,
     _detect_performance_problems,
     detect_performance_problems,
+    get_detection_settings,
     prepare_problem_for_grouping,
+    run_detector_on_columns,
+    run_detector_on_data,
 )
 from sentry.utils.performance_issues.performance_span_issue import PerformanceSpanProblem
 
@@ -923,6 +930,50 @@ class PerformanceDetectionTest(unittest.TestCase):
         )
 
 
+class ColumnarDetectionTest(unittest.TestCase):
+    def assert_same_problems(self, detector_cls, event):
+        settings = get_detection_settings()
+
+        expected = detector_cls(settings, event)
+        run_detector_on_data(expected, event)
+        actual = detector_cls(settings, event)
+        run_detector_on_columns(actual, SpanColumns(event.get("spans", [])))
+
+        assert [
+            (key, p.span_id, p.allowed_op, p.spans_involved, p.fingerprint)
+            for key, p in actual.stored_problems.items()
+        ] == [
+            (key, p.span_id, p.allowed_op, p.spans_involved, p.fingerprint)
+            for key, p in expected.stored_problems.items()
+        ]
+
+    def test_matches_span_detection(self):
+        events = list(EVENTS.values()) + [
+            create_event([create_span("db")] * 5),
+            create_event([create_span("db", 1001.0)] * 2 + [create_span("http", 2001.0, "GET /")]),
+            create_event(
+                [create_span("http", 100.0, "http://example.com/slow?q=1", "abcdef")] * 4
+                + [create_span("http.client", 400.0, "http://example.com/slow?q=2", "abcdef")]
+                + [create_span("db", 600.0)] * 5
+            ),
+        ]
+        for event in events:
+            for detector_cls in (
+                DuplicateSpanDetector,
+                DuplicateSpanHashDetector,
+                SlowSpanDetector,
+            ):
+                self.assert_same_problems(detector_cls, event)
+
+    @override_options(BASE_DETECTOR_OPTIONS)
+    def test_detect_performance_problems(self):
+        n_plus_one_event = EVENTS["n-plus-one-in-django-index-view"]
+
+        with override_options({"performance.issues.columnar-detection": True}):
+            perf_problems = _detect_performance_problems(n_plus_one_event, Mock())
+        assert_n_plus_one_db_problem(perf_problems)
+
+
 class PrepareProblemForGroupingTest(unittest.TestCase):
     def test(self):
         n_plus_one_event = EVENTS["n-plus-one-in-django-index-view"]
@@ -4,15 +4,22 @@ from unittest import mock
 
 import pytest
 import pytz
+from django.core.cache import cache
 from django.utils import timezone
 
+from sentry.locks import locks
 from sentry.models import GroupRelease, Project, Release
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+from sentry.utils import json
 from sentry.utils.snuba import (
     Dataset,
     SnubaQueryParams,
     UnqualifiedQueryError,
+    _apply_cache_and_build_results,
+    _bulk_snuba_query,
     _prepare_query_params,
+    get_cache_key,
     get_json_type,
     get_query_params_to_update_for_projects,
     get_snuba_column_name,
@@ -374,3 +381,73 @@ class QuantizeTimeTest(unittest.TestCase):
                 break
 
         assert i != j
+
+
+class QueryCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.query = {"dataset": "events", "project": [self.project.id]}
+        self.params = (self.query, lambda x: x, lambda x: x)
+
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query", return_value=[{"data": [{"count": 1}]}])
+    def test_uncompressed(self, mock_query):
+        with mock.patch("sentry.utils.snuba._encode_result") as encode_result:
+            result = _apply_cache_and_build_results([self.params], use_cache=True)
+            assert not encode_result.called
+
+        assert result == [{"data": [{"count": 1}]}]
+        assert isinstance(cache.get(get_cache_key(self.query)), str)
+        assert _apply_cache_and_build_results([self.params], use_cache=True) == result
+        assert mock_query.call_count == 1
+
+    @override_options({"snuba.query-cache.compress": True})
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query", return_value=[{"data": [{"count": 1}]}])
+    def test_compressed(self, mock_query):
+        result = _apply_cache_and_build_results([self.params], use_cache=True)
+        assert result == [{"data": [{"count": 1}]}]
+        assert isinstance(cache.get(get_cache_key(self.query)), bytes)
+
+        assert _apply_cache_and_build_results([self.params], use_cache=True) == result
+        assert mock_query.call_count == 1
+
+    @override_options({"snuba.query-cache.coalesce": True, "snuba.query-cache.lease-timeout": 0})
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query", return_value=[{"data": [{"count": 1}]}])
+    def test_coalesce(self, mock_query):
+        results = _apply_cache_and_build_results([self.params, self.params], use_cache=True)
+        assert results == [{"data": [{"count": 1}]}] * 2
+        assert results[0] is not results[1]
+        assert len(mock_query.call_args[0][0]) == 1
+
+    @override_options({"snuba.query-cache.coalesce": True, "snuba.query-cache.lease-timeout": 1})
+    @mock.patch("sentry.utils.snuba._bulk_snuba_query", return_value=[{"data": [{"count": 1}]}])
+    def test_lease_timeout(self, mock_query):
+        # Another process is running the query, but never caches its result.
+        lease = locks.get(
+            f"sqc-lease:{get_cache_key(self.query)}", duration=10, name="snuba_query_cache"
+        )
+        with lease.acquire():
+            results = _apply_cache_and_build_results([self.params], use_cache=True)
+
+        assert results == [{"data": [{"count": 1}]}]
+        assert mock_query.call_count == 1
+
+
+class BulkSnubaQueryTest(TestCase):
+    def test_decode_in_order(self):
+        def query(params):
+            query_data, _, _ = params
+            body = {"data": [{"value": query_data[0]["value"]}]}
+            response = mock.Mock(status=200, data=json.dumps(body).encode("utf-8"))
+            return response, query_data[1], query_data[2]
+
+        def reverse(row):
+            row["value"] *= 2
+            return row
+
+        with mock.patch("sentry.utils.snuba._legacy_snql_query", side_effect=query):
+            results = _bulk_snuba_query(
+                [({"value": 1}, lambda x: x, reverse), ({"value": 2}, lambda x: x, reverse)],
+                headers={},
+            )
+
+        assert results == [{"data": [{"value": 2}]}, {"data": [{"value": 4}]}]